@@ -1,17 +1,215 @@
+import time
+
 import pandas as pd
+import requests
 import streamlit as st
 
-from components.sidebar import render_sidebar
+from components.sidebar import render_catalog_builder, render_diagnostics_panel, render_sidebar
 from utils import apply_css
-from components.charts import (plot_stars, plot_forks, plot_issues_pie, plot_scatter, 
-                              plot_correlation_heatmap, plot_trend_analysis, 
-                              plot_statistical_insights, plot_framework_ranking, 
-                              plot_outliers_analysis)
+from services.exporting import TABLE_FORMATS, available_formats
 from services.github_api import get_frameworks_data
-from services.processing import (clean_and_cast, add_metrics, describe_stats, group_by_license,
-                               correlation_analysis, trend_analysis, statistical_insights, 
-                               framework_comparison_analysis)
-from services.exporting import build_html_report
+from services.github_stats import ACTIVITY_COLUMNS, get_stats_poller, merge_activity
+from services.processing import build_catalog_stats
+from services.pipeline import Pipeline
+from services.refresher import background_refresh_enabled, build_refresher
+from services.catalog import build_catalog, load_catalog
+from services.correlation import correlation_pairs
+from services.snapshots import get_snapshot_path, growth_summary, load_history
+
+
+# --- Các mục nội dung ---
+# Mỗi mục là một fragment: chỉ mục được chọn mới chạy, và tương tác bên trong
+# một mục chỉ chạy lại mục đó. Kết quả nặng được cache trong Pipeline và charts.
+# components.charts (Plotly) được import trong mục cần vẽ, không phải lúc khởi động.
+
+@st.fragment
+def render_overview(pipeline, df, chart_type, show_watchers, show_issues):
+    st.subheader('Tổng quan dữ liệu')
+    highlight_cols = ['Stars', 'Forks'] + (['Open Issues'] if show_issues else [])
+    st.dataframe(
+        df[
+            ['Framework', 'Repo', 'License', 'Size (KB)', 'Created At', 'Updated At', 'Pushed At', 'Stars', 'Forks']
+            + (['Watchers'] if show_watchers else [])
+            + (['Open Issues'] if show_issues else [])
+            + ['Stars/Day (ước tính)', 'Stars/Fork', 'Tỉ lệ Issues/Stars', 'Tuổi repo (năm)']
+            + [col for col in ACTIVITY_COLUMNS if col in df.columns]
+        ].style.highlight_max(axis=0, subset=highlight_cols, color='lightgreen')
+    )
+
+
+@st.fragment
+def render_quick_metrics(pipeline, df, chart_type, show_watchers, show_issues):
+    st.subheader('Chỉ số nhanh')
+    kpi1, kpi2, kpi3 = st.columns(3)
+    with kpi1:
+        st.metric('Tổng Stars', int(df['Stars'].sum()))
+    with kpi2:
+        st.metric('Tổng Forks', int(df['Forks'].sum()))
+    with kpi3:
+        st.metric('Tuổi repo trung bình (năm)', float(df['Tuổi repo (năm)'].mean().round(2)))
+
+    if get_snapshot_path():
+        st.subheader('Tăng trưởng thực tế (7 / 30 / 90 ngày)')
+        repos = df['Repo'].tolist()
+        history = load_history(repos, since=pd.Timestamp.now(tz='UTC') - pd.Timedelta(days=90))
+        if history.empty or history.groupby('Repo').size().max() < 2:
+            st.info('Chưa đủ snapshot để tính tăng trưởng. Dữ liệu sẽ được tích lũy sau mỗi lần tải.')
+        else:
+            from components.charts import plot_star_history
+            st.dataframe(growth_summary(repos), use_container_width=True)
+            plot_star_history(history)
+
+
+@st.fragment
+def render_groups(pipeline, df, chart_type, show_watchers, show_issues):
+    st.subheader('Nhóm theo License (nếu có)')
+    grouped = pipeline.grouped(include_watchers=show_watchers, include_issues=show_issues)
+    st.dataframe(grouped)
+    st.subheader('Thống kê mô tả')
+    stats = pipeline.describe(include_watchers=show_watchers, include_issues=show_issues)
+    st.dataframe(stats)
+
+
+@st.fragment
+def render_charts(pipeline, df, chart_type, show_watchers, show_issues):
+    from components.charts import plot_forks, plot_issues_pie, plot_scatter, plot_stars
+
+    st.subheader('Biểu đồ so sánh')
+    col1, col2 = st.columns(2)
+    with col1:
+        plot_stars(df, chart_type)
+    with col2:
+        plot_forks(df, chart_type)
+    if show_issues:
+        st.subheader('Tỷ lệ các vấn đề đang mở (Open Issues)')
+        plot_issues_pie(df)
+    st.subheader('Quan hệ Stars và Forks')
+    plot_scatter(df, show_issues)
+
+
+@st.fragment
+def render_advanced(pipeline, df, chart_type, show_watchers, show_issues):
+    from components.charts import (plot_correlation_heatmap, plot_framework_ranking, plot_outliers_analysis,
+                                   plot_statistical_insights, plot_trend_analysis)
+
+    st.subheader('Phân tích nâng cao')
+    
+    # Correlation Analysis
+    st.subheader('🔗 Phân tích tương quan')
+    method_col, correction_col = st.columns(2)
+    method = method_col.radio('Hệ số', ['Pearson', 'Spearman'], horizontal=True)
+    correction = correction_col.selectbox(
+        'Hiệu chỉnh kiểm định bội', list(CORRECTION_LABELS), format_func=CORRECTION_LABELS.get
+    )
+    correlations = pipeline.correlations(correction)
+    key = method.lower()
+    pvalues = correlations[f'{key}_p_adj' if correction else f'{key}_p']
+    plot_correlation_heatmap(
+        correlations[key], pvalues, title=f'Ma trận tương quan {method} (* : p < 0.05)'
+    )
+    with st.expander('Tất cả các cặp metrics'):
+        st.dataframe(correlation_pairs(correlations), use_container_width=True)
+
+    # Trend Analysis
+    st.subheader('📈 Phân tích xu hướng')
+    trend_data = pipeline.trend()
+    plot_trend_analysis(trend_data, df)
+
+    # Display trend results
+    if trend_data:
+        st.subheader('Kết quả phân tích xu hướng')
+        for analysis, result in trend_data.items():
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric(f"Tương quan ({analysis})", f"{result['correlation']}")
+            with col2:
+                st.metric("P-value", f"{result['p_value']}")
+            with col3:
+                st.metric("Ý nghĩa thống kê", result['significance'])
+            with col4:
+                st.metric("Spearman ρ", f"{result['spearman']}")
+
+    # Bootstrap / permutation
+    st.subheader('🎯 Độ bất định (bootstrap & hoán vị)')
+    if st.toggle('Tính khoảng tin cậy 95%', help='Hữu ích khi chỉ có ít repo: p-value và outlier rất nhạy với từng điểm'):
+        b_col, seed_col = st.columns(2)
+        n_resamples = b_col.number_input('Số lần lấy mẫu lại', 1000, 100_000, 10_000, step=1000)
+        seed = seed_col.number_input('Seed', 0, 2**31 - 1, 0)
+        with st.spinner('Đang lấy mẫu lại...'):
+            uncertainty = pipeline.uncertainty(int(n_resamples), int(seed))
+        st.dataframe(uncertainty['correlation'], use_container_width=True)
+        st.dataframe(uncertainty['cv'], use_container_width=True)
+        st.dataframe(uncertainty['rank'], use_container_width=True)
+
+    # Statistical Insights
+    st.subheader('📊 Insights thống kê')
+    insights = pipeline.insights()
+    plot_statistical_insights(insights, df)
+    
+    # Framework Comparison
+    st.subheader('🏆 So sánh Framework')
+    comparison_df = pipeline.comparison()
+    st.dataframe(comparison_df, use_container_width=True)
+    plot_framework_ranking(pipeline.top_k(10))
+    
+    # Outliers Analysis
+    plot_outliers_analysis(insights, df)
+
+
+@st.fragment
+def render_export(pipeline, df, chart_type, show_watchers, show_issues):
+    st.subheader('Xuất kết quả')
+    export_col1, export_col2 = st.columns(2)
+    with export_col1:
+        # Chỉ định dạng đang chọn được mã hóa; bytes được giữ trong export cache theo fingerprint
+        formats = available_formats()
+        fmt = st.radio(
+            'Định dạng bảng', formats, horizontal=True, key='export_format',
+            format_func=lambda value: {'csv': 'CSV', 'parquet': 'Parquet', 'arrow': 'Arrow IPC'}[value]
+        )
+        extension, mime = TABLE_FORMATS[fmt]
+        st.download_button(
+            f'Tải dữ liệu ({extension})', data=pipeline.table_bytes(fmt),
+            file_name=f'frameworks_summary.{extension}', mime=mime, on_click='ignore'
+        )
+    with export_col2:
+        report_bytes = pipeline.html_report(include_watchers=show_watchers, include_issues=show_issues)
+        st.download_button(
+            'Tải báo cáo HTML', data=report_bytes, file_name='report.html', mime='text/html', on_click='ignore'
+        )
+    st.subheader('Mô tả từ GitHub')
+    for _, row in df.iterrows():
+        st.markdown(f"**{row['Framework']}**: *{row['Description']}*")
+
+
+CORRECTION_LABELS = {None: 'Không', 'holm': 'Holm', 'fdr_bh': 'Benjamini-Hochberg'}
+
+
+@st.cache_resource
+def get_refresher():
+    # Một bộ làm mới nền cho cả tiến trình, dùng chung giữa các phiên
+    return build_refresher()
+
+
+def format_duration(seconds):
+    if seconds < 60:
+        return f'{int(seconds)} giây'
+    if seconds < 3600:
+        return f'{int(seconds // 60)} phút'
+    if seconds < 86400:
+        return f'{int(seconds // 3600)} giờ'
+    return f'{int(seconds // 86400)} ngày'
+
+
+SECTION_RENDERERS = {
+    'Tổng quan': render_overview,
+    'Chỉ số nhanh': render_quick_metrics,
+    'Nhóm & Thống kê': render_groups,
+    'Biểu đồ': render_charts,
+    'Phân tích nâng cao': render_advanced,
+    'Xuất & Mô tả': render_export,
+}
+SECTIONS = list(SECTION_RENDERERS)
 
 
 # --- Ứng dụng ---
@@ -34,122 +232,83 @@ st.markdown(
 )
 
 # Danh sách các framework và repository chính thức của chúng
-frameworks = {
+default_frameworks = {
     'React': 'facebook/react',
     'Vue': 'vuejs/core',
     'Angular': 'angular/angular'
 }
 
+# Catalog đã lưu (org / topic / tìm kiếm) được thêm sau các framework mặc định
+frameworks = {**default_frameworks, **load_catalog()}
+
 # --- Bộ lọc/thiết lập giao diện ---
-selected_frameworks, chart_type, show_watchers, show_issues = render_sidebar(frameworks)
+selected_frameworks, chart_type, show_watchers, show_issues, show_activity = render_sidebar(
+    frameworks, default=list(default_frameworks)
+)
+
+catalog_request = render_catalog_builder()
+if catalog_request:
+    with st.spinner('Đang tải catalog từ GitHub...'):
+        try:
+            count = build_catalog(*catalog_request)
+        except requests.exceptions.RequestException as e:
+            st.error(f"Lỗi khi tải catalog: {e}")
+        else:
+            st.toast(f'Catalog hiện có {count} repo')
+            st.rerun()
+
+if not selected_frameworks and len(frameworks) > len(default_frameworks):
+    st.info('Chọn ít nhất một repo trong thanh bên để bắt đầu phân tích.')
+    st.stop()
+
+# Lấy dữ liệu: khi đã có dữ liệu, trả về ngay bản gần nhất và làm mới ở luồng nền
+fetched_at = None
+if background_refresh_enabled():
+    refresher = get_refresher()
+    data, fetched_at = refresher.get(frameworks, selected_frameworks)
+else:
+    data = get_frameworks_data(frameworks, selected_frameworks)
+
+if data and fetched_at is not None:
+    age_col, refresh_col = st.columns([5, 1])
+    age_col.caption(
+        f'🕒 Dữ liệu cập nhật {format_duration(time.time() - fetched_at)} trước · '
+        f'tự làm mới ở nền khi cũ hơn {format_duration(refresher.max_age)}'
+    )
+    if refresh_col.button('Làm mới ngay', use_container_width=True):
+        refresher.request_refresh()
+        st.toast('Đang làm mới dữ liệu ở nền; trang sẽ dùng dữ liệu mới ở lần tải tiếp theo')
 
-# Lấy dữ liệu
-data = get_frameworks_data(frameworks, selected_frameworks)
+if data and show_activity:
+    # Job /stats/* chạy ở nền; trang dùng những kết quả đã xong và không chờ phần còn lại
+    repos = [record['Repo'] for record in data]
+    stats_poller = get_stats_poller().submit(repos)
+    data = merge_activity(data, stats_poller.results(repos))
+    progress = stats_poller.progress(repos)
+    waiting = progress['queued'] + progress['pending']
+    if waiting:
+        status_col, update_col = st.columns([5, 1])
+        status_col.caption(
+            f'⏳ GitHub đang tính chỉ số hoạt động: {progress["done"]}/{sum(progress.values())} job xong, '
+            f'{waiting} đang chờ'
+        )
+        if update_col.button('Cập nhật', use_container_width=True):
+            st.rerun()
 
 if not data:
     st.warning("Không thể lấy dữ liệu từ GitHub. Vui lòng thử lại sau.")
 else:
-    # DataFrame + xử lý
-    df = pd.DataFrame(data)
-    df = clean_and_cast(df)
-    df = add_metrics(df)
-
-    # Tabs layout
-    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
-        'Tổng quan', 'Chỉ số nhanh', 'Nhóm & Thống kê', 'Biểu đồ', 'Phân tích nâng cao', 'Xuất & Mô tả'
-    ])
-
-    with tab1:
-        st.subheader('Tổng quan dữ liệu')
-        highlight_cols = ['Stars', 'Forks'] + (['Open Issues'] if show_issues else [])
-        st.dataframe(
-            df[
-                ['Framework', 'Repo', 'License', 'Size (KB)', 'Created At', 'Updated At', 'Pushed At', 'Stars', 'Forks']
-                + (['Watchers'] if show_watchers else [])
-                + (['Open Issues'] if show_issues else [])
-                + ['Stars/Day (ước tính)', 'Stars/Fork', 'Tỉ lệ Issues/Stars', 'Tuổi repo (năm)']
-            ].style.highlight_max(axis=0, subset=highlight_cols, color='lightgreen')
-        )
+    # DataFrame + xử lý (cache theo fingerprint dữ liệu, dùng chung giữa các lần rerun và phiên)
+    # Bộ tích lũy online theo phiên: chỉ các repo thay đổi mới được cập nhật
+    catalog_stats = st.session_state.setdefault('catalog_stats', build_catalog_stats())
+    pipeline = Pipeline(data, acc=catalog_stats)
+    df = pipeline.frame()
+
+    # Chỉ mục đang mở được tính; các mục khác chỉ chạy khi người dùng chọn tới
+    section = st.segmented_control(
+        'Mục', SECTIONS, default=SECTIONS[0], key='section', label_visibility='collapsed'
+    ) or SECTIONS[0]
+    SECTION_RENDERERS[section](pipeline, df, chart_type, show_watchers, show_issues)
 
-    with tab2:
-        st.subheader('Chỉ số nhanh')
-        kpi1, kpi2, kpi3 = st.columns(3)
-        with kpi1:
-            st.metric('Tổng Stars', int(df['Stars'].sum()))
-        with kpi2:
-            st.metric('Tổng Forks', int(df['Forks'].sum()))
-        with kpi3:
-            st.metric('Tuổi repo trung bình (năm)', float(df['Tuổi repo (năm)'].mean().round(2)))
-
-    with tab3:
-        st.subheader('Nhóm theo License (nếu có)')
-        grouped = group_by_license(df, include_watchers=show_watchers, include_issues=show_issues)
-        st.dataframe(grouped)
-        st.subheader('Thống kê mô tả')
-        stats = describe_stats(df, include_watchers=show_watchers, include_issues=show_issues)
-        st.dataframe(stats)
-
-    with tab4:
-        st.subheader('Biểu đồ so sánh')
-        col1, col2 = st.columns(2)
-        with col1:
-            plot_stars(df, chart_type)
-        with col2:
-            plot_forks(df, chart_type)
-        if show_issues:
-            st.subheader('Tỷ lệ các vấn đề đang mở (Open Issues)')
-            plot_issues_pie(df)
-        st.subheader('Quan hệ Stars và Forks')
-        plot_scatter(df, show_issues)
-
-    with tab5:
-        st.subheader('Phân tích nâng cao')
-        
-        # Correlation Analysis
-        st.subheader('🔗 Phân tích tương quan')
-        corr_matrix = correlation_analysis(df)
-        plot_correlation_heatmap(corr_matrix)
-        
-        # Trend Analysis
-        st.subheader('📈 Phân tích xu hướng')
-        trend_data = trend_analysis(df)
-        plot_trend_analysis(trend_data, df)
-        
-        # Display trend results
-        if trend_data:
-            st.subheader('Kết quả phân tích xu hướng')
-            for analysis, result in trend_data.items():
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric(f"Tương quan ({analysis})", f"{result['correlation']}")
-                with col2:
-                    st.metric("P-value", f"{result['p_value']}")
-                with col3:
-                    st.metric("Ý nghĩa thống kê", result['significance'])
-        
-        # Statistical Insights
-        st.subheader('📊 Insights thống kê')
-        insights = statistical_insights(df)
-        plot_statistical_insights(insights, df)
-        
-        # Framework Comparison
-        st.subheader('🏆 So sánh Framework')
-        comparison_df = framework_comparison_analysis(df)
-        st.dataframe(comparison_df, use_container_width=True)
-        plot_framework_ranking(comparison_df)
-        
-        # Outliers Analysis
-        plot_outliers_analysis(insights, df)
-
-    with tab6:
-        st.subheader('Xuất kết quả')
-        export_col1, export_col2 = st.columns(2)
-        with export_col1:
-            csv_bytes = df.to_csv(index=False).encode('utf-8')
-            st.download_button('Tải CSV dữ liệu', data=csv_bytes, file_name='frameworks_summary.csv', mime='text/csv')
-        with export_col2:
-            report_bytes = build_html_report(df, stats, grouped)
-            st.download_button('Tải báo cáo HTML', data=report_bytes, file_name='report.html', mime='text/html')
-        st.subheader('Mô tả từ GitHub')
-        for _, row in df.iterrows():
-            st.markdown(f"**{row['Framework']}**: *{row['Description']}*")
\ No newline at end of file
+# Đặt cuối script để số liệu gồm cả lần chạy này
+render_diagnostics_panel()
@@ -0,0 +1,61 @@
+"""Compare two benchmark result files written by ``benchmarks.run``.
+
+Prints one line per case present in both files with the baseline and
+candidate timings (best of the repetitions) and their ratio; ratios above
+``--threshold`` are flagged as regressions::
+
+    python -m benchmarks.compare benchmarks/results/abc123.json benchmarks/results/def456.json
+"""
+
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _key(result):
+    size = result.get('rows', result.get('repos'))
+    return result['group'], result['name'], size
+
+
+def _seconds(result):
+    return result.get('best_s', result.get('seconds'))
+
+
+def compare(baseline, candidate, threshold=1.1):
+    """``(key, base_s, new_s, ratio, regressed)`` for the cases present in both reports."""
+    base = {_key(result): result for result in baseline['results']}
+    rows = []
+    for result in candidate['results']:
+        key = _key(result)
+        if key not in base:
+            continue
+        base_s, new_s = _seconds(base[key]), _seconds(result)
+        ratio = new_s / base_s if base_s else float('nan')
+        rows.append((key, base_s, new_s, ratio, ratio > threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=1.1, help='flag ratios above this as regressions')
+    args = parser.parse_args(argv)
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    print(f"baseline:  {baseline['environment'].get('commit')}  candidate: {candidate['environment'].get('commit')}")
+    rows = compare(baseline, candidate, args.threshold)
+    for (group, name, size), base_s, new_s, ratio, regressed in rows:
+        flag = '  REGRESSION' if regressed else ''
+        print(f"{group:<10} {name:<40} {size:>9,}  {base_s * 1000:10.1f} ms -> {new_s * 1000:10.1f} ms  "
+              f"x{ratio:5.2f}{flag}")
+    return 1 if any(row[-1] for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,281 @@
+"""Local stand-in for ``api.github.com`` used by the fetch benchmarks.
+
+Serves deterministic synthetic data for the endpoints the services call:
+
+- ``GET /repos/{owner}/{repo}`` (with ``ETag`` / ``If-None-Match`` -> 304)
+- ``GET /repos/{owner}/{repo}/stargazers`` (paginated, ``Link: next``;
+  ``422`` past ``stargazer_pages`` pages like GitHub's 400-page cap)
+- ``GET /repos/{owner}/{repo}/stats/*`` (``202`` for the first
+  ``stats_pending`` polls of each job, then ``200``)
+- ``GET /orgs/{org}/repos`` and ``GET /search/repositories`` (paginated)
+- ``POST /graphql`` (aliased ``repository`` lookups and the newest-first
+  ``stargazers`` connection)
+
+Every response carries ``X-RateLimit-Limit/Remaining/Reset`` headers from a
+fixed-window budget; an exhausted budget answers 403 like GitHub does.
+Latency and a random 502 rate can be configured to exercise pacing and
+retries. Point the app or the CLI at it with ``GITHUB_API_URL``::
+
+    python -m benchmarks.fake_github --port 8765 --latency 50 --limit 5000
+    GITHUB_API_URL=http://127.0.0.1:8765 python cli.py repos.txt --out out/
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from benchmarks.synthetic import repo_payload, stats_payload
+
+PER_PAGE = 30
+LIST_SIZE = 250
+STARGAZERS = 1_000
+STARGAZER_PAGES = 400
+
+
+class RateBudget:
+    """Fixed-window request budget mirroring GitHub's X-RateLimit-* headers."""
+
+    def __init__(self, limit=5000, window=3600):
+        self.limit = limit
+        self.window = window
+        self._lock = threading.Lock()
+        self._reset_at = time.time() + window
+        self._used = 0
+
+    def take(self):
+        """Spend one request; returns ``(allowed, remaining, reset_epoch)``."""
+        with self._lock:
+            now = time.time()
+            if now >= self._reset_at:
+                self._reset_at = now + self.window
+                self._used = 0
+            allowed = self._used < self.limit
+            if allowed:
+                self._used += 1
+            return allowed, self.limit - self._used, int(self._reset_at)
+
+
+class FakeGitHub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.0, limit=5000, window=3600, error_rate=0.0, seed=0, stats_pending=2,
+                 stargazers=STARGAZERS, stargazer_pages=STARGAZER_PAGES):
+        super().__init__(address, Handler)
+        self.stargazers = stargazers
+        self.stargazer_pages = stargazer_pages
+        self.latency = latency
+        self.error_rate = error_rate
+        self.stats_pending = stats_pending
+        self.stats_polls = {}
+        self.budget = RateBudget(limit, window)
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+        self._stats_lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, field):
+        with self._stats_lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def stats(self):
+        return {'requests': self.requests, 'errors': self.errors, 'throttled': self.throttled}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=None, headers=None):
+        payload = json.dumps(body).encode('utf-8') if body is not None else b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _admit(self):
+        """Apply latency, random failures and the rate budget; returns rate-limit headers or None."""
+        server = self.server
+        server.count('requests')
+        if server.latency:
+            time.sleep(server.latency)
+        allowed, remaining, reset = server.budget.take()
+        headers = {
+            'X-RateLimit-Limit': str(server.budget.limit),
+            'X-RateLimit-Remaining': str(max(remaining, 0)),
+            'X-RateLimit-Reset': str(reset),
+        }
+        if not allowed:
+            server.count('throttled')
+            self._send(403, {'message': 'API rate limit exceeded'}, headers)
+            return None
+        if server.error_rate and server.random.random() < server.error_rate:
+            server.count('errors')
+            self._send(502, {'message': 'Server Error'}, headers)
+            return None
+        return headers
+
+    def _page(self, items, parsed, headers):
+        query = parse_qs(parsed.query)
+        per_page = int(query.get('per_page', [PER_PAGE])[0])
+        page = int(query.get('page', ['1'])[0])
+        chunk = items[(page - 1) * per_page:page * per_page]
+        if page * per_page < len(items):
+            params = {key: values[0] for key, values in query.items()}
+            params['page'] = page + 1
+            next_url = f"{self.server.url}{parsed.path}?{urlencode(params)}"
+            headers = {**headers, 'Link': f'<{next_url}>; rel="next"'}
+        return chunk, headers
+
+    def do_GET(self):
+        headers = self._admit()
+        if headers is None:
+            return
+        parsed = urlparse(self.path)
+        path = parsed.path
+
+        match = re.fullmatch(r'/repos/([^/]+/[^/]+)/stargazers', path)
+        if match:
+            if int(parse_qs(parsed.query).get('page', ['1'])[0]) > self.server.stargazer_pages:
+                self._send(422, {'message': 'In order to keep the API fast for everyone, '
+                                            'pagination is limited for this resource.'}, headers)
+                return
+            stars = [{'starred_at': _starred_at(i), 'user': {'login': f'user-{i}'}}
+                     for i in range(self.server.stargazers)]
+            chunk, headers = self._page(stars, parsed, headers)
+            self._send(200, chunk, headers)
+            return
+
+        match = re.fullmatch(r'/repos/([^/]+/[^/]+)/stats/(\w+)', path)
+        if match:
+            with self.server._stats_lock:
+                polls = self.server.stats_polls[path] = self.server.stats_polls.get(path, 0) + 1
+            if polls <= self.server.stats_pending:
+                self._send(202, {}, headers)
+            else:
+                self._send(200, stats_payload(match.group(1), match.group(2)), headers)
+            return
+
+        match = re.fullmatch(r'/repos/([^/]+/[^/]+)', path)
+        if match:
+            body = repo_payload(match.group(1))
+            etag = '"%s"' % hashlib.md5(json.dumps(body, sort_keys=True).encode('utf-8')).hexdigest()
+            if self.headers.get('If-None-Match') == etag:
+                self._send(304, headers={**headers, 'ETag': etag})
+            else:
+                self._send(200, body, {**headers, 'ETag': etag})
+            return
+
+        match = re.fullmatch(r'/orgs/([^/]+)/repos', path)
+        if match:
+            repos = [repo_payload(f'{match.group(1)}/repo-{i}') for i in range(LIST_SIZE)]
+            chunk, headers = self._page(repos, parsed, headers)
+            self._send(200, chunk, headers)
+            return
+
+        if path == '/search/repositories':
+            repos = [repo_payload(f'search/repo-{i}') for i in range(LIST_SIZE)]
+            chunk, headers = self._page(repos, parsed, headers)
+            self._send(200, {'total_count': len(repos), 'items': chunk}, headers)
+            return
+
+        self._send(404, {'message': 'Not Found'}, headers)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        request = json.loads(self.rfile.read(length) or b'{}')
+        headers = self._admit()
+        if headers is None:
+            return
+        if urlparse(self.path).path != '/graphql':
+            self._send(404, {'message': 'Not Found'}, headers)
+            return
+        variables = request.get('variables', {})
+        if 'stargazers(' in request.get('query', ''):
+            self._send(200, {'data': {'repository': {'stargazers': self._stargazer_connection(variables)}}}, headers)
+            return
+        data = {}
+        for name in variables:
+            if not name.startswith('o'):
+                continue
+            alias = 'r' + name[1:]
+            rest = repo_payload(f"{variables[name]}/{variables['n' + name[1:]]}")
+            data[alias] = {
+                'stargazerCount': rest['stargazers_count'],
+                'forkCount': rest['forks_count'],
+                'watchers': {'totalCount': rest['subscribers_count']},
+                'issues': {'totalCount': rest['open_issues_count']},
+                'pullRequests': {'totalCount': 0},
+                'description': rest['description'],
+                'licenseInfo': {'spdxId': rest['license']['spdx_id']},
+                'createdAt': rest['created_at'],
+                'updatedAt': rest['updated_at'],
+                'pushedAt': rest['pushed_at'],
+                'diskUsage': rest['size'],
+            }
+        self._send(200, {'data': data}, headers)
+
+
+    def _stargazer_connection(self, variables, first=100):
+        # Newest first; the cursor is the index of the next (older) star
+        start = int(variables.get('after') or 0)
+        total = self.server.stargazers
+        indices = range(total - 1 - start, max(total - 1 - start - first, -1), -1)
+        end = start + len(indices)
+        return {
+            'pageInfo': {'hasNextPage': end < total, 'endCursor': str(end)},
+            'edges': [{'starredAt': _starred_at(i), 'node': {'login': f'user-{i}'}} for i in indices],
+        }
+
+
+def _starred_at(index):
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(1_500_000_000 + index * 3600))
+
+
+def start_server(port=0, **options):
+    """Start a FakeGitHub on a background thread; returns the server (``server.url``)."""
+    server = FakeGitHub(('127.0.0.1', port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local GitHub API stand-in for benchmarks.")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='added latency per request in ms')
+    parser.add_argument('--limit', type=int, default=5000, help='requests per rate-limit window')
+    parser.add_argument('--window', type=float, default=3600, help='rate-limit window in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with 502')
+    parser.add_argument('--stats-pending', type=int, default=2, help='202 answers before /stats/* data is ready')
+    parser.add_argument('--stargazers', type=int, default=STARGAZERS, help='stargazers per repository')
+    parser.add_argument('--stargazer-pages', type=int, default=STARGAZER_PAGES,
+                        help='stargazer pages served before answering 422')
+    args = parser.parse_args(argv)
+    server = FakeGitHub(('127.0.0.1', args.port), latency=args.latency / 1000, limit=args.limit,
+                        window=args.window, error_rate=args.error_rate, stats_pending=args.stats_pending,
+                        stargazers=args.stargazers, stargazer_pages=args.stargazer_pages)
+    print(f"Serving fake GitHub API on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
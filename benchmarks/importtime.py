@@ -0,0 +1,180 @@
+"""Cold-start import budget check based on ``python -X importtime``.
+
+Every entry point is imported in a fresh interpreter with ``-X importtime``.
+Its cost is the summed cumulative time of the modules it pulls in beyond
+the interpreter's own startup imports, taking the best of ``--repeat``
+runs. Costs are reported relative to the wall time of ``python -c pass``
+measured in the same run, so the budget in ``import_budget.json`` holds
+ratios that carry over between machines.
+
+The check fails (exit code 1) when an entry imports a module it must leave
+to the code that needs it, e.g. SciPy or ``plotly.express`` at app startup;
+``tests/test_imports.py`` runs the same check under pytest. Going over the
+timing budget is reported, and only fails with ``--strict``. The ``app``
+entry is the set of modules ``app.py`` imports at the top, which is what
+the first render waits for.
+
+    python -m benchmarks.importtime                 # forbidden imports + timing report
+    python -m benchmarks.importtime --strict        # also fail on the timing budget
+    python -m benchmarks.importtime --update        # re-baseline the ratios
+"""
+
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'import_budget.json')
+# --update records the measured ratios as they are; this is the only allowance for noise
+DEFAULT_TOLERANCE = 1.2
+
+
+def app_imports(path=os.path.join(ROOT, 'app.py')):
+    """Modules imported at the top level of ``app.py`` (not inside functions)."""
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def parse_importtime(stderr):
+    """``{module: (cumulative_us, depth)}`` from ``-X importtime`` output, in import order."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' '))) // 2
+        modules.setdefault(name.strip(), (int(cumulative), depth))
+    return modules
+
+
+def _run(code):
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT, capture_output=True,
+                            text=True, env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'})
+    if result.returncode != 0:
+        raise RuntimeError(f"importing failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def startup_ms(repeat=3):
+    """Best-of-``repeat`` wall time of ``python -c pass``, the unit for import costs."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], cwd=ROOT, check=True)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def loaded_modules(modules):
+    """Names in ``sys.modules`` after importing ``modules`` in a fresh interpreter."""
+    code = '; '.join(f'import {module}' for module in modules + ['json', 'sys'])
+    code += '; print(json.dumps(sorted(sys.modules)))'
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"importing failed:\n{result.stderr[-2000:]}")
+    return set(json.loads(result.stdout.strip().splitlines()[-1]))
+
+
+def forbidden_imports(entry, loaded=None):
+    """Modules (or their submodules) from ``entry['forbid']`` that importing the entry loads."""
+    loaded = loaded_modules(entry['modules']) if loaded is None else loaded
+    return sorted(module for module in entry['forbid']
+                  if module in loaded or any(m.startswith(module + '.') for m in loaded))
+
+
+def measure(modules, repeat=3):
+    """Best-of-``repeat`` import cost in ms and the set of modules loaded."""
+    startup = set(_run('pass'))
+    best, loaded = None, set()
+    for _ in range(repeat):
+        imported = _run('; '.join(f'import {module}' for module in modules))
+        total = sum(us for name, (us, depth) in imported.items() if depth == 0 and name not in startup)
+        loaded = set(imported)
+        best = total if best is None else min(best, total)
+    return best / 1000, loaded
+
+
+def default_entries():
+    return {
+        'app': {'modules': app_imports(), 'forbid': ['scipy', 'plotly.express', 'plotly.figure_factory']},
+        'cli': {'modules': ['cli'], 'forbid': ['scipy', 'plotly', 'streamlit']},
+        'services.pipeline': {'modules': ['services.pipeline'], 'forbid': ['scipy', 'plotly', 'streamlit']},
+        'services.github_api': {'modules': ['services.github_api'], 'forbid': ['pandas', 'scipy', 'plotly']},
+        'components.charts': {'modules': ['components.charts'],
+                              'forbid': ['scipy', 'plotly.express', 'plotly.figure_factory']},
+    }
+
+
+def load_budget(path=BUDGET_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def check(entries, budget, repeat, tolerance):
+    """Measure every entry; returns ``(unit_ms, rows, failures, over_budget)``.
+
+    Rows are ``(name, ms, ratio, limit, forbidden)`` with ``ratio = ms / unit_ms``.
+    """
+    unit = startup_ms(repeat)
+    rows, failures, over_budget = [], [], []
+    for name, entry in entries.items():
+        ms, loaded = measure(entry['modules'], repeat)
+        ratio = ms / unit
+        limit = budget.get(name)
+        forbidden = forbidden_imports(entry, loaded)
+        rows.append((name, ms, ratio, limit, forbidden))
+        if forbidden:
+            failures.append(f"{name}: imports {', '.join(forbidden)}")
+        if limit is not None and ratio > limit * tolerance:
+            over_budget.append(f"{name}: {ratio:.1f}x startup > budget {limit:.1f}x x {tolerance}")
+    return unit, rows, failures, over_budget
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-start import budget check (python -X importtime).")
+    parser.add_argument('--repeat', type=int, default=3, help='fresh interpreters per entry (best is kept)')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='allowed factor over the budget ratio')
+    parser.add_argument('--strict', action='store_true', help='fail when an entry is over its timing budget')
+    parser.add_argument('--update', action='store_true', help='write the measured ratios as budget')
+    parser.add_argument('--budget', default=BUDGET_PATH)
+    args = parser.parse_args(argv)
+
+    entries = default_entries()
+    budget = load_budget(args.budget)
+    unit, rows, failures, over_budget = check(entries, budget, args.repeat, args.tolerance)
+    print(f"{'python -c pass':<22} {unit:8.0f} ms")
+    for name, ms, ratio, limit, forbidden in rows:
+        limit_text = f"{limit:6.1f}x" if limit is not None else '     - '
+        print(f"{name:<22} {ms:8.0f} ms {ratio:6.1f}x  budget {limit_text}  "
+              f"{'forbidden: ' + ', '.join(forbidden) if forbidden else ''}")
+
+    if args.update:
+        with open(args.budget, 'w', encoding='utf-8') as f:
+            json.dump({name: round(ratio, 1) for name, _, ratio, _, _ in rows}, f, indent=2)
+            f.write('\n')
+        print(f"Budget written to {args.budget}")
+        return 0
+    for message in over_budget:
+        print(f"{'FAIL' if args.strict else 'WARN'} {message}", file=sys.stderr)
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    return 1 if failures or (args.strict and over_budget) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,246 @@
+"""Benchmark runner: processing, report and figure timings plus offline fetch throughput.
+
+Processing benchmarks time every stage on synthetic catalogs of the given
+sizes; fetch benchmarks run ``get_frameworks_data`` against the local GitHub
+stand-in (``benchmarks.fake_github``). Results are written as JSON together
+with the commit and library versions, so runs can be compared across
+commits with ``python -m benchmarks.compare``.
+
+Examples::
+
+    python -m benchmarks.run                                  # 10, 1k, 100k rows + fetch
+    python -m benchmarks.run --sizes 10 1k 100k 1M --repeat 5
+    python -m benchmarks.run --skip-processing --fetch-repos 500 --latency 80 --error-rate 0.05
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Fetch benchmarks must never touch the real API or the user's caches; these
+# are read when the services create their singletons, so set them first
+os.environ.setdefault('GITHUB_CACHE_PATH', '')
+os.environ.setdefault('GITHUB_SNAPSHOT_PATH', '')
+os.environ.setdefault('GITHUB_SHARED_CACHE_PATH', '')
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import generate_frame, parse_size
+
+DEFAULT_SIZES = ['10', '1k', '100k']
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def measure(func, repeat=3, setup=None):
+    """Run ``func`` ``repeat`` times; returns (best, median) wall time in seconds.
+
+    ``setup`` runs untimed before each repetition and may return the arguments for ``func``.
+    """
+    timings = []
+    for _ in range(repeat):
+        args = (setup() or ()) if setup else ()
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), statistics.median(timings)
+
+
+def processing_cases(raw, max_html_rows, bootstrap):
+    """``(group, name, func, setup)`` for every stage, given one raw synthetic frame."""
+    from services import processing as P
+    from services.exporting import arrow_available, build_html_report, iter_table
+
+    df = P.add_metrics(P.clean_and_cast(raw))
+    stats = P.describe_stats(df, True, True)
+    grouped = P.group_by_license(df, True, True)
+    insights_cols = [col for col in ['Stars', 'Forks', 'Watchers', 'Open Issues'] if col in df.columns]
+
+    cases = [
+        ('processing', 'clean_and_cast', P.clean_and_cast, lambda: (raw,)),
+        ('processing', 'clean_and_cast(compact)', lambda frame: P.clean_and_cast(frame, compact=True),
+         lambda: (raw,)),
+        ('processing', 'add_metrics', P.add_metrics, lambda: (P.clean_and_cast(raw),)),
+        ('processing', 'describe_stats', lambda: P.describe_stats(df, True, True), None),
+        ('processing', 'group_by_license', lambda: P.group_by_license(df, True, True), None),
+        ('processing', 'correlation_analysis', lambda: P.correlation_analysis(df), None),
+        ('processing', 'correlation_tables', lambda: P.correlation_tables(df, 'holm'), None),
+        ('processing', 'trend_analysis', lambda: P.trend_analysis(df), None),
+        ('processing', 'moment_kernel', lambda: P.moment_kernel(df, insights_cols), None),
+        ('processing', 'statistical_insights', lambda: P.statistical_insights(df), None),
+        ('processing', 'rank_metrics', lambda: P.rank_metrics(df), None),
+        ('processing', 'framework_comparison_analysis', lambda: P.framework_comparison_analysis(df), None),
+        ('processing', 'top_k_frameworks', lambda: P.top_k_frameworks(df, k=10), P._top_k_cache.clear),
+        ('processing', 'catalog_stats.sync', lambda acc: acc.sync(df), lambda: (P.build_catalog_stats(),)),
+    ]
+    if bootstrap and len(df) * bootstrap <= 100_000_000:
+        cases.append(('processing', f'uncertainty_analysis(B={bootstrap})',
+                      lambda: P.uncertainty_analysis(df, n_resamples=bootstrap, seed=0), None))
+    if len(df) <= max_html_rows:
+        cases.append(('export', 'build_html_report', lambda: build_html_report(df, stats, grouped), None))
+    for fmt in ('csv', 'parquet', 'arrow'):
+        if fmt == 'csv' or arrow_available():
+            cases.append(('export', f'iter_table({fmt})', lambda fmt=fmt: b''.join(iter_table(df, fmt)), None))
+    cases.extend(figure_cases(df))
+    return cases
+
+
+def figure_cases(df):
+    """Figure construction (build only, no Streamlit rendering)."""
+    from components import charts
+    from services.processing import correlation_analysis, statistical_insights, top_k_frameworks, trend_analysis
+
+    corr = correlation_analysis(df)
+    trend = trend_analysis(df)
+    insights = statistical_insights(df)
+    cv = {key: value for key, value in insights.items() if key.endswith('_cv')}
+    top = top_k_frameworks(df, k=10)
+    builds = [
+        ('build_stars_figure', lambda: charts.build_stars_figure(df, 'Cột')),
+        ('build_forks_figure', lambda: charts.build_forks_figure(df, 'Đường')),
+        ('build_issues_pie_figure', lambda: charts.build_issues_pie_figure(df)),
+        ('build_scatter_figure', lambda: charts.build_scatter_figure(df, True)),
+        ('build_correlation_heatmap_figure', lambda: charts.build_correlation_heatmap_figure(corr)),
+        ('build_trend_figure', lambda: charts.build_trend_figure(trend, df)),
+        ('build_cv_figure', lambda: charts.build_cv_figure(cv)),
+        ('build_ranking_figure', lambda: charts.build_ranking_figure(top)),
+    ]
+    # Figure JSON size is what the browser receives
+    return [('figures', name, lambda build=build: build().to_json(), None) for name, build in builds]
+
+
+def run_processing(sizes, repeat, max_html_rows, bootstrap, log):
+    results = []
+    for label in sizes:
+        n = parse_size(label)
+        log(f"processing: generating {n:,} rows")
+        raw = generate_frame(n, seed=0)
+        for group, name, func, setup in processing_cases(raw, max_html_rows, bootstrap):
+            reps = repeat if n < 1_000_000 else 1
+            best, median = measure(func, reps, setup)
+            results.append({'group': group, 'name': name, 'rows': n, 'best_s': best, 'median_s': median,
+                            'repeat': reps})
+            log(f"  {name:<40} {n:>9,} rows  {best * 1000:10.1f} ms")
+    return results
+
+
+def _reset_fetch_state():
+    """Fresh scheduler, response cache and memo so every scenario starts cold with its own settings."""
+    from services import github_api, github_graphql
+    github_api.get_framework_data.clear()
+    github_graphql.get_batch_data.clear()
+    github_api._scheduler = None
+    github_api._response_cache = None
+    github_api._shared_cache = None
+
+
+def run_fetch(n_repos, latency, limit, error_rate, workers, rps, log):
+    from benchmarks.fake_github import start_server
+    from services import github_api
+
+    frameworks = {f'repo-{i}': f'bench-org/repo-{i}' for i in range(n_repos)}
+    scenarios = [
+        ('rest', {'error_rate': 0.0}, {}),
+        ('rest+errors', {'error_rate': error_rate}, {}),
+        ('rest+rate_limited', {'limit': max(1, n_repos // 2), 'window': 2.0}, {}),
+        ('rest+etag_revalidate', {}, {'GITHUB_CACHE_PATH': os.path.join(tempfile.mkdtemp(), 'responses.sqlite')}),
+        ('graphql', {}, {'GITHUB_BACKEND': 'graphql', 'GITHUB_TOKEN': 'benchmark'}),
+    ]
+    results = []
+    for name, server_options, env in scenarios:
+        options = {'latency': latency / 1000, 'limit': limit, 'error_rate': 0.0, **server_options}
+        server = start_server(**options)
+        env = {'GITHUB_API_URL': server.url, 'GITHUB_RATE_LIMIT_RPS': str(rps),
+               'GITHUB_RATE_LIMIT_BURST': str(max(1, int(rps))), **env}
+        saved = {key: os.environ.get(key) for key in env}
+        os.environ.update(env)
+        try:
+            _reset_fetch_state()
+            if name == 'rest+etag_revalidate':
+                # Warm the persistent cache, then time the conditional (304) refresh
+                github_api.get_frameworks_data(frameworks, [], max_workers=workers)
+                github_api.get_framework_data.clear()
+            start = time.perf_counter()
+            records = github_api.get_frameworks_data(frameworks, [], max_workers=workers)
+            elapsed = time.perf_counter() - start
+            scheduler = github_api.get_scheduler().stats()
+        finally:
+            server.shutdown()
+            server.server_close()
+            for key, value in saved.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+        results.append({
+            'group': 'fetch', 'name': name, 'repos': n_repos, 'fetched': len(records), 'seconds': elapsed,
+            'repos_per_s': len(records) / elapsed if elapsed else None, 'latency_ms': latency,
+            'server': server.stats(), 'retries': scheduler['retries'], 'throttled': scheduler['throttled'],
+        })
+        log(f"  fetch {name:<24} {len(records):>5}/{n_repos} repos  {elapsed:7.2f} s  "
+            f"retries={scheduler['retries']} server={server.stats()}")
+    _reset_fetch_state()
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': pd.Timestamp.now(tz='UTC').isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES, help='row counts, e.g. 10 1k 100k 1M')
+    parser.add_argument('--repeat', type=int, default=3, help='repetitions per case (1M rows: always 1)')
+    parser.add_argument('--max-html-rows', type=int, default=100_000, help='skip the HTML report above this size')
+    parser.add_argument('--bootstrap', type=int, default=1000, help='resamples for uncertainty_analysis (0: skip)')
+    parser.add_argument('--skip-processing', action='store_true')
+    parser.add_argument('--skip-fetch', action='store_true')
+    parser.add_argument('--fetch-repos', type=int, default=200, help='repositories per fetch scenario')
+    parser.add_argument('--latency', type=float, default=50, help='stand-in latency per request in ms')
+    parser.add_argument('--limit', type=int, default=5000, help='stand-in rate limit per window')
+    parser.add_argument('--error-rate', type=float, default=0.1, help='502 rate for the rest+errors scenario')
+    parser.add_argument('--workers', type=int, default=None, help='fetch concurrency (default: GITHUB_MAX_WORKERS)')
+    parser.add_argument('--rps', type=float, default=100, help='client-side pacing for the fetch runs (GITHUB_RATE_LIMIT_RPS)')
+    parser.add_argument('--out', help='output JSON file (default: benchmarks/results/<commit>.json)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    log = lambda message: print(message, file=sys.stderr, flush=True)
+    report = {'environment': environment(), 'results': []}
+    if not args.skip_processing:
+        report['results'] += run_processing(args.sizes, args.repeat, args.max_html_rows, args.bootstrap, log)
+    if not args.skip_fetch:
+        report['results'] += run_fetch(args.fetch_repos, args.latency, args.limit, args.error_rate,
+                                       args.workers, args.rps, log)
+
+    out = args.out or os.path.join(RESULTS_DIR, f"{report['environment']['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    log(f"Results written to {out}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
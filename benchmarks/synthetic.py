@@ -0,0 +1,99 @@
+"""Synthetic repository records in the shape returned by ``get_framework_data``.
+
+Values follow heavy-tailed distributions similar to real GitHub data (a
+few huge repositories, a long tail of small ones), so the analyses see
+realistic skew, ties and zeros. Generation is vectorized and seeded, so
+every size is reproducible across runs and commits.
+"""
+
+import zlib
+
+import numpy as np
+import pandas as pd
+
+SIZES = {'10': 10, '1k': 1_000, '100k': 100_000, '1M': 1_000_000}
+# build_record maps a missing license to 'NOASSERTION'
+LICENSES = ['MIT', 'Apache-2.0', 'GPL-3.0', 'BSD-3-Clause', 'MPL-2.0', 'NOASSERTION']
+LICENSE_WEIGHTS = [0.45, 0.2, 0.08, 0.07, 0.03, 0.17]
+
+
+def parse_size(label):
+    """``'1k'`` / ``'1M'`` / ``'250'`` -> number of rows."""
+    if label in SIZES:
+        return SIZES[label]
+    multiplier = {'k': 1_000, 'M': 1_000_000}.get(label[-1:], 1)
+    return int(float(label.rstrip('kM')) * multiplier)
+
+
+def generate_frame(n: int, seed: int = 0) -> pd.DataFrame:
+    """Raw (uncleaned) records as a DataFrame, i.e. ``pd.DataFrame(records)``."""
+    rng = np.random.default_rng(seed)
+    stars = np.floor(rng.pareto(1.1, n) * 200).astype(np.int64)
+    forks = np.floor(stars * rng.uniform(0.02, 0.3, n) + rng.pareto(2.0, n) * 5).astype(np.int64)
+    watchers = np.floor(stars * rng.uniform(0.001, 0.03, n)).astype(np.int64)
+    issues = np.floor(rng.pareto(1.5, n) * 20).astype(np.int64)
+    size_kb = np.floor(rng.lognormal(8, 2, n)).astype(np.int64)
+
+    now = pd.Timestamp('2025-01-01', tz='UTC')
+    created = now - pd.to_timedelta(rng.integers(1, 15 * 365, n), unit='D')
+    pushed = now - pd.to_timedelta(rng.integers(0, 365, n), unit='D')
+    iso = lambda stamps: stamps.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+    names = pd.Index(np.arange(n)).map(lambda i: f'repo-{i}')
+    return pd.DataFrame({
+        'Framework': names,
+        'Repo': 'org-' + pd.Series(np.arange(n) % 997).astype(str) + '/' + names,
+        'Stars': stars,
+        'Forks': forks,
+        'Watchers': watchers,
+        'Open Issues': issues,
+        'Description': 'Synthetic repository ' + names,
+        'License': rng.choice(np.array(LICENSES, dtype=object), n, p=LICENSE_WEIGHTS),
+        'Created At': iso(created),
+        'Updated At': iso(pushed),
+        'Pushed At': iso(pushed),
+        'Size (KB)': size_kb,
+    })
+
+
+def generate_records(n: int, seed: int = 0) -> list:
+    """Records as a list of dicts, exactly like ``get_frameworks_data`` returns."""
+    return generate_frame(n, seed).to_dict('records')
+
+
+def repo_payload(repo_path: str) -> dict:
+    """Deterministic REST ``/repos/{path}`` payload for the local GitHub stand-in."""
+    rng = np.random.default_rng(zlib.crc32(repo_path.encode('utf-8')))
+    stars = int(rng.pareto(1.1) * 200)
+    license_id = LICENSES[int(rng.integers(len(LICENSES)))]
+    return {
+        'full_name': repo_path,
+        'stargazers_count': stars,
+        'forks_count': int(stars * rng.uniform(0.02, 0.3)),
+        'subscribers_count': int(stars * rng.uniform(0.001, 0.03)),
+        'open_issues_count': int(rng.pareto(1.5) * 20),
+        'description': f'Synthetic repository {repo_path}',
+        'license': {'spdx_id': license_id},
+        'created_at': '2018-05-01T00:00:00Z',
+        'updated_at': '2025-01-01T00:00:00Z',
+        'pushed_at': '2025-01-01T00:00:00Z',
+        'size': int(rng.lognormal(8, 2)),
+        'archived': False,
+    }
+
+
+def stats_payload(repo_path: str, endpoint: str):
+    """Deterministic ``/repos/{path}/stats/{endpoint}`` payload (52 weeks of activity)."""
+    rng = np.random.default_rng(zlib.crc32(f'{repo_path}/{endpoint}'.encode('utf-8')))
+    weekly = rng.poisson(rng.uniform(1, 60), 52)
+    start = 1_700_000_000
+    if endpoint == 'commit_activity':
+        return [{'total': int(total), 'week': start + i * 604800, 'days': [0] * 7} for i, total in enumerate(weekly)]
+    if endpoint == 'contributors':
+        return [{'total': int(n), 'author': {'login': f'user-{i}'}, 'weeks': []}
+                for i, n in enumerate(rng.integers(1, 500, int(rng.integers(1, 101))))]
+    if endpoint == 'code_frequency':
+        return [[start + i * 604800, int(total * 40), -int(total * 25)] for i, total in enumerate(weekly)]
+    if endpoint == 'participation':
+        return {'all': weekly.tolist(), 'owner': (weekly // 4).tolist()}
+    return []
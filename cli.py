@@ -0,0 +1,203 @@
+"""Headless batch runner for the framework analysis pipeline.
+
+Reads a repository list, fetches every repository, runs clean_and_cast ->
+add_metrics -> every analysis in services/processing and writes the results
+to an output directory. Streamlit and Plotly are never imported, so it runs
+from cron or in parallel workers.
+
+Repository list format: one repository per line, either ``owner/repo`` or
+``Name owner/repo``; blank lines and ``#`` comments are ignored.
+
+Examples::
+
+    python cli.py repos.txt --out out/
+    python cli.py repos.txt --out out/ --workers 4 --format csv parquet arrow html
+    python cli.py repos.txt --out out/shard-0 --shard 0/4
+    python cli.py repos.txt --out out/ --activity 300
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from services import diagnostics
+from services.correlation import correlation_pairs
+from services.exporting import iter_html_report, iter_table, write_chunks
+from services.github_api import get_frameworks_data
+from services.github_stats import collect_activity
+from services.pipeline import Pipeline
+from services.processing import memory_report
+
+FORMATS = ('csv', 'parquet', 'arrow', 'html')
+
+
+def read_repo_list(path):
+    """Parse a repository list file into an ordered ``{name: owner/repo}`` dict."""
+    frameworks = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            parts = line.replace(',', ' ').split()
+            repo_path = parts[-1]
+            name = ' '.join(parts[:-1]) or repo_path
+            frameworks[name] = repo_path
+    return frameworks
+
+
+def select_shard(frameworks, shard):
+    """Keep the ``index``-th of ``count`` round-robin shards (``shard`` is ``"index/count"``)."""
+    index, count = (int(part) for part in shard.split('/'))
+    if not 0 <= index < count:
+        raise ValueError(f"invalid shard {shard!r}")
+    return dict(item for i, item in enumerate(frameworks.items()) if i % count == index)
+
+
+def split_evenly(items, parts):
+    """Split ``items`` into ``parts`` contiguous chunks, preserving order."""
+    size, extra = divmod(len(items), parts)
+    chunks, start = [], 0
+    for i in range(parts):
+        end = start + size + (1 if i < extra else 0)
+        chunks.append(items[start:end])
+        start = end
+    return [chunk for chunk in chunks if chunk]
+
+
+def fetch_shard(items):
+    """Worker entry point: fetch one shard of ``(name, repo_path)`` pairs."""
+    return get_frameworks_data(dict(items), [])
+
+
+def fetch_all(frameworks, workers=1):
+    """Fetch every repository, sharded across ``workers`` processes."""
+    items = list(frameworks.items())
+    if workers <= 1 or len(items) <= 1:
+        return fetch_shard(items)
+    shards = split_evenly(items, workers)
+    with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+        return [record for shard in executor.map(fetch_shard, shards) for record in shard]
+
+
+def write_table(df, out_dir, name, formats, index=False):
+    for fmt in ('csv', 'parquet', 'arrow'):
+        if fmt in formats:
+            write_chunks(iter_table(df, fmt, index=index), os.path.join(out_dir, f'{name}.{fmt}'))
+
+
+def json_safe(value):
+    """``value`` with NaN/inf replaced by ``None`` and NumPy scalars by Python numbers."""
+    if isinstance(value, dict):
+        return {key: json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_safe(item) for item in value]
+    if hasattr(value, 'item') and getattr(value, 'ndim', None) == 0:
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def write_json(data, out_dir, name):
+    # Strict JSON: NaN is not valid JSON and breaks most parsers
+    with open(os.path.join(out_dir, f'{name}.json'), 'w', encoding='utf-8') as f:
+        json.dump(json_safe(data), f, ensure_ascii=False, indent=2, default=str, allow_nan=False)
+
+
+def run(frameworks, out_dir, formats=('csv', 'html'), workers=1, include_watchers=True, include_issues=True,
+        compact=None, memory=False, bootstrap=0, seed=0, activity=None):
+    """Run fetch -> pipeline -> outputs; returns the number of repositories processed."""
+    records = fetch_all(frameworks, workers)
+    if not records:
+        return 0
+    if activity is not None:
+        records = collect_activity(records, timeout=activity or None)
+
+    os.makedirs(out_dir, exist_ok=True)
+    pipeline = Pipeline(records, compact=compact)
+    df = pipeline.frame()
+    if memory:
+        baseline = Pipeline(records, compact=False).frame()
+        compact_frame = df if pipeline.compact else Pipeline(records, compact=True).frame()
+        write_table(memory_report(baseline, compact_frame), out_dir, 'memory_report', ('csv',), index=True)
+    stats = pipeline.describe(include_watchers, include_issues)
+    grouped = pipeline.grouped(include_watchers, include_issues)
+
+    write_table(df, out_dir, 'frameworks_summary', formats)
+    write_table(stats, out_dir, 'describe_stats', formats, index=True)
+    # Parquet needs flat string column names
+    grouped_flat = grouped.copy()
+    grouped_flat.columns = [f'{col} {agg}' for col, agg in grouped.columns]
+    write_table(grouped_flat, out_dir, 'group_by_license', formats, index=True)
+    write_table(pipeline.correlation(), out_dir, 'correlation', formats, index=True)
+    write_table(correlation_pairs(pipeline.correlations('holm')), out_dir, 'correlation_pairs', formats)
+    write_table(pipeline.comparison(), out_dir, 'framework_comparison', formats)
+    write_json(pipeline.trend(), out_dir, 'trend_analysis')
+    if bootstrap:
+        for name, table in pipeline.uncertainty(bootstrap, seed).items():
+            write_table(table, out_dir, f'bootstrap_{name}', formats)
+    write_json(pipeline.insights(), out_dir, 'statistical_insights')
+    if 'html' in formats:
+        write_chunks(iter_html_report(df, stats, grouped), os.path.join(out_dir, 'report.html'))
+    return len(df)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('repo_list', help='file with one repository per line (owner/repo or "Name owner/repo")')
+    parser.add_argument('--out', default='output', help='output directory (default: output)')
+    parser.add_argument('--format', nargs='+', choices=FORMATS, default=['csv', 'html'], dest='formats',
+                        help='output formats (default: csv html; parquet and arrow need pyarrow)')
+    parser.add_argument('--workers', type=int, default=1, help='worker processes to shard fetching across')
+    parser.add_argument('--shard', help='only process shard INDEX/COUNT of the list, e.g. 0/4')
+    parser.add_argument('--compact', action=argparse.BooleanOptionalAction, default=None,
+                        help='force the compact column schema on/off (default: automatic for large lists)')
+    parser.add_argument('--memory-report', action='store_true',
+                        help='write memory_report.csv comparing the default and compact schemas')
+    parser.add_argument('--bootstrap', type=int, default=0, metavar='B',
+                        help='also write bootstrap intervals / permutation tests with B resamples')
+    parser.add_argument('--seed', type=int, default=0, help='random seed for --bootstrap (default: 0)')
+    parser.add_argument('--diagnostics', action='store_true',
+                        help='write stage timings, cache and rate-limit stats (diagnostics.json / .prom)')
+    parser.add_argument('--activity', type=float, nargs='?', const=0, default=None, metavar='SECONDS',
+                        help='add commit/contributor activity from /stats/*, waiting at most SECONDS (0: no limit)')
+    parser.add_argument('--no-watchers', action='store_true', help='leave Watchers out of the summary tables')
+    parser.add_argument('--no-issues', action='store_true', help='leave Open Issues out of the summary tables')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Batch runs wait for the rate-limit window instead of failing fast like the dashboard
+    os.environ['GITHUB_INTERACTIVE_MAX_WAIT'] = ''
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(message)s')
+    if args.diagnostics:
+        diagnostics.enable()
+    frameworks = read_repo_list(args.repo_list)
+    if args.shard:
+        frameworks = select_shard(frameworks, args.shard)
+    count = run(
+        frameworks, args.out, formats=args.formats, workers=args.workers,
+        include_watchers=not args.no_watchers, include_issues=not args.no_issues,
+        compact=args.compact, memory=args.memory_report, bootstrap=args.bootstrap, seed=args.seed,
+        activity=args.activity,
+    )
+    if not count:
+        logging.error('No repository data could be fetched.')
+        return 1
+    if args.diagnostics:
+        with open(os.path.join(args.out, 'diagnostics.json'), 'w', encoding='utf-8') as f:
+            f.write(diagnostics.to_json())
+        with open(os.path.join(args.out, 'diagnostics.prom'), 'w', encoding='utf-8') as f:
+            f.write(diagnostics.to_prometheus())
+    logging.info('Processed %d repositories into %s', count, args.out)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,72 +1,193 @@
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
-import plotly.figure_factory as ff
+import plotly.io as pio
 import streamlit as st
 
+from services import diagnostics
+from services.cache_utils import LRUCache, frame_fingerprint
 
-def plot_stars(df, chart_type: str):
-    if chart_type == 'Cột':
-        fig = px.bar(
-            df,
-            x='Framework', y='Stars', color='Framework', text='Stars',
-            title='So sánh số lượng Sao (Stars)', labels={'Stars': 'Số lượng Sao', 'Framework': 'Framework'}
-        )
-        fig.update_traces(texttemplate='%{text:.2s}', textposition='outside')
-    else:
-        fig = px.line(
-            df.sort_values('Stars', ascending=False),
-            x='Framework', y='Stars', color='Framework', markers=True,
-            title='So sánh số lượng Sao (Stars) - Line', labels={'Stars': 'Số lượng Sao', 'Framework': 'Framework'}
-        )
-    fig.update_layout(
-        template='plotly_dark', 
-        legend_title_text='Framework',
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(color='#ffffff')
+
+# plotly.express (~0.3 s khi nạp) chỉ được import trong các hàm dựng biểu đồ cần nó,
+# để mở app / chạy các mục không có biểu đồ không phải trả chi phí này
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+# Chế độ dữ liệu lớn: payload của biểu đồ không tăng theo số repo
+# - từ WEBGL_THRESHOLD điểm: scatter chuyển sang Scattergl, cột gom thành top-N + "Khác"
+# - từ DENSITY_THRESHOLD điểm: scatter được gom thành lưới mật độ DENSITY_BINS x DENSITY_BINS
+WEBGL_THRESHOLD = _env_int('CHART_WEBGL_THRESHOLD', 500)
+DENSITY_THRESHOLD = _env_int('CHART_DENSITY_THRESHOLD', 20000)
+TOP_N = _env_int('CHART_TOP_N', 25)
+DENSITY_BINS = _env_int('CHART_DENSITY_BINS', 60)
+OTHER_LABEL = 'Khác'
+
+# Theme dùng chung cho mọi biểu đồ: plotly_dark với nền trong suốt và chữ trắng
+THEME = 'github_stats'
+pio.templates[THEME] = go.layout.Template(pio.templates['plotly_dark'])
+pio.templates[THEME].layout.update(
+    plot_bgcolor='rgba(0,0,0,0)',
+    paper_bgcolor='rgba(0,0,0,0)',
+    font=dict(color='#ffffff')
+)
+
+# Figure đã dựng (dạng JSON) theo (fingerprint dữ liệu, hàm vẽ, tùy chọn)
+_figure_cache = LRUCache(maxsize=_env_int('CHART_CACHE_SIZE', 64))
+diagnostics.register_source('figure_cache', _figure_cache.stats)
+
+
+def get_figure_cache() -> LRUCache:
+    return _figure_cache
+
+
+def data_fingerprint(data) -> str:
+    """Hash nội dung đầu vào của biểu đồ (DataFrame hoặc dict/list kết quả phân tích)."""
+    if isinstance(data, pd.DataFrame):
+        return frame_fingerprint(data)
+    payload = json.dumps(data, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def cached_figure(build, *data, options=()):
+    """Dựng figure bằng ``build(*data, *options)`` hoặc lấy lại bản JSON đã cache."""
+    key = (build.__name__, tuple(data_fingerprint(item) for item in data), options)
+    start = time.perf_counter()
+    spec = _figure_cache.get_or_compute(key, lambda: build(*data, *options).to_json())
+    if diagnostics.enabled():
+        # Mỗi lần gọi: thời gian dựng (hoặc lấy từ cache) và kích thước JSON gửi tới trình duyệt
+        diagnostics.record(f'chart.{build.__name__}', 'chart', time.perf_counter() - start, len(spec))
+    # JSON sinh ra từ figure đã được validate nên không cần validate lại (nhanh hơn ~7 lần)
+    return go.Figure(json.loads(spec), _validate=False)
+
+
+def is_large(df) -> bool:
+    return len(df) >= WEBGL_THRESHOLD
+
+
+def top_n_with_other(df, value_col: str, n: int = TOP_N):
+    """Giữ n framework lớn nhất theo ``value_col`` và gộp phần còn lại thành một dòng "Khác"."""
+    ordered = df[['Framework', value_col]].sort_values(value_col, ascending=False)
+    top = ordered.head(n).astype({'Framework': object})
+    rest = ordered.iloc[n:]
+    if rest.empty:
+        return top
+    other = pd.DataFrame({'Framework': [f'{OTHER_LABEL} ({len(rest)} repo)'], value_col: [rest[value_col].sum()]})
+    return pd.concat([top, other], ignore_index=True)
+
+
+def _log_edges(values, bins):
+    # Stars/Forks lệch phải rất mạnh nên chia bin theo thang log (giá trị 0 nằm ở bin đầu)
+    upper = max(float(np.nanmax(values)) if len(values) else 1.0, 1.0)
+    return np.concatenate([[0.0], np.geomspace(1.0, upper + 1.0, bins)])
+
+
+def density_trace(x, y, log_x=True, log_y=True, bins=DENSITY_BINS):
+    """Heatmap đếm số repo trên lưới bins x bins; kích thước không phụ thuộc số dòng."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    valid = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[valid], y[valid]
+    x_edges = _log_edges(x, bins) if log_x else np.linspace(np.min(x, initial=0), np.max(x, initial=1), bins + 1)
+    y_edges = _log_edges(y, bins) if log_y else np.linspace(np.min(y, initial=0), np.max(y, initial=1), bins + 1)
+    counts, _, _ = np.histogram2d(x, y, bins=[x_edges, y_edges])
+    # Ô trống để trong suốt thay vì tô màu 0
+    z = np.where(counts > 0, counts, np.nan).T
+    return go.Heatmap(
+        x=(x_edges[:-1] + x_edges[1:]) / 2, y=(y_edges[:-1] + y_edges[1:]) / 2, z=z,
+        colorscale='Viridis', colorbar=dict(title='Số repo'),
+        hovertemplate='x≈%{x:.3s}<br>y≈%{y:.3s}<br>%{z} repo<extra></extra>'
     )
-    st.plotly_chart(fig, use_container_width=True)
 
 
-def plot_forks(df, chart_type: str):
+def _build_metric_figure(df, metric: str, chart_type: str, title: str, label: str):
+    import plotly.express as px
+
+    if is_large(df):
+        df = top_n_with_other(df, metric)
     if chart_type == 'Cột':
         fig = px.bar(
             df,
-            x='Framework', y='Forks', color='Framework', text='Forks',
-            title='So sánh số lượng Forks', labels={'Forks': 'Số lượng Forks', 'Framework': 'Framework'}
+            x='Framework', y=metric, color='Framework', text=metric,
+            title=title, labels={metric: label, 'Framework': 'Framework'}
         )
         fig.update_traces(texttemplate='%{text:.2s}', textposition='outside')
     else:
         fig = px.line(
-            df.sort_values('Forks', ascending=False),
-            x='Framework', y='Forks', color='Framework', markers=True,
-            title='So sánh số lượng Forks - Line', labels={'Forks': 'Số lượng Forks', 'Framework': 'Framework'}
+            df.sort_values(metric, ascending=False),
+            x='Framework', y=metric, color='Framework', markers=True,
+            title=f'{title} - Line', labels={metric: label, 'Framework': 'Framework'}
         )
-    fig.update_layout(
-        template='plotly_dark', 
-        legend_title_text='Framework',
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(color='#ffffff')
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    fig.update_layout(template=THEME, legend_title_text='Framework')
+    return fig
 
 
-def plot_issues_pie(df):
+def build_stars_figure(df, chart_type: str):
+    return _build_metric_figure(df, 'Stars', chart_type, 'So sánh số lượng Sao (Stars)', 'Số lượng Sao')
+
+
+def build_forks_figure(df, chart_type: str):
+    return _build_metric_figure(df, 'Forks', chart_type, 'So sánh số lượng Forks', 'Số lượng Forks')
+
+
+@diagnostics.instrument('chart')
+def plot_stars(df, chart_type: str):
+    st.plotly_chart(cached_figure(build_stars_figure, df, options=(chart_type,)), use_container_width=True)
+
+
+@diagnostics.instrument('chart')
+def plot_forks(df, chart_type: str):
+    st.plotly_chart(cached_figure(build_forks_figure, df, options=(chart_type,)), use_container_width=True)
+
+
+def build_issues_pie_figure(df):
+    import plotly.express as px
+
+    if is_large(df):
+        df = top_n_with_other(df, 'Open Issues')
     fig = px.pie(
         df, values='Open Issues', names='Framework', title='Phân bổ Open Issues', hole=.3
     )
-    fig.update_layout(
-        template='plotly_dark',
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(color='#ffffff')
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    fig.update_layout(template=THEME)
+    return fig
 
 
-def plot_scatter(df, show_issues: bool):
+@diagnostics.instrument('chart')
+def plot_issues_pie(df):
+    st.plotly_chart(cached_figure(build_issues_pie_figure, df), use_container_width=True)
+
+
+def build_scatter_figure(df, show_issues: bool):
+    import plotly.express as px
+
+    if len(df) >= DENSITY_THRESHOLD:
+        fig = go.Figure(density_trace(df['Stars'], df['Forks']))
+        fig.update_layout(
+            title=f'Mật độ Stars vs Forks ({len(df):,} repo)',
+            xaxis=dict(title='Sao', type='log'), yaxis=dict(title='Forks', type='log'),
+            template=THEME
+        )
+        return fig
+    if is_large(df):
+        # Một trace WebGL duy nhất thay vì một trace cho mỗi framework
+        fig = px.scatter(
+            df,
+            x='Stars', y='Forks', hover_name='Framework', render_mode='webgl',
+            labels={'Stars': 'Sao', 'Forks': 'Forks'},
+            title=f'Stars vs Forks ({len(df):,} repo)', log_x=True, log_y=True
+        )
+        fig.update_traces(marker=dict(size=4, opacity=0.5))
+        fig.update_layout(template=THEME)
+        return fig
     fig = px.scatter(
         df,
         x='Stars', y='Forks', color='Framework',
@@ -75,53 +196,69 @@ def plot_scatter(df, show_issues: bool):
         labels={'Stars': 'Sao', 'Forks': 'Forks'},
         title='Stars vs Forks (kích thước ~ Open Issues)'
     )
-    fig.update_layout(
-        template='plotly_dark',
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(color='#ffffff')
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    fig.update_layout(template=THEME)
+    return fig
+
+
+@diagnostics.instrument('chart')
+def plot_scatter(df, show_issues: bool):
+    st.plotly_chart(cached_figure(build_scatter_figure, df, options=(show_issues,)), use_container_width=True)
 
 
-def plot_correlation_heatmap(corr_matrix):
-    """Vẽ biểu đồ heatmap cho ma trận tương quan."""
+def build_correlation_heatmap_figure(corr_matrix, pvalues=None, title='Ma trận tương quan giữa các metrics'):
+    if pvalues is None:
+        text, texttemplate = corr_matrix.values, "%{text:.2f}"
+    else:
+        # Đánh dấu * các cặp có ý nghĩa thống kê (p < 0.05)
+        marks = np.where(pvalues.values < 0.05, '*', '')
+        text, texttemplate = np.char.add(np.char.mod('%.2f', corr_matrix.values), marks), "%{text}"
     fig = go.Figure(data=go.Heatmap(
         z=corr_matrix.values,
         x=corr_matrix.columns,
         y=corr_matrix.columns,
         colorscale='RdBu',
         zmid=0,
-        text=corr_matrix.values,
-        texttemplate="%{text:.2f}",
+        text=text,
+        texttemplate=texttemplate,
         textfont={"size": 10},
         hoverongaps=False
     ))
-    
+
     fig.update_layout(
-        title='Ma trận tương quan giữa các metrics',
-        template='plotly_dark',
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(color='#ffffff'),
+        title=title,
+        template=THEME,
         width=600,
         height=500
     )
-    
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
-def plot_trend_analysis(trend_data, df):
-    """Vẽ biểu đồ phân tích xu hướng."""
-    if not trend_data:
-        st.warning("Không có dữ liệu xu hướng để hiển thị")
-        return
-    
+@diagnostics.instrument('chart')
+def plot_correlation_heatmap(corr_matrix, pvalues=None, title='Ma trận tương quan giữa các metrics'):
+    """Vẽ biểu đồ heatmap cho ma trận tương quan (kèm dấu * khi có ma trận p-value)."""
+    figure = cached_figure(build_correlation_heatmap_figure, corr_matrix, pvalues, options=(title,))
+    st.plotly_chart(figure, use_container_width=True)
+
+
+def build_trend_figure(trend_data, df):
     # Tạo subplot cho các correlation
     fig = go.Figure()
-    
+
     # Thêm các scatter plots cho correlations
-    if 'age_stars_correlation' in trend_data:
+    if 'age_stars_correlation' in trend_data and len(df) >= DENSITY_THRESHOLD:
+        fig.add_trace(density_trace(df['Tuổi repo (năm)'], df['Stars'], log_x=False))
+        fig.update_yaxes(type='log')
+    elif 'age_stars_correlation' in trend_data and is_large(df):
+        # Không gắn nhãn từng điểm khi có hàng nghìn repo
+        fig.add_trace(go.Scattergl(
+            x=df['Tuổi repo (năm)'],
+            y=df['Stars'],
+            mode='markers',
+            text=df['Framework'],
+            name='Tuổi vs Stars',
+            marker=dict(size=4, opacity=0.5)
+        ))
+    elif 'age_stars_correlation' in trend_data:
         fig.add_trace(go.Scatter(
             x=df['Tuổi repo (năm)'],
             y=df['Stars'],
@@ -131,39 +268,46 @@ def plot_trend_analysis(trend_data, df):
             name='Tuổi vs Stars',
             marker=dict(size=10, opacity=0.7)
         ))
-    
+
     fig.update_layout(
         title='Phân tích xu hướng: Tuổi repo vs Stars',
         xaxis_title='Tuổi repo (năm)',
         yaxis_title='Số lượng Stars',
-        template='plotly_dark',
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(color='#ffffff')
+        template=THEME
     )
-    
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+
+@diagnostics.instrument('chart')
+def plot_trend_analysis(trend_data, df):
+    """Vẽ biểu đồ phân tích xu hướng."""
+    if not trend_data:
+        st.warning("Không có dữ liệu xu hướng để hiển thị")
+        return
+    st.plotly_chart(cached_figure(build_trend_figure, trend_data, df), use_container_width=True)
+
 
+def build_cv_figure(cv_data):
+    import plotly.express as px
 
+    fig = px.bar(
+        x=list(cv_data.keys()),
+        y=list(cv_data.values()),
+        title='Hệ số biến thiên (CV) của các metrics',
+        labels={'x': 'Metrics', 'y': 'Coefficient of Variation (%)'}
+    )
+    fig.update_layout(template=THEME)
+    return fig
+
+
+@diagnostics.instrument('chart')
 def plot_statistical_insights(insights, df):
     """Vẽ biểu đồ cho các insights thống kê."""
     # Coefficient of Variation chart
     cv_data = {k: v for k, v in insights.items() if k.endswith('_cv')}
     if cv_data:
-        fig = px.bar(
-            x=list(cv_data.keys()),
-            y=list(cv_data.values()),
-            title='Hệ số biến thiên (CV) của các metrics',
-            labels={'x': 'Metrics', 'y': 'Coefficient of Variation (%)'}
-        )
-        fig.update_layout(
-        template='plotly_dark',
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(color='#ffffff')
-    )
-        st.plotly_chart(fig, use_container_width=True)
-    
+        st.plotly_chart(cached_figure(build_cv_figure, cv_data), use_container_width=True)
+
     # Distribution analysis
     dist_data = {k: v for k, v in insights.items() if k.endswith('_distribution')}
     if dist_data:
@@ -171,23 +315,21 @@ def plot_statistical_insights(insights, df):
         for metric, dist_info in dist_data.items():
             col1, col2 = st.columns(2)
             with col1:
-                st.metric(f"Skewness ({metric.replace('_distribution', '')})", 
+                st.metric(f"Skewness ({metric.replace('_distribution', '')})",
                          f"{dist_info['skewness']} ({dist_info['skew_interpretation']})")
             with col2:
-                st.metric(f"Kurtosis ({metric.replace('_distribution', '')})", 
+                st.metric(f"Kurtosis ({metric.replace('_distribution', '')})",
                          f"{dist_info['kurtosis']} ({dist_info['kurtosis_interpretation']})")
 
 
-def plot_framework_ranking(comparison_df):
-    """Vẽ biểu đồ ranking của các framework."""
-    if comparison_df.empty:
-        return
-    
+def build_ranking_figure(comparison_df):
     # Tạo radar chart cho ranking
     categories = [col for col in comparison_df.columns if col.endswith('_rank') and col != 'Total_Rank_Score']
-    
+
+    # Hạng được tính trên toàn catalog nên có thể lớn hơn số framework đang vẽ
+    max_rank = comparison_df[categories].max().max() if categories else 0
     fig = go.Figure()
-    
+
     for _, row in comparison_df.iterrows():
         values = [row[cat] for cat in categories]
         fig.add_trace(go.Scatterpolar(
@@ -196,34 +338,39 @@ def plot_framework_ranking(comparison_df):
             fill='toself',
             name=row['Framework']
         ))
-    
+
     fig.update_layout(
         polar=dict(
             radialaxis=dict(
                 visible=True,
-                range=[0, len(comparison_df)]
+                range=[0, max(1, max_rank)]
             )),
         showlegend=True,
         title="Radar Chart: Ranking các Framework",
-        template='plotly_dark',
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(color='#ffffff')
+        template=THEME
     )
-    
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+
+@diagnostics.instrument('chart')
+def plot_framework_ranking(comparison_df):
+    """Vẽ biểu đồ ranking của các framework."""
+    if comparison_df.empty:
+        return
+    st.plotly_chart(cached_figure(build_ranking_figure, comparison_df), use_container_width=True)
 
 
+@diagnostics.instrument('chart')
 def plot_outliers_analysis(insights, df):
     """Vẽ biểu đồ phát hiện outliers."""
     outlier_data = {k: v for k, v in insights.items() if k.endswith('_outliers')}
-    
+
     if not outlier_data:
         st.info("Không phát hiện outliers trong dữ liệu")
         return
-    
+
     st.subheader('Phân tích Outliers')
-    
+
     for metric, outliers in outlier_data.items():
         if outliers:
             st.write(f"**Outliers trong {metric.replace('_outliers', '')}:**")
@@ -231,3 +378,18 @@ def plot_outliers_analysis(insights, df):
             st.dataframe(outlier_df, use_container_width=True)
 
 
+def build_star_history_figure(history):
+    import plotly.express as px
+
+    fig = px.line(
+        history, x='Time', y='Stars', color='Repo', markers=True,
+        title='Lịch sử Stars theo snapshot', labels={'Time': 'Thời gian', 'Stars': 'Số lượng Sao'}
+    )
+    fig.update_layout(template=THEME)
+    return fig
+
+
+@diagnostics.instrument('chart')
+def plot_star_history(history):
+    """Vẽ chuỗi thời gian Stars từ các snapshot đã lưu."""
+    st.plotly_chart(cached_figure(build_star_history_figure, history), use_container_width=True)
@@ -1,20 +1,141 @@
+import math
+import time
+
 import streamlit as st
 
+from services import diagnostics
+
+# Từ số repo này trở lên, multiselect được thay bằng bộ chọn có tìm kiếm + phân trang
+SELECTOR_THRESHOLD = 50
+PAGE_SIZE = 50
+
+
+def render_repo_selector(frameworks, default, page_size=PAGE_SIZE):
+    """Bộ chọn repo có tìm kiếm và phân trang cho catalog lớn.
+
+    Lựa chọn được giữ trong ``st.session_state['selected_repos']`` qua các trang.
+    """
+    selected = st.session_state.setdefault('selected_repos', list(default))
+    nonce = st.session_state.setdefault('selected_repos_nonce', 0)
+
+    query = st.text_input('Tìm repo', placeholder='vd: react, vuejs/...').strip().lower()
+    names = [name for name, path in frameworks.items() if query in name.lower() or query in path.lower()]
+    pages = max(1, math.ceil(len(names) / page_size))
+    page = st.number_input(f'Trang (/{pages})', min_value=1, max_value=pages, value=1, step=1)
+    page_names = names[(page - 1) * page_size:page * page_size]
+
+    chosen = st.multiselect(
+        f'Chọn trên trang này ({len(names)} kết quả)', options=page_names,
+        default=[name for name in page_names if name in selected],
+        key=f'repo_page_{nonce}_{query}_{page}'
+    )
+    page_set = set(page_names)
+    selected = [name for name in selected if name not in page_set or name in chosen]
+    selected += [name for name in chosen if name not in selected]
+    st.session_state['selected_repos'] = selected
+
+    col1, col2 = st.columns([2, 1])
+    col1.caption(f'Đã chọn {len(selected)} / {len(frameworks)} repo')
+    if col2.button('Bỏ chọn', use_container_width=True):
+        st.session_state['selected_repos'] = []
+        st.session_state['selected_repos_nonce'] = nonce + 1
+        st.rerun()
+    return selected
+
+
+def render_catalog_builder():
+    """Form tạo catalog từ org / topic / truy vấn tìm kiếm; trả về nguồn khi người dùng bấm nút."""
+    with st.sidebar, st.expander('📚 Xây dựng catalog'):
+        orgs = st.text_input('Organizations', placeholder='vuejs, angular')
+        topics = st.text_input('Topics', placeholder='react, javascript-framework')
+        queries = st.text_input('Truy vấn tìm kiếm', placeholder='stars:>20000 language:TypeScript')
+        if st.button('Tải catalog', use_container_width=True):
+            split = lambda text: [part.strip() for part in text.split(',') if part.strip()]
+            return split(orgs), split(topics), ([queries.strip()] if queries.strip() else [])
+    return None
 
-def render_sidebar(frameworks):
+
+def render_sidebar(frameworks, default=None):
     with st.sidebar:
         st.markdown('### 🚀 JS Framework Insights')
         st.caption('So sánh nhanh React · Vue · Angular')
         st.divider()
         st.header('⚙️ Tùy chọn hiển thị')
-        selected_frameworks = st.multiselect(
-            'Chọn framework', options=list(frameworks.keys()), default=list(frameworks.keys())
-        )
+        if len(frameworks) >= SELECTOR_THRESHOLD:
+            selected_frameworks = render_repo_selector(frameworks, default or [])
+        else:
+            selected_frameworks = st.multiselect(
+                'Chọn framework', options=list(frameworks.keys()), default=default or list(frameworks.keys())
+            )
         chart_type = st.radio('Loại biểu đồ', options=['Cột', 'Đường'], index=0, horizontal=True)
         show_watchers = st.checkbox('Hiển thị Watchers', value=True)
         show_issues = st.checkbox('Hiển thị Open Issues', value=True)
+        show_activity = st.checkbox(
+            'Chỉ số hoạt động (commit, contributor)', value=False,
+            help='GitHub tính các chỉ số này ở nền; cột sẽ được điền dần khi dữ liệu sẵn sàng'
+        )
         st.divider()
         st.caption('Dữ liệu nhận trực tiếp từ GitHub API trong thời gian thực')
-    return selected_frameworks, chart_type, show_watchers, show_issues
+    return selected_frameworks, chart_type, show_watchers, show_issues, show_activity
+
+
+def _stage_rows(stages):
+    rows = []
+    for name, stage in sorted(stages.items(), key=lambda item: -item[1]['seconds']):
+        rows.append({
+            'Giai đoạn': name,
+            'Lượt gọi': stage['calls'],
+            'Tổng (ms)': round(stage['seconds'] * 1000, 1),
+            'TB (ms)': round(stage['seconds'] * 1000 / stage['calls'], 2) if stage['calls'] else 0.0,
+            'Max (ms)': round(stage['max_seconds'] * 1000, 1),
+            'Bytes': stage['bytes'],
+            'Lỗi': stage['errors'],
+        })
+    return rows
+
+
+def render_diagnostics_panel():
+    """Bảng chẩn đoán hiệu năng: thời gian từng giai đoạn, cache và hạn mức GitHub API.
+
+    Nên gọi ở cuối script để số liệu gồm cả lần chạy hiện tại. Việc ghi nhận
+    áp dụng cho toàn bộ tiến trình (mọi phiên), giống các cache dùng chung.
+    """
+    with st.sidebar, st.expander('🩺 Chẩn đoán hiệu năng'):
+        st.toggle(
+            'Ghi nhận thời gian', value=diagnostics.enabled(), key='diagnostics_enabled',
+            # Callback chạy trước lần rerun nên chính lần chạy đó đã được đo
+            on_change=lambda: diagnostics.enable(st.session_state['diagnostics_enabled'])
+        )
+        snap = diagnostics.snapshot()
+        if snap['stages']:
+            st.dataframe(_stage_rows(snap['stages']), hide_index=True, use_container_width=True)
+        elif snap['enabled']:
+            st.caption('Chưa có số liệu; tương tác với dashboard để bắt đầu đo.')
+
+        caches = {name: stats for name, stats in snap['sources'].items() if 'hits' in stats}
+        if caches:
+            st.caption('Cache (hit / miss)')
+            st.dataframe([
+                {'Cache': name, 'Hit': stats['hits'], 'Miss': stats['misses'],
+                 'Tỉ lệ hit': round(stats['hits'] / (stats['hits'] + stats['misses']), 3)
+                 if stats['hits'] + stats['misses'] else None}
+                for name, stats in caches.items()
+            ], hide_index=True, use_container_width=True)
 
+        budget = snap['sources'].get('rate_limit') or {}
+        if budget.get('limit'):
+            reset = time.strftime('%H:%M:%S', time.localtime(budget['reset_at'])) if budget.get('reset_at') else '?'
+            st.caption(f"GitHub API: còn {budget['remaining']}/{budget['limit']} request, làm mới lúc {reset} · "
+                       f"retry {budget['retries']} · chờ {budget['throttled']}")
 
+        col1, col2 = st.columns(2)
+        col1.download_button('JSON', diagnostics.to_json(snap), file_name='diagnostics.json',
+                             mime='application/json', on_click='ignore', use_container_width=True)
+        col2.download_button('Prometheus', diagnostics.to_prometheus(snap), file_name='diagnostics.prom',
+                             mime='text/plain', on_click='ignore', use_container_width=True)
+        col1, col2 = st.columns(2)
+        if col1.button('Làm mới', use_container_width=True):
+            st.rerun()
+        if col2.button('Xóa số liệu', use_container_width=True):
+            diagnostics.reset()
+            st.rerun()
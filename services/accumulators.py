@@ -0,0 +1,325 @@
+"""Mergeable online accumulators for catalog statistics.
+
+``MomentAccumulator`` keeps count, mean, the central moments M2/M3/M4 of
+every metric and the co-moment matrix used for Pearson correlation.
+``GroupAccumulator`` keeps per-group counts, sums and maxima. Both support
+adding, removing and merging observations without revisiting the rest of the
+data (pairwise update formulas from Pébay, 2008), so a refresh that changes
+one repository costs O(1) per metric instead of a full recomputation.
+
+``CatalogStats`` ties them to a DataFrame, row by row, and applies only the
+rows that changed since the last ``sync``.
+"""
+
+from collections import Counter, defaultdict
+
+import numpy as np
+import pandas as pd
+
+
+class MomentAccumulator:
+    """Per-metric count, mean, M2, M3, M4 and pairwise co-moments of ``k`` metrics.
+
+    Missing values (NaN) are skipped metric by metric, so ``n`` is a vector.
+    Co-moments use pairwise deletion like ``DataFrame.corr``: ``pair_n[i, j]``
+    rows have both metrics, ``pair_mean[i, j]`` and ``pair_m2[i, j]`` are the
+    mean and sum of squared deviations of metric ``i`` over those rows. The
+    diagonals equal the per-metric ``n``, ``mean`` and ``m2``.
+    """
+
+    def __init__(self, k):
+        self.k = k
+        self.n = np.zeros(k)
+        self.mean = np.zeros(k)
+        self.m2 = np.zeros(k)
+        self.m3 = np.zeros(k)
+        self.m4 = np.zeros(k)
+        self.pair_n = np.zeros((k, k))
+        self.pair_mean = np.zeros((k, k))
+        self.pair_m2 = np.zeros((k, k))
+        self.comoment = np.zeros((k, k))
+
+    @classmethod
+    def from_values(cls, values):
+        """Build an accumulator from an ``(n, k)`` array (NaN = missing) in one vectorized pass."""
+        values = np.asarray(values, dtype=float)
+        acc = cls(values.shape[1])
+        if len(values) == 0:
+            return acc
+        present = ~np.isnan(values)
+        M = present.astype(float)
+        acc.n = M.sum(axis=0)
+        acc.mean = np.where(present, values, 0.0).sum(axis=0) / np.maximum(acc.n, 1)
+        d = np.where(present, values - acc.mean, 0.0)
+        d2 = d * d
+        acc.m2 = d2.sum(axis=0)
+        acc.m3 = (d2 * d).sum(axis=0)
+        acc.m4 = (d2 * d2).sum(axis=0)
+        # Pairwise sums of the deviations from the per-metric means, as in services.correlation
+        acc.pair_n = M.T @ M
+        sums = d.T @ M                  # sums[i, j]: deviations of metric i over rows where j is present
+        offset = sums / np.maximum(acc.pair_n, 1)
+        acc.pair_mean = np.where(acc.pair_n > 0, acc.mean[:, None] + offset, 0.0)
+        acc.pair_m2 = d2.T @ M - sums * offset
+        acc.comoment = d.T @ d - sums * offset.T
+        return acc
+
+    def copy(self):
+        acc = MomentAccumulator(self.k)
+        acc.__dict__.update({name: value.copy() if isinstance(value, np.ndarray) else value
+                             for name, value in self.__dict__.items()})
+        return acc
+
+    def merge(self, other):
+        """Fold ``other`` into this accumulator."""
+        na, nb = self.n, other.n
+        n = na + nb
+        # Metrics without observations on either side keep all-zero moments
+        safe = np.maximum(n, 1)
+        delta = other.mean - self.mean
+        m2a, m3a = self.m2, self.m3
+        self.m4 = (self.m4 + other.m4
+                   + delta ** 4 * na * nb * (na * na - na * nb + nb * nb) / safe ** 3
+                   + 6 * delta ** 2 * (na * na * other.m2 + nb * nb * m2a) / safe ** 2
+                   + 4 * delta * (na * other.m3 - nb * m3a) / safe)
+        self.m3 = (m3a + other.m3
+                   + delta ** 3 * na * nb * (na - nb) / safe ** 2
+                   + 3 * delta * (na * other.m2 - nb * m2a) / safe)
+        self.m2 = m2a + other.m2 + delta ** 2 * na * nb / safe
+        self.mean = self.mean + delta * nb / safe
+        self.n = n
+
+        pair_n = self.pair_n + other.pair_n
+        pair_safe = np.maximum(pair_n, 1)
+        pair_delta = other.pair_mean - self.pair_mean
+        weight = self.pair_n * other.pair_n / pair_safe
+        self.pair_m2 = self.pair_m2 + other.pair_m2 + pair_delta ** 2 * weight
+        self.comoment = self.comoment + other.comoment + pair_delta * pair_delta.T * weight
+        self.pair_mean = self.pair_mean + pair_delta * other.pair_n / pair_safe
+        self.pair_n = pair_n
+        return self
+
+    def subtract(self, other):
+        """Remove the observations summarized by ``other`` (inverse of ``merge``)."""
+        nb, n = other.n, self.n
+        na = n - nb
+        empty = na <= 0
+        safe = np.maximum(n, 1)
+        mean_a = (self.mean * n - other.mean * nb) / np.maximum(na, 1)
+        delta = other.mean - mean_a
+        m2a = self.m2 - other.m2 - delta ** 2 * na * nb / safe
+        m3a = (self.m3 - other.m3
+               - delta ** 3 * na * nb * (na - nb) / safe ** 2
+               - 3 * delta * (na * other.m2 - nb * m2a) / safe)
+        m4a = (self.m4 - other.m4
+               - delta ** 4 * na * nb * (na * na - na * nb + nb * nb) / safe ** 3
+               - 6 * delta ** 2 * (na * na * other.m2 + nb * nb * m2a) / safe ** 2
+               - 4 * delta * (na * other.m3 - nb * m3a) / safe)
+        self.n = np.where(empty, 0.0, na)
+        self.mean = np.where(empty, 0.0, mean_a)
+        self.m2 = np.where(empty, 0.0, np.maximum(m2a, 0.0))
+        self.m3 = np.where(empty, 0.0, m3a)
+        self.m4 = np.where(empty, 0.0, m4a)
+
+        pair_b = other.pair_n
+        pair_a = self.pair_n - pair_b
+        pair_empty = pair_a <= 0
+        pair_mean_a = (self.pair_mean * self.pair_n - other.pair_mean * pair_b) / np.maximum(pair_a, 1)
+        pair_delta = other.pair_mean - pair_mean_a
+        weight = pair_a * pair_b / np.maximum(self.pair_n, 1)
+        pair_m2a = self.pair_m2 - other.pair_m2 - pair_delta ** 2 * weight
+        comoment_a = self.comoment - other.comoment - pair_delta * pair_delta.T * weight
+        self.pair_n = np.where(pair_empty, 0.0, pair_a)
+        self.pair_mean = np.where(pair_empty, 0.0, pair_mean_a)
+        self.pair_m2 = np.where(pair_empty, 0.0, np.maximum(pair_m2a, 0.0))
+        self.comoment = np.where(pair_empty, 0.0, comoment_a)
+        return self
+
+    def add(self, x):
+        return self.merge(MomentAccumulator.from_values(np.asarray(x, dtype=float)[None, :]))
+
+    def remove(self, x):
+        return self.subtract(MomentAccumulator.from_values(np.asarray(x, dtype=float)[None, :]))
+
+    # --- Derived statistics (same conventions as pandas/scipy) ---
+
+    def variance(self, ddof=1):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.m2 / (self.n - ddof)
+
+    def std(self, ddof=1):
+        return np.sqrt(self.variance(ddof))
+
+    def skewness(self):
+        """Biased sample skewness (``scipy.stats.skew`` default)."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.sqrt(self.n) * self.m3 / self.m2 ** 1.5
+
+    def kurtosis(self):
+        """Biased Fisher kurtosis (``scipy.stats.kurtosis`` default)."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.n * self.m4 / self.m2 ** 2 - 3.0
+
+    def correlation(self):
+        """Pairwise-complete Pearson correlation matrix (NaN where fewer than 2 rows have both metrics)."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            r = np.clip(self.comoment / np.sqrt(self.pair_m2 * self.pair_m2.T), -1.0, 1.0)
+        r[self.pair_n < 2] = np.nan
+        return r
+
+
+class GroupAccumulator:
+    """Per-group count, sums and maxima of ``k`` metrics.
+
+    Maxima are kept with a value multiset per group, so removing a value is
+    O(1) unless it is the current maximum of its group.
+    """
+
+    def __init__(self, k):
+        self.k = k
+        self.count = Counter()
+        self.sums = defaultdict(lambda: np.zeros(k))
+        self._values = defaultdict(lambda: [Counter() for _ in range(k)])
+        self._max = {}
+
+    def add(self, group, x):
+        x = np.asarray(x, dtype=float)
+        self.count[group] += 1
+        self.sums[group] = self.sums[group] + x
+        values = self._values[group]
+        current = self._max.get(group)
+        for j, v in enumerate(x):
+            values[j][v] += 1
+        self._max[group] = x.copy() if current is None else np.fmax(current, x)
+
+    def add_many(self, group, X):
+        """Add an ``(n, k)`` block of rows that all belong to ``group``."""
+        X = np.asarray(X, dtype=float)
+        if len(X) == 0:
+            return
+        self.count[group] += len(X)
+        self.sums[group] = self.sums[group] + X.sum(axis=0)
+        values = self._values[group]
+        for j in range(self.k):
+            values[j].update(X[:, j].tolist())
+        block_max = X.max(axis=0)
+        current = self._max.get(group)
+        self._max[group] = block_max if current is None else np.fmax(current, block_max)
+
+    def remove(self, group, x):
+        x = np.asarray(x, dtype=float)
+        self.count[group] -= 1
+        if self.count[group] <= 0:
+            for store in (self.count, self.sums, self._values, self._max):
+                store.pop(group, None)
+            return
+        self.sums[group] = self.sums[group] - x
+        values = self._values[group]
+        for j, v in enumerate(x):
+            values[j][v] -= 1
+            if values[j][v] <= 0:
+                del values[j][v]
+                if v == self._max[group][j]:
+                    self._max[group][j] = max(values[j])
+
+    def groups(self):
+        return list(self.count)
+
+    def max(self, group):
+        return self._max[group]
+
+
+def _group_key(value):
+    """Missing group labels (None/NaN) all map to ``None``."""
+    return None if pd.isna(value) else value
+
+
+class CatalogStats:
+    """Online statistics over a catalog DataFrame, updated row by row.
+
+    ``sync(df)`` hashes every row, then adds, updates or removes only the rows
+    whose hash changed. Rows are identified by ``key_cols`` plus their
+    occurrence number, so a repository listed under two names counts twice,
+    exactly as in the frame. Missing metric values are skipped per metric.
+    """
+
+    def __init__(self, metrics, group_metrics, key_cols=('Framework', 'Repo'), group_col='License'):
+        self.metrics = list(metrics)
+        self.group_metrics = list(group_metrics)
+        self.key_cols = list(key_cols)
+        self.group_col = group_col
+        self.moments = MomentAccumulator(len(self.metrics))
+        self.groups = GroupAccumulator(len(self.group_metrics))
+        self._rows = {}
+        self._hashes = pd.Series(dtype='uint64')
+
+    def _apply(self, row, sign):
+        values, group, group_values = row
+        if sign > 0:
+            self.moments.add(values)
+            self.groups.add(group, group_values)
+        else:
+            self.moments.remove(values)
+            self.groups.remove(group, group_values)
+
+    def _keyed(self, df: pd.DataFrame) -> pd.DataFrame:
+        columns = list(dict.fromkeys(self.metrics + self.group_metrics + [self.group_col]))
+        keys = df[self.key_cols].astype(object)
+        occurrence = keys.groupby(self.key_cols, sort=False, dropna=False).cumcount()
+        frame = df[columns].copy()
+        frame.index = pd.MultiIndex.from_arrays(
+            [keys[col].to_numpy() for col in self.key_cols] + [occurrence.to_numpy()]
+        )
+        return frame
+
+    def sync(self, df: pd.DataFrame) -> int:
+        """Bring the accumulators in line with ``df``; returns the number of changed rows."""
+        frame = self._keyed(df)
+        hashes = pd.util.hash_pandas_object(frame, index=True)
+
+        known = hashes.index.isin(self._hashes.index)
+        previous = self._hashes.reindex(hashes.index[known])
+        changed = hashes.index[~known].append(previous.index[previous.to_numpy() != hashes[known].to_numpy()])
+        removed = self._hashes.index[~self._hashes.index.isin(hashes.index)]
+
+        # Mostly new data (first load, new selection): rebuild in bulk instead
+        if len(changed) + len(removed) > len(hashes) // 2:
+            self._rebuild(frame)
+            self._hashes = hashes
+            return len(changed) + len(removed)
+
+        for key in list(removed) + list(changed):
+            if key in self._rows:
+                self._apply(self._rows.pop(key), -1)
+        if len(changed):
+            subset = frame.loc[changed]
+            values = subset[self.metrics].to_numpy(dtype=float)
+            group_values = subset[self.group_metrics].to_numpy(dtype=float)
+            groups = subset[self.group_col].to_numpy()
+            for key, row_values, group, row_group_values in zip(changed, values, groups, group_values):
+                row = (row_values, _group_key(group), row_group_values)
+                self._rows[key] = row
+                self._apply(row, +1)
+
+        self._hashes = hashes
+        return len(changed) + len(removed)
+
+    def _rebuild(self, frame):
+        values = frame[self.metrics].to_numpy(dtype=float)
+        group_values = frame[self.group_metrics].to_numpy(dtype=float)
+        groups = frame[self.group_col].to_numpy()
+
+        self.moments = MomentAccumulator.from_values(values)
+        self.groups = GroupAccumulator(len(self.group_metrics))
+        codes, uniques = pd.factorize(groups, use_na_sentinel=False)
+        for code, group in enumerate(uniques):
+            self.groups.add_many(_group_key(group), group_values[codes == code])
+        self._rows = dict(zip(frame.index, zip(values, map(_group_key, groups), group_values)))
+
+    @property
+    def size(self):
+        """Number of rows currently summarized."""
+        return len(self._rows)
+
+    def index_of(self, metric):
+        return self.metrics.index(metric)
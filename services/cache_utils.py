@@ -0,0 +1,85 @@
+"""Small caching helpers shared by the processing, chart and export layers."""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """Cheap content hash of a DataFrame (values, index, column names and dtypes)."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr([(str(col), str(dtype)) for col, dtype in df.dtypes.items()]).encode('utf-8'))
+    if len(df):
+        digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class LRUCache:
+    """Thread-safe mapping that keeps at most ``maxsize`` most recently used items.
+
+    With ``max_weight``, least recently used items are also evicted while the
+    summed ``weigh(value)`` (e.g. ``len`` of serialized bytes) exceeds it; a
+    single item heavier than ``max_weight`` is not stored at all.
+    """
+
+    def __init__(self, maxsize=128, max_weight=None, weigh=None):
+        self.maxsize = maxsize
+        self.max_weight = max_weight
+        self._weigh = weigh if max_weight is not None else None
+        self.weight = 0
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._weights = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        weight = self._weigh(value) if self._weigh is not None else 0
+        with self._lock:
+            if key in self._data:
+                self.weight -= self._weights.pop(key, 0)
+                del self._data[key]
+            if self._weigh is not None and weight > self.max_weight:
+                return
+            self._data[key] = value
+            if weight:
+                self._weights[key] = weight
+                self.weight += weight
+            while len(self._data) > self.maxsize or (self._weigh is not None and self.weight > self.max_weight):
+                evicted, _ = self._data.popitem(last=False)
+                self.weight -= self._weights.pop(evicted, 0)
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for ``key``, computing and storing it on a miss."""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._weights.clear()
+            self.hits = self.misses = self.weight = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        stats = {'hits': self.hits, 'misses': self.misses, 'size': len(self._data), 'maxsize': self.maxsize}
+        if self.max_weight is not None:
+            stats.update(weight=self.weight, max_weight=self.max_weight)
+        return stats
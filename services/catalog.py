@@ -0,0 +1,157 @@
+"""Catalog builder: track whole ecosystems instead of a hardcoded repo list.
+
+Streams repositories page by page from an organization, a topic or a search
+query, deduplicates them by full name and saves the catalog locally as JSON
+lines. The saved catalog maps display names to ``owner/repo`` paths, the same
+shape as the ``frameworks`` dict in ``app.py``.
+
+Usage::
+
+    python -m services.catalog --org vuejs --topic react --search "stars:>20000 language:TypeScript"
+"""
+
+import argparse
+import json
+import os
+from urllib.parse import quote
+
+from services.github_api import get_api_url, get_headers, send_request
+from services.rate_limiter import INTERACTIVE
+
+DEFAULT_CATALOG_PATH = os.path.join('data', 'catalog.jsonl')
+PER_PAGE = 100
+
+
+def get_catalog_path():
+    """Location of the saved catalog (GITHUB_CATALOG_PATH)."""
+    return os.getenv("GITHUB_CATALOG_PATH", DEFAULT_CATALOG_PATH)
+
+
+def iter_pages(url, params=None, items_key=None, priority=INTERACTIVE):
+    """Yield the items of every page of a list endpoint, following ``Link: next``."""
+    headers = get_headers()
+    params = {"per_page": PER_PAGE, **(params or {})}
+    while url:
+        response = send_request("GET", url, priority=priority, headers=headers, params=params, timeout=30)
+        response.raise_for_status()
+        payload = response.json()
+        yield from (payload.get(items_key, []) if items_key else payload)
+        url = response.links.get('next', {}).get('url')
+        # The next URL already carries the query string
+        params = None
+
+
+def iter_org_repos(org, priority=INTERACTIVE):
+    """Every public repository of an organization."""
+    return iter_pages(
+        f"{get_api_url()}/orgs/{quote(org)}/repos", {"type": "public", "sort": "full_name"},
+        priority=priority
+    )
+
+
+def iter_search_repos(query, priority=INTERACTIVE):
+    """Repositories matching a search query, most starred first.
+
+    GitHub's search API returns at most 1,000 results per query; split broad
+    queries (for example by ``stars:`` ranges) to go beyond that.
+    """
+    return iter_pages(
+        f"{get_api_url()}/search/repositories", {"q": query, "sort": "stars", "order": "desc"},
+        items_key='items', priority=priority
+    )
+
+
+def iter_topic_repos(topic, priority=INTERACTIVE):
+    """Repositories tagged with a topic, most starred first."""
+    return iter_search_repos(f"topic:{topic}", priority=priority)
+
+
+def catalog_entry(repo, source):
+    """Compact catalog row from a repository listing item."""
+    return {
+        'name': repo['full_name'],
+        'repo': repo['full_name'],
+        'stars': repo.get('stargazers_count', 0),
+        'description': repo.get('description') or '',
+        'source': source,
+    }
+
+
+def iter_sources(orgs=(), topics=(), queries=(), priority=INTERACTIVE):
+    """Yield ``(repo, source)`` pairs from every requested source in turn."""
+    for org in orgs:
+        for repo in iter_org_repos(org, priority):
+            yield repo, f"org:{org}"
+    for topic in topics:
+        for repo in iter_topic_repos(topic, priority):
+            yield repo, f"topic:{topic}"
+    for query in queries:
+        for repo in iter_search_repos(query, priority):
+            yield repo, f"search:{query}"
+
+
+def build_catalog(orgs=(), topics=(), queries=(), path=None, merge=True, priority=INTERACTIVE):
+    """Stream repositories from the given sources into the catalog file.
+
+    Entries are written as they arrive (deduplicated by case-insensitive full
+    name, keeping existing entries when ``merge`` is set) and the file is
+    swapped in atomically at the end; if the build fails, the existing
+    catalog is kept and the partial file removed. Returns the number of
+    entries saved.
+    """
+    path = path or get_catalog_path()
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    seen = set()
+    tmp_path = path + '.tmp'
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as out:
+            if merge:
+                for entry in iter_catalog(path):
+                    seen.add(entry['repo'].lower())
+                    out.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            for repo, source in iter_sources(orgs, topics, queries, priority):
+                key = repo['full_name'].lower()
+                if key in seen or repo.get('archived'):
+                    continue
+                seen.add(key)
+                out.write(json.dumps(catalog_entry(repo, source), ensure_ascii=False) + '\n')
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return len(seen)
+
+
+def iter_catalog(path=None):
+    """Stream saved catalog entries; yields nothing when no catalog exists."""
+    path = path or get_catalog_path()
+    if not os.path.exists(path):
+        return
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def load_catalog(path=None):
+    """Saved catalog as an ordered ``{name: owner/repo}`` dict."""
+    return {entry['name']: entry['repo'] for entry in iter_catalog(path)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the local repository catalog.")
+    parser.add_argument('--org', action='append', default=[], help='organization login (repeatable)')
+    parser.add_argument('--topic', action='append', default=[], help='repository topic (repeatable)')
+    parser.add_argument('--search', action='append', default=[], help='search query (repeatable)')
+    parser.add_argument('--path', help=f'catalog file (default: {DEFAULT_CATALOG_PATH})')
+    parser.add_argument('--replace', action='store_true', help='start from an empty catalog instead of merging')
+    args = parser.parse_args(argv)
+    count = build_catalog(args.org, args.topic, args.search, path=args.path, merge=not args.replace)
+    print(f"{count} repositories in {args.path or get_catalog_path()}")
+
+
+if __name__ == '__main__':
+    main()
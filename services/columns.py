@@ -0,0 +1,9 @@
+"""Column names shared by the fetch layer and the processing stages.
+
+Kept free of imports so that ``processing`` can use them without loading
+the HTTP stack.
+"""
+
+# Activity metrics filled in from /repos/{path}/stats/* (see github_stats)
+ACTIVITY_COLUMNS = ['Commits 52w', 'Commits 4w', 'Contributors', 'Additions 52w', 'Deletions 52w',
+                    'Owner Commits (%)']
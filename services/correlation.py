@@ -0,0 +1,164 @@
+"""Vectorized correlation engine: Pearson and Spearman matrices with p-values.
+
+Every pair of metrics is computed in one pass of matrix products over the
+data, with pairwise deletion of missing values done through a presence mask
+(the same pairs ``DataFrame.corr`` would use). Two-sided p-values follow
+``scipy.stats.pearsonr`` and are optionally adjusted for multiple testing
+over the distinct pairs (Holm or Benjamini-Hochberg).
+"""
+
+import numpy as np
+import pandas as pd
+
+from services.diagnostics import instrument
+
+METHODS = ('pearson', 'spearman')
+CORRECTIONS = ('holm', 'fdr_bh')
+
+
+def _masked_pearson(X, present):
+    """Pairwise-complete Pearson r and pair counts for the columns of ``X``."""
+    M = present.astype(float)
+    # Centering each column first keeps the sums of squares well conditioned
+    Xc = np.where(present, X - np.nanmean(np.where(present, X, np.nan), axis=0), 0.0)
+    n = M.T @ M
+    sums = Xc.T @ M                 # sums[i, j]: sum of column i over rows where j is present
+    squares = (Xc * Xc).T @ M
+    products = Xc.T @ Xc
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = products - sums * sums.T / n
+        var_i = squares - sums ** 2 / n
+        r = cov / np.sqrt(var_i * var_i.T)
+    r = np.clip(r, -1.0, 1.0)
+    r[n < 2] = np.nan
+    return r, n
+
+
+def _pvalues(r, n):
+    """Two-sided p-values of ``r`` under H0: rho = 0 (exact t / beta distribution)."""
+    # SciPy is only loaded once p-values are actually needed
+    from scipy.special import betainc
+
+    dof = n - 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = betainc(dof / 2, 0.5, np.clip(1.0 - r * r, 0.0, 1.0))
+    p[dof < 1] = np.nan
+    return p
+
+
+def _rank_columns(X):
+    """Average ranks of each column among its non-missing values (NaN stays NaN)."""
+    order = np.argsort(X, axis=0)       # NaN sorts last
+    ranks = np.full(X.shape, np.nan)
+    for c in range(X.shape[1]):
+        values = X[order[:, c], c]
+        m = int((~np.isnan(values)).sum())
+        values = values[:m]
+        starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
+        ends = np.r_[starts[1:], m]
+        # Tied values share the mean of their 1-based positions
+        ranks[order[:m, c], c] = np.repeat((starts + ends + 1) / 2, ends - starts)
+    return ranks
+
+
+def _spearman(X, present):
+    r, n = _masked_pearson(_rank_columns(X), present)
+    # Per-column ranks are exact only for pairs whose columns are missing on the same
+    # rows. The remaining pairs are re-ranked on their common rows, one rank pass per
+    # distinct common-row mask (usually one per incomplete column)
+    groups = {}
+    k = X.shape[1]
+    for i in range(k):
+        for j in range(i + 1, k):
+            if np.array_equal(present[:, i], present[:, j]):
+                continue
+            common = present[:, i] & present[:, j]
+            if common.sum() >= 2:
+                mask_key = np.packbits(common).tobytes()
+                groups.setdefault(mask_key, (common, []))[1].append((i, j))
+    for common, pairs in groups.values():
+        involved = sorted({col for pair in pairs for col in pair})
+        sub = np.corrcoef(_rank_columns(X[common][:, involved]), rowvar=False)
+        position = {col: idx for idx, col in enumerate(involved)}
+        for i, j in pairs:
+            r[i, j] = r[j, i] = np.clip(sub[position[i], position[j]], -1.0, 1.0)
+    return r, n
+
+
+def adjust_pvalues(p, method='holm'):
+    """Adjust a square p-value matrix over its distinct (upper-triangle) pairs."""
+    if method not in CORRECTIONS:
+        raise ValueError(f"unknown correction {method!r}, expected one of {CORRECTIONS}")
+    adjusted = np.full_like(p, np.nan, dtype=float)
+    iu = np.triu_indices_from(p, k=1)
+    values = p[iu]
+    valid = ~np.isnan(values)
+    m = int(valid.sum())
+    out = np.full(values.shape, np.nan)
+    if m:
+        order = np.argsort(values[valid])
+        ranked = values[valid][order]
+        if method == 'holm':
+            stepped = np.maximum.accumulate((m - np.arange(m)) * ranked)
+        else:
+            stepped = np.minimum.accumulate((m / np.arange(m, 0, -1) * ranked[::-1]))[::-1]
+        result = np.empty(m)
+        result[order] = np.minimum(stepped, 1.0)
+        out[valid] = result
+    adjusted[iu] = out
+    adjusted.T[iu] = out
+    np.fill_diagonal(adjusted, 0.0)
+    return adjusted
+
+
+@instrument('stats')
+def correlation_matrices(df: pd.DataFrame, cols=None, methods=METHODS, correction=None) -> dict:
+    """Correlation, p-value and pair-count matrices for every pair of ``cols``.
+
+    Returns a dict of DataFrames indexed by metric: ``'<method>'`` and
+    ``'<method>_p'`` for each requested method, ``'<method>_p_adj'`` when a
+    ``correction`` is given, and ``'n'`` with the number of complete pairs.
+    """
+    cols = list(cols) if cols is not None else list(df.select_dtypes('number').columns)
+    X = df[cols].to_numpy(dtype=float)
+    present = ~np.isnan(X)
+    frame = lambda values: pd.DataFrame(values, index=cols, columns=cols)
+
+    result = {}
+    n = None
+    for method in methods:
+        if method == 'pearson':
+            r, n = _masked_pearson(X, present)
+        elif method == 'spearman':
+            r, n = _spearman(X, present)
+        else:
+            raise ValueError(f"unknown method {method!r}, expected one of {METHODS}")
+        # Constant columns keep a NaN diagonal, like DataFrame.corr
+        diagonal = np.diagonal(r).copy()
+        np.fill_diagonal(r, np.where(np.isnan(diagonal), np.nan, 1.0))
+        p = _pvalues(r, n)
+        result[method] = frame(r)
+        result[f'{method}_p'] = frame(p)
+        if correction:
+            result[f'{method}_p_adj'] = frame(adjust_pvalues(p, correction))
+    if n is not None:
+        result['n'] = frame(n.astype(int))
+    return result
+
+
+def correlation_pairs(matrices: dict, alpha: float = 0.05) -> pd.DataFrame:
+    """Long table with one row per distinct metric pair, read from ``correlation_matrices``."""
+    cols = next(iter(matrices.values())).columns
+    iu = np.triu_indices(len(cols), k=1)
+    table = pd.DataFrame({'Metric A': cols[iu[0]], 'Metric B': cols[iu[1]], 'n': matrices['n'].to_numpy()[iu]})
+    for method in METHODS:
+        if method not in matrices:
+            continue
+        label = method.capitalize()
+        table[label] = matrices[method].to_numpy()[iu]
+        table[f'{label} p'] = matrices[f'{method}_p'].to_numpy()[iu]
+        p_key = f'{method}_p_adj' if f'{method}_p_adj' in matrices else f'{method}_p'
+        if p_key != f'{method}_p':
+            table[f'{label} p (hiệu chỉnh)'] = matrices[p_key].to_numpy()[iu]
+        table[f'{label} có ý nghĩa'] = matrices[p_key].to_numpy()[iu] < alpha
+    return table
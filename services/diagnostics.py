@@ -0,0 +1,157 @@
+"""Process-wide stage timings, counters and cache/rate-limit gauges.
+
+Fetch, processing, chart and export functions are wrapped with
+``instrument``; each call records its wall time, and optionally the size in
+bytes of its result, under ``<kind>.<function name>``. Modules that own a
+cache or the request scheduler register a ``source`` whose stats are read
+only when a snapshot is taken. Snapshots export as JSON or Prometheus text.
+
+Recording is off unless DIAGNOSTICS=1 or ``enable()`` is called (the
+sidebar toggle); while off, an instrumented call costs one flag check.
+Numbers cover the current process only: worker processes (``cli.py
+--workers``, resampling pools) keep their own.
+"""
+
+import functools
+import json
+import os
+import re
+import threading
+import time
+
+_enabled = os.getenv("DIAGNOSTICS", "").strip().lower() in ("1", "true", "yes")
+_lock = threading.Lock()
+_stages = {}
+_counters = {}
+_sources = {}
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable(flag: bool = True):
+    """Turn recording on or off for the whole process (recorded numbers are kept)."""
+    global _enabled
+    _enabled = bool(flag)
+
+
+def record(name: str, kind: str, seconds: float, nbytes: int = 0, error: bool = False):
+    """Add one call of stage ``name`` to the totals."""
+    with _lock:
+        stage = _stages.get(name)
+        if stage is None:
+            stage = _stages[name] = {'kind': kind, 'calls': 0, 'errors': 0, 'seconds': 0.0, 'max_seconds': 0.0,
+                                     'bytes': 0}
+        stage['calls'] += 1
+        stage['errors'] += error
+        stage['seconds'] += seconds
+        stage['max_seconds'] = max(stage['max_seconds'], seconds)
+        stage['bytes'] += nbytes
+
+
+def count(name: str, value: int = 1):
+    """Increase counter ``name`` (no-op while recording is off)."""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def instrument(kind: str, size=None, name: str = None):
+    """Decorator timing every call as stage ``<kind>.<name>`` (default: the function name).
+
+    ``size(result)`` returns the number of bytes to record for a call; it is
+    only evaluated while recording is on.
+    """
+    def decorate(func):
+        stage = f"{kind}.{name or func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except BaseException:
+                record(stage, kind, time.perf_counter() - start, error=True)
+                raise
+            elapsed = time.perf_counter() - start
+            record(stage, kind, elapsed, size(result) if size is not None and result is not None else 0)
+            return result
+        return wrapper
+    return decorate
+
+
+def register_source(name: str, stats):
+    """Include ``stats()`` (a dict of numbers) in every snapshot under ``name``."""
+    with _lock:
+        _sources[name] = stats
+
+
+def snapshot() -> dict:
+    """Copy of every stage, counter and source."""
+    with _lock:
+        stages = {name: dict(stage) for name, stage in _stages.items()}
+        counters = dict(_counters)
+        sources = dict(_sources)
+    gauges = {}
+    for name, stats in sources.items():
+        try:
+            gauges[name] = stats() or {}
+        except Exception as e:  # a broken source must not break the panel
+            gauges[name] = {'error': str(e)}
+    return {'enabled': _enabled, 'timestamp': time.time(), 'stages': stages, 'counters': counters,
+            'sources': gauges}
+
+
+def reset():
+    """Forget recorded stages and counters (sources stay registered)."""
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+
+
+def to_json(snap: dict = None) -> str:
+    return json.dumps(snap or snapshot(), ensure_ascii=False, indent=2, default=str)
+
+
+def _label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _metric_name(value) -> str:
+    return re.sub(r'[^a-zA-Z0-9_]', '_', str(value))
+
+
+def to_prometheus(snap: dict = None, prefix: str = 'github_stats') -> str:
+    """Prometheus text exposition format of a snapshot."""
+    snap = snap or snapshot()
+    lines = []
+
+    def family(metric, kind, help_text, samples):
+        lines.append(f"# HELP {prefix}_{metric} {help_text}")
+        lines.append(f"# TYPE {prefix}_{metric} {kind}")
+        for labels, value in samples:
+            rendered = ','.join(f'{key}="{_label(val)}"' for key, val in labels.items())
+            lines.append(f"{prefix}_{metric}{{{rendered}}} {value}")
+
+    stages = sorted(snap['stages'].items())
+    for field, metric, kind, help_text in [
+        ('calls', 'stage_calls_total', 'counter', 'Calls per instrumented stage.'),
+        ('errors', 'stage_errors_total', 'counter', 'Calls that raised an exception.'),
+        ('seconds', 'stage_seconds_total', 'counter', 'Wall time spent per stage.'),
+        ('max_seconds', 'stage_max_seconds', 'gauge', 'Slowest single call per stage.'),
+        ('bytes', 'stage_bytes_total', 'counter', 'Bytes produced or received per stage.'),
+    ]:
+        family(metric, kind, help_text,
+               [({'stage': name, 'kind': stage['kind']}, stage[field]) for name, stage in stages])
+    family('events_total', 'counter', 'Event counters.',
+           [({'name': name}, value) for name, value in sorted(snap['counters'].items())])
+    for source, stats in sorted(snap['sources'].items()):
+        numeric = [({'field': key}, float(value)) for key, value in sorted(stats.items())
+                   if isinstance(value, (int, float)) and not isinstance(value, bool)]
+        if numeric:
+            family(_metric_name(source), 'gauge', f'Current {source} stats.', numeric)
+    return '\n'.join(lines) + '\n'
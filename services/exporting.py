@@ -1,21 +1,238 @@
+"""Chunked exporters for the summary table and the HTML report.
+
+Each ``iter_*`` function is a generator of ``bytes`` chunks. The overview
+table is encoded ``chunk_rows`` rows at a time, so writing a large catalog
+to a file never holds the whole text (or a second copy of the frame in one
+big string) in memory. Parquet and Arrow IPC need ``pyarrow``, which is
+imported only when those formats are used.
+
+The download buttons need the complete file, so ``cached_export`` joins the
+chunks once and keeps the result in a byte-bounded LRU keyed by the data
+fingerprint and export options. Reruns that do not change the data reuse the
+cached bytes instead of encoding the report again.
+"""
+
+import html
+import importlib.util
+import io
+import os
+import time
+
+import numpy as np
 import pandas as pd
 
+from services import diagnostics
+from services.cache_utils import LRUCache
 
-def build_html_report(df: pd.DataFrame, stats: pd.DataFrame, grouped: pd.DataFrame) -> bytes:
-    html = f"""
+DEFAULT_CHUNK_ROWS = 5_000
+DEFAULT_EXPORT_CACHE_SIZE = 16
+DEFAULT_EXPORT_CACHE_MAX_MB = 256
+
+# Định dạng bảng -> (phần mở rộng, MIME)
+TABLE_FORMATS = {
+    'csv': ('csv', 'text/csv'),
+    'parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'arrow': ('arrow', 'application/vnd.apache.arrow.file'),
+}
+
+
+def _env_number(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+_export_cache = LRUCache(
+    maxsize=int(_env_number("EXPORT_CACHE_SIZE", DEFAULT_EXPORT_CACHE_SIZE)),
+    max_weight=int(_env_number("EXPORT_CACHE_MAX_MB", DEFAULT_EXPORT_CACHE_MAX_MB) * 1024 * 1024),
+    weigh=len,
+)
+diagnostics.register_source('export_cache', _export_cache.stats)
+
+
+def get_export_cache() -> LRUCache:
+    return _export_cache
+
+
+def arrow_available() -> bool:
+    """Parquet/Arrow export needs pyarrow (checked without importing it)."""
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def available_formats():
+    return [fmt for fmt in TABLE_FORMATS if fmt == 'csv' or arrow_available()]
+
+
+def _row_chunks(df: pd.DataFrame, chunk_rows: int):
+    chunk_rows = max(1, int(chunk_rows))
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+# --- Table formats ---
+
+def iter_csv(df: pd.DataFrame, chunk_rows: int = DEFAULT_CHUNK_ROWS, index: bool = False):
+    """CSV as UTF-8 chunks: the header, then ``chunk_rows`` rows per chunk."""
+    yield df.iloc[:0].to_csv(index=index).encode('utf-8')
+    for chunk in _row_chunks(df, chunk_rows):
+        yield chunk.to_csv(index=index, header=False).encode('utf-8')
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object whose written bytes are drained between row groups / batches."""
+
+    def __init__(self):
+        super().__init__()
+        self._parts = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data, self._parts = b''.join(self._parts), []
+        return data
+
+
+def _arrow_table(df: pd.DataFrame, index: bool):
+    import pyarrow as pa
+
+    # One conversion for the whole frame keeps a single schema (and one dictionary per category column)
+    return pa.Table.from_pandas(df, preserve_index=index)
+
+
+def iter_parquet(df: pd.DataFrame, chunk_rows: int = DEFAULT_CHUNK_ROWS, index: bool = False):
+    """Parquet with one row group per ``chunk_rows`` rows, yielded as each group is written."""
+    import pyarrow.parquet as pq
+
+    table = _arrow_table(df, index)
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=max(1, int(chunk_rows))):
+            writer.write_batch(batch)
+            data = sink.drain()
+            if data:
+                yield data
+    yield sink.drain()
+
+
+def iter_arrow(df: pd.DataFrame, chunk_rows: int = DEFAULT_CHUNK_ROWS, index: bool = False):
+    """Arrow IPC file (Feather v2) with one record batch per ``chunk_rows`` rows."""
+    import pyarrow as pa
+
+    table = _arrow_table(df, index)
+    sink = _ChunkSink()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=max(1, int(chunk_rows))):
+            writer.write_batch(batch)
+            data = sink.drain()
+            if data:
+                yield data
+    yield sink.drain()
+
+
+def iter_table(df: pd.DataFrame, fmt: str, chunk_rows: int = DEFAULT_CHUNK_ROWS, index: bool = False):
+    writers = {'csv': iter_csv, 'parquet': iter_parquet, 'arrow': iter_arrow}
+    if fmt not in writers:
+        raise ValueError(f"unknown export format {fmt!r}, expected one of {tuple(writers)}")
+    return writers[fmt](df, chunk_rows, index)
+
+
+# --- HTML report ---
+
+def _float_formatters(df: pd.DataFrame, max_decimals: int = 6):
+    """Một định dạng cho mỗi cột số thực, tính trên cả cột.
+
+    pandas chọn số chữ số thập phân theo giá trị của từng khối, nên nếu để
+    mặc định thì cùng một giá trị có thể hiện thành 4.5 hoặc 4.50 tùy cách
+    chia khối.
+    """
+    formatters = {}
+    for col in df.columns:
+        if not pd.api.types.is_float_dtype(df[col].dtype):
+            continue
+        values = df[col].to_numpy(dtype=float)
+        finite = values[np.isfinite(values)]
+        decimals = next((d for d in range(1, max_decimals)
+                         if np.allclose(np.round(finite, d), finite, rtol=0, atol=1e-9)), max_decimals)
+        formatters[col] = lambda x, d=decimals: 'NaN' if pd.isna(x) else f'{x:.{d}f}'
+    return formatters
+
+
+def _iter_html_table(df: pd.DataFrame, chunk_rows: int, index: bool):
+    # Khung bảng lấy từ pandas (0 dòng), các dòng được render theo từng khối
+    shell = df.iloc[:0].to_html(index=index)
+    head, _, tail = shell.partition('<tbody>')
+    yield head + '<tbody>\n'
+    formatters = _float_formatters(df)
+    for chunk in _row_chunks(df, chunk_rows):
+        rendered = chunk.to_html(index=index, header=False, formatters=formatters)
+        rows = rendered[rendered.index('<tbody>') + len('<tbody>'):rendered.rindex('</tbody>')].strip()
+        yield '    ' + rows + '\n'
+    yield '  </tbody>' + tail.partition('</tbody>')[2]
+
+
+def iter_html_report(df: pd.DataFrame, stats: pd.DataFrame, grouped: pd.DataFrame,
+                     chunk_rows: int = DEFAULT_CHUNK_ROWS):
+    """HTML report as UTF-8 chunks; the overview table is rendered ``chunk_rows`` rows at a time."""
+    def parts():
+        yield f"""
     <html>
     <head><meta charset='utf-8'><title>Báo cáo Frameworks</title></head>
     <body>
     <h1>Báo cáo Phân tích Frameworks</h1>
-    <h2>Ngày tạo: {pd.Timestamp.utcnow()}</h2>
+    <h2>Ngày tạo: {html.escape(str(pd.Timestamp.utcnow()))}</h2>
     <h3>Tổng quan</h3>
-    {df.to_html(index=False)}
+    """
+        yield from _iter_html_table(df, chunk_rows, index=False)
+        # Bảng thống kê và bảng nhóm chỉ có vài dòng
+        yield f"""
     <h3>Thống kê mô tả</h3>
     {stats.to_html()}
     <h3>Nhóm theo License</h3>
     {grouped.to_html()}
     </body></html>
     """
-    return html.encode('utf-8')
+    for part in parts():
+        yield part.encode('utf-8')
+
+
+@diagnostics.instrument('export', size=len)
+def build_html_report(df: pd.DataFrame, stats: pd.DataFrame, grouped: pd.DataFrame) -> bytes:
+    return b''.join(iter_html_report(df, stats, grouped))
+
+
+def write_chunks(chunks, path):
+    """Write a chunk generator to ``path``; returns the number of bytes written."""
+    written = 0
+    with open(path, 'wb') as f:
+        for chunk in chunks:
+            f.write(chunk)
+            written += len(chunk)
+    return written
+
 
+# --- Cache ---
 
+def cached_export(key, fmt: str, chunks):
+    """Bytes of ``chunks()`` for ``key`` (fingerprint + options), encoded at most once while cached."""
+    sentinel = object()
+    data = _export_cache.get(key, sentinel)
+    if data is not sentinel:
+        return data
+    start = time.perf_counter()
+    data = b''.join(chunks())
+    if diagnostics.enabled():
+        diagnostics.record(f'export.{fmt}', 'export', time.perf_counter() - start, len(data))
+    _export_cache.put(key, data)
+    return data
@@ -1,11 +1,48 @@
+import json
+import logging
 import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
-import streamlit as st
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+from services.diagnostics import instrument, register_source
+from services.http_cache import DEFAULT_CACHE_PATH, DEFAULT_MAX_BYTES, ResponseCache
+from services.rate_limiter import DEFAULT_MAX_WAIT, INTERACTIVE, RateLimited, RequestScheduler
+from services.shared_cache import DEFAULT_SHARED_CACHE_PATH, DEFAULT_TTL, SharedCache, SingleFlight
+from services.runtime import cache_data, report_error, thread_initializer
+from services.snapshots import get_snapshot_path, record_snapshots
 
 # Load environment variables from .env file
 load_dotenv()
 
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_API_URL = "https://api.github.com"
+
+_session = None
+_session_lock = threading.Lock()
+_response_cache = None
+_response_cache_lock = threading.Lock()
+_scheduler = None
+_scheduler_lock = threading.Lock()
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+# Coalesces concurrent loads when the shared cache is disabled
+_flights = SingleFlight()
+# Records fetched upstream since the last snapshot write (written in one batch per load)
+_pending_snapshots = []
+_pending_lock = threading.Lock()
+
+logger = logging.getLogger('services')
+
+register_source('rate_limit', lambda: _scheduler.stats() if _scheduler is not None else {})
+register_source('response_cache', lambda: _response_cache.stats() if _response_cache is not None else {})
+register_source('shared_cache', lambda: _shared_cache.stats() if _shared_cache is not None
+                else {'coalesced': _flights.coalesced})
+
 
 def get_headers():
     """Get GitHub API headers with authentication if token is available."""
@@ -13,51 +50,281 @@ def get_headers():
         "Accept": "application/vnd.github+json",
         "X-GitHub-Api-Version": "2022-11-28"
     }
-    
+
     # Add Authorization header if token is available
     github_token = os.getenv("GITHUB_TOKEN")
     if github_token:
         headers["Authorization"] = f"Bearer {github_token}"
-    
+
     return headers
 
 
-@st.cache_data(ttl=3600)
-def get_framework_data(framework_name, repo_path):
-    """Fetch single repository data from GitHub API."""
-    url = f"https://api.github.com/repos/{repo_path}"
-    headers = get_headers()
+def get_api_url():
+    """Base URL of the GitHub API (GITHUB_API_URL), e.g. a GitHub Enterprise or local stand-in."""
+    return os.getenv("GITHUB_API_URL", DEFAULT_API_URL).rstrip('/')
+
+
+def get_max_workers():
+    """Concurrency limit for repository fetches (GITHUB_MAX_WORKERS, default 8)."""
+    try:
+        return max(1, int(os.getenv("GITHUB_MAX_WORKERS", DEFAULT_MAX_WORKERS)))
+    except ValueError:
+        return DEFAULT_MAX_WORKERS
+
+
+def get_session():
+    """Return the process-wide keep-alive session shared by all fetches."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                pool_size = get_max_workers()
+                adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def _env_number(name, default, cast=float):
+    try:
+        return cast(os.getenv(name, default))
+    except ValueError:
+        return cast(default)
+
+
+def get_interactive_max_wait():
+    """Longest rate-limit wait for interactive requests (GITHUB_INTERACTIVE_MAX_WAIT seconds, empty: no limit)."""
+    value = os.getenv("GITHUB_INTERACTIVE_MAX_WAIT", str(DEFAULT_MAX_WAIT)).strip()
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return DEFAULT_MAX_WAIT
+
+
+def get_scheduler():
+    """Return the process-wide request scheduler.
+
+    Tuned with GITHUB_RATE_LIMIT_RPS, GITHUB_RATE_LIMIT_BURST,
+    GITHUB_MAX_RETRIES and GITHUB_INTERACTIVE_MAX_WAIT.
+    """
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = RequestScheduler(
+                    rate=_env_number("GITHUB_RATE_LIMIT_RPS", 10),
+                    burst=_env_number("GITHUB_RATE_LIMIT_BURST", 20, int),
+                    max_retries=_env_number("GITHUB_MAX_RETRIES", 4, int),
+                    max_wait=get_interactive_max_wait(),
+                )
+    return _scheduler
+
+
+@instrument('fetch', size=lambda response: len(response.content), name='http_request')
+def send_request(method, url, priority=INTERACTIVE, **kwargs):
+    """Send a request over the shared session through the scheduler."""
+    return get_scheduler().request(get_session(), method, url, priority=priority, **kwargs)
+
+
+def get_response_cache():
+    """Return the on-disk conditional-request cache, or ``None`` if disabled.
+
+    Configured with GITHUB_CACHE_PATH (empty string disables it) and
+    GITHUB_CACHE_MAX_MB.
+    """
+    global _response_cache
+    path = os.getenv("GITHUB_CACHE_PATH", DEFAULT_CACHE_PATH)
+    if not path:
+        return None
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                max_mb = _env_number("GITHUB_CACHE_MAX_MB", DEFAULT_MAX_BYTES / (1024 * 1024))
+                _response_cache = ResponseCache(path, int(max_mb * 1024 * 1024))
+    return _response_cache
+
+
+def get_shared_cache():
+    """Return the host-wide fetched-data cache, or ``None`` if disabled.
+
+    Configured with GITHUB_SHARED_CACHE_PATH (empty string disables it) and
+    GITHUB_SHARED_CACHE_TTL (seconds).
+    """
+    global _shared_cache
+    path = os.getenv("GITHUB_SHARED_CACHE_PATH", DEFAULT_SHARED_CACHE_PATH)
+    if not path:
+        return None
+    if _shared_cache is None:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                _shared_cache = SharedCache(path, ttl=_env_number("GITHUB_SHARED_CACHE_TTL", DEFAULT_TTL))
+    return _shared_cache
+
+
+def load_shared(key, load):
+    """``load()`` through the shared cache; concurrent callers for ``key`` share one upstream call."""
+    cache = get_shared_cache()
+    if cache is None:
+        return _flights.do(key, load)
+    return cache.get_or_load(key, load)
+
+
+def fetch_json(url, headers=None, timeout=15, priority=INTERACTIVE):
+    """GET ``url`` and decode JSON, revalidating against the response cache.
+
+    Raises ``requests.exceptions.RequestException`` on HTTP or network errors.
+    When the rate limit would hold the request too long (``RateLimited``), the
+    cached copy is returned if there is one.
+    """
+    headers = headers or get_headers()
+    cache = get_response_cache()
+    key = entry = None
+    if cache is not None:
+        key = cache.make_key(url, headers)
+        entry = cache.lookup(key)
+        headers = {**headers, **cache.conditional_headers(entry)}
+
     try:
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
-        repo_data = response.json()
-        return {
-            'Framework': framework_name,
-            'Repo': repo_path,
-            'Stars': repo_data.get('stargazers_count', 0),
-            'Forks': repo_data.get('forks_count', 0),
-            'Watchers': repo_data.get('subscribers_count', 0),
-            'Open Issues': repo_data.get('open_issues_count', 0),
-            'Description': repo_data.get('description', ''),
-            'License': (repo_data.get('license') or {}).get('spdx_id', 'NOASSERTION'),
-            'Created At': repo_data.get('created_at'),
-            'Updated At': repo_data.get('updated_at'),
-            'Pushed At': repo_data.get('pushed_at'),
-            'Size (KB)': repo_data.get('size', 0)
-        }
+        response = send_request("GET", url, priority=priority, headers=headers, timeout=timeout)
+    except RateLimited:
+        if entry is None:
+            raise
+        return json.loads(entry.body)
+    if response.status_code == 304 and entry is not None:
+        cache.record_hit(key)
+        return json.loads(entry.body)
+    response.raise_for_status()
+    if cache is not None:
+        cache.store(key, response.headers.get('ETag'), response.headers.get('Last-Modified'), response.content)
+    return response.json()
+
+
+def build_record(framework_name, repo_path, repo_data):
+    """Map a REST ``/repos/{path}`` payload to the record shape used by the app."""
+    return {
+        'Framework': framework_name,
+        'Repo': repo_path,
+        'Stars': repo_data.get('stargazers_count', 0),
+        'Forks': repo_data.get('forks_count', 0),
+        'Watchers': repo_data.get('subscribers_count', 0),
+        'Open Issues': repo_data.get('open_issues_count', 0),
+        'Description': repo_data.get('description', ''),
+        'License': (repo_data.get('license') or {}).get('spdx_id', 'NOASSERTION'),
+        'Created At': repo_data.get('created_at'),
+        'Updated At': repo_data.get('updated_at'),
+        'Pushed At': repo_data.get('pushed_at'),
+        'Size (KB)': repo_data.get('size', 0)
+    }
+
+
+def save_snapshots(records):
+    """Append fetched records to the snapshot store in one transaction.
+
+    A failed write is logged and never drops the fetched data.
+    """
+    if not records or not get_snapshot_path():
+        return
+    try:
+        record_snapshots(records)
+    except (sqlite3.Error, OSError) as e:
+        logger.warning("Could not record %d snapshot(s): %s", len(records), e)
+
+
+def flush_snapshots():
+    """Write the records fetched by ``fetch_framework_data`` since the last flush."""
+    global _pending_snapshots
+    with _pending_lock:
+        records, _pending_snapshots = _pending_snapshots, []
+    save_snapshots(records)
+
+
+@instrument('fetch')
+def fetch_framework_data(framework_name, repo_path, priority=INTERACTIVE):
+    """Fetch single repository data from GitHub API (not memoized).
+
+    The record is queued for the snapshot store; ``get_frameworks_data``
+    writes the queue once per load (``flush_snapshots``).
+    """
+    url = f"{get_api_url()}/repos/{repo_path}"
+    try:
+        record = build_record(framework_name, repo_path, fetch_json(url, priority=priority))
     except requests.exceptions.RequestException as e:
-        st.error(f"Lỗi khi gọi API cho {framework_name}: {e}")
+        report_error(f"Lỗi khi gọi API cho {framework_name}: {e}")
         return None
+    if get_snapshot_path():
+        with _pending_lock:
+            _pending_snapshots.append(record)
+    return record
+
+
+def load_framework_data(framework_name, repo_path, priority=INTERACTIVE):
+    """``fetch_framework_data`` through the host-wide cache (one request per repo at a time)."""
+    return load_shared(
+        f"repo|{get_api_url()}|{repo_path}|{framework_name}",
+        lambda: fetch_framework_data(framework_name, repo_path, priority)
+    )
+
 
+@cache_data(ttl=3600, cache_if=lambda record: record is not None)
+def get_framework_data(framework_name, repo_path, _priority=INTERACTIVE):
+    """Fetch single repository data from GitHub API, memoized for an hour (failures are retried)."""
+    return load_framework_data(framework_name, repo_path, _priority)
 
-def get_frameworks_data(frameworks_dict, selected):
-    data = []
-    for name, path in frameworks_dict.items():
-        if selected and name not in selected:
-            continue
-        item = get_framework_data(name, path)
-        if item:
-            data.append(item)
-    return data
 
+def get_backend():
+    """Selected fetch backend: ``rest`` (default) or ``graphql`` (GITHUB_BACKEND)."""
+    backend = os.getenv("GITHUB_BACKEND", "rest").strip().lower()
+    # GraphQL API does not accept anonymous requests
+    if backend == "graphql" and os.getenv("GITHUB_TOKEN"):
+        return "graphql"
+    return "rest"
 
+
+def map_concurrent(func, items, max_workers=None):
+    """Apply ``func`` to ``items`` on a bounded thread pool, keeping input order."""
+    items = list(items)
+    workers = min(max_workers or get_max_workers(), len(items))
+    if workers <= 1:
+        return [func(item) for item in items]
+    # Worker threads need the script context for st.cache_data/st.error
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="github-fetch", initializer=thread_initializer()
+    ) as executor:
+        return list(executor.map(func, items))
+
+
+@instrument('fetch')
+def get_frameworks_data(frameworks_dict, selected, max_workers=None, backend=None, priority=INTERACTIVE,
+                        fresh=False):
+    """Fetch the selected repositories concurrently, keeping input order.
+
+    Up to ``max_workers`` requests (default: GITHUB_MAX_WORKERS) run at once
+    over the shared session, so a cold load costs roughly the slowest
+    round-trip instead of the sum of all of them. With the ``graphql``
+    backend, repositories are fetched in batches of up to 100 per request.
+    ``priority=BACKGROUND`` queues the requests behind interactive loads.
+    ``fresh=True`` skips the per-process one-hour memo (the host-wide cache,
+    which is shorter-lived, and the conditional-request cache still apply);
+    the background refresher relies on it.
+    """
+    targets = [
+        (name, path) for name, path in frameworks_dict.items()
+        if not selected or name in selected
+    ]
+    if not targets:
+        return []
+
+    if (backend or get_backend()) == "graphql":
+        from services.github_graphql import get_frameworks_data_graphql
+        return get_frameworks_data_graphql(targets, max_workers=max_workers, priority=priority, fresh=fresh)
+
+    fetch = load_framework_data if fresh else get_framework_data
+    try:
+        results = map_concurrent(lambda target: fetch(*target, priority), targets, max_workers)
+    finally:
+        flush_snapshots()
+    return [item for item in results if item]
@@ -0,0 +1,133 @@
+"""Batched GraphQL backend for repository metadata.
+
+Fetches the same fields as the REST ``/repos/{path}`` call for up to 100
+repositories per request using aliased ``repository`` lookups, and returns
+records in the exact shape produced by ``github_api.build_record``.
+"""
+
+import os
+
+import requests
+
+from services.diagnostics import instrument
+from services.github_api import get_api_url, get_headers, load_shared, map_concurrent, save_snapshots, send_request
+from services.rate_limiter import INTERACTIVE
+from services.runtime import cache_data, report_error
+
+DEFAULT_BATCH_SIZE = 100
+
+REPO_FIELDS = """
+fragment RepoFields on Repository {
+  stargazerCount
+  forkCount
+  watchers { totalCount }
+  issues(states: OPEN) { totalCount }
+  pullRequests(states: OPEN) { totalCount }
+  description
+  licenseInfo { spdxId }
+  createdAt
+  updatedAt
+  pushedAt
+  diskUsage
+}
+"""
+
+
+def get_batch_size():
+    """Repositories per GraphQL query (GITHUB_GRAPHQL_BATCH_SIZE, default and max 100)."""
+    try:
+        size = int(os.getenv("GITHUB_GRAPHQL_BATCH_SIZE", DEFAULT_BATCH_SIZE))
+    except ValueError:
+        return DEFAULT_BATCH_SIZE
+    return min(max(1, size), DEFAULT_BATCH_SIZE)
+
+
+def chunked(items, size):
+    """Split ``items`` into consecutive lists of at most ``size`` elements."""
+    items = list(items)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def build_query(repo_paths):
+    """Build one aliased query (``r0``, ``r1``, ...) and its variables."""
+    declarations, selections, variables = [], [], {}
+    for i, repo_path in enumerate(repo_paths):
+        owner, _, name = repo_path.partition('/')
+        declarations.append(f"$o{i}: String!, $n{i}: String!")
+        selections.append(f"  r{i}: repository(owner: $o{i}, name: $n{i}) {{ ...RepoFields }}")
+        variables[f"o{i}"] = owner
+        variables[f"n{i}"] = name
+    query = f"query({', '.join(declarations)}) {{\n" + "\n".join(selections) + "\n}\n" + REPO_FIELDS
+    return query, variables
+
+
+def build_record(framework_name, repo_path, node):
+    """Map a GraphQL ``RepoFields`` node to the REST record shape."""
+    return {
+        'Framework': framework_name,
+        'Repo': repo_path,
+        'Stars': node.get('stargazerCount', 0),
+        'Forks': node.get('forkCount', 0),
+        'Watchers': (node.get('watchers') or {}).get('totalCount', 0),
+        # REST open_issues_count includes open pull requests
+        'Open Issues': (node.get('issues') or {}).get('totalCount', 0)
+                       + (node.get('pullRequests') or {}).get('totalCount', 0),
+        'Description': node.get('description', ''),
+        'License': (node.get('licenseInfo') or {}).get('spdxId') or 'NOASSERTION',
+        'Created At': node.get('createdAt'),
+        'Updated At': node.get('updatedAt'),
+        'Pushed At': node.get('pushedAt'),
+        'Size (KB)': node.get('diskUsage') or 0
+    }
+
+
+@instrument('fetch')
+def fetch_batch_data(targets, priority=INTERACTIVE):
+    """Fetch one batch of ``(framework_name, repo_path)`` pairs in a single query (not memoized)."""
+    query, variables = build_query([path for _, path in targets])
+    try:
+        response = send_request(
+            "POST", f"{get_api_url()}/graphql", priority=priority,
+            json={"query": query, "variables": variables}, headers=get_headers(), timeout=30
+        )
+        response.raise_for_status()
+        payload = response.json()
+    except requests.exceptions.RequestException as e:
+        report_error(f"Lỗi khi gọi GraphQL API cho {len(targets)} repo: {e}")
+        return []
+
+    data = payload.get('data') or {}
+    if payload.get('errors') and not data:
+        report_error(f"Lỗi GraphQL: {payload['errors'][0].get('message')}")
+        return []
+
+    records = []
+    for i, (name, path) in enumerate(targets):
+        node = data.get(f"r{i}")
+        if node is None:
+            report_error(f"Lỗi khi gọi API cho {name}: không tìm thấy repo {path}")
+            continue
+        records.append(build_record(name, path, node))
+    save_snapshots(records)
+    return records
+
+
+def load_batch_data(targets, priority=INTERACTIVE):
+    """``fetch_batch_data`` through the host-wide cache (one query per batch at a time)."""
+    key = "graphql|{}|{}".format(get_api_url(), "|".join(f"{name}={path}" for name, path in targets))
+    # A failed batch returns [], which must not be cached
+    return load_shared(key, lambda: fetch_batch_data(targets, priority) or None) or []
+
+
+@cache_data(ttl=3600, cache_if=bool)
+def get_batch_data(targets, _priority=INTERACTIVE):
+    """``load_batch_data`` memoized for an hour; a failed (empty) batch is retried on the next call."""
+    return load_batch_data(targets, _priority)
+
+
+def get_frameworks_data_graphql(targets, max_workers=None, priority=INTERACTIVE, fresh=False):
+    """Fetch ``(framework_name, repo_path)`` pairs in batches, keeping input order."""
+    batches = [tuple(batch) for batch in chunked(targets, get_batch_size())]
+    fetch = load_batch_data if fresh else get_batch_data
+    results = map_concurrent(lambda batch: fetch(batch, priority), batches, max_workers)
+    return [record for batch in results for record in batch]
@@ -0,0 +1,308 @@
+"""Activity metrics from GitHub's computed statistics endpoints.
+
+``/repos/{path}/stats/*`` answers ``202 Accepted`` while GitHub computes the
+numbers in the background, and ``200`` with the data once they are cached.
+``StatsPoller`` submits one job per (repository, endpoint) and keeps them
+in a heap ordered by next poll time. A single dispatcher thread sleeps
+until the earliest job is due, then hands due jobs to a small pool of HTTP
+workers. Every ``202`` reschedules its job with adaptive backoff. The first
+delay follows how long jobs have recently taken to become ready, and it
+doubles on every further ``202``. ``Retry-After`` is honoured. Hundreds of
+pending jobs therefore wait in the heap instead of holding threads or
+busy-waiting. Requests go through the shared scheduler at background
+priority.
+
+Finished results are reduced to a few numbers per repository
+(``ACTIVITY_COLUMNS``) and merged into the records as new columns.
+"""
+
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from services.columns import ACTIVITY_COLUMNS
+from services.diagnostics import count, register_source
+from services.github_api import get_api_url, get_headers, send_request
+from services.rate_limiter import BACKGROUND
+
+logger = logging.getLogger('services')
+
+ENDPOINTS = ('commit_activity', 'contributors', 'code_frequency', 'participation')
+
+DEFAULT_MAX_IN_FLIGHT = 8
+BASE_DELAY = 2.0
+MAX_DELAY = 120.0
+MAX_ATTEMPTS = 15
+# Finished results are reused for a day; GitHub recomputes them at most that often
+RESULT_TTL = 24 * 3600
+
+
+# --- Summaries ---
+
+def summarize(endpoint, data):
+    """Reduce one endpoint payload to ``{column: value}``."""
+    if endpoint == 'commit_activity':
+        totals = [week.get('total', 0) for week in data or []]
+        return {'Commits 52w': sum(totals[-52:]), 'Commits 4w': sum(totals[-4:])}
+    if endpoint == 'contributors':
+        # GitHub lists at most the top 100 contributors here
+        return {'Contributors': len(data or [])}
+    if endpoint == 'code_frequency':
+        weeks = (data or [])[-52:]
+        return {'Additions 52w': sum(week[1] for week in weeks),
+                'Deletions 52w': sum(abs(week[2]) for week in weeks)}
+    if endpoint == 'participation':
+        total = sum((data or {}).get('all', []))
+        owner = sum((data or {}).get('owner', []))
+        return {'Owner Commits (%)': round(owner / total * 100, 2) if total else None}
+    raise ValueError(f"unknown endpoint {endpoint!r}, expected one of {ENDPOINTS}")
+
+
+def merge_activity(records, summaries):
+    """Copy of ``records`` with every ``ACTIVITY_COLUMNS`` key (``None`` where not available yet)."""
+    merged = []
+    for record in records:
+        values = summaries.get(record['Repo'], {})
+        merged.append({**record, **{col: values.get(col) for col in ACTIVITY_COLUMNS}})
+    return merged
+
+
+# --- Poller ---
+
+class _Job:
+    __slots__ = ('repo', 'endpoint', 'attempts', 'pending_since', 'status', 'data', 'finished_at', 'error')
+
+    def __init__(self, repo, endpoint):
+        self.repo = repo
+        self.endpoint = endpoint
+        self.attempts = 0
+        self.pending_since = None
+        self.status = 'queued'
+        self.data = None
+        self.finished_at = None
+        self.error = None
+
+
+class StatsPoller:
+    """Submits and polls ``/stats/*`` jobs for many repositories without blocking the caller."""
+
+    def __init__(self, endpoints=ENDPOINTS, max_in_flight=DEFAULT_MAX_IN_FLIGHT, base_delay=BASE_DELAY,
+                 max_delay=MAX_DELAY, max_attempts=MAX_ATTEMPTS, result_ttl=RESULT_TTL, priority=BACKGROUND):
+        self.endpoints = tuple(endpoints)
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self.result_ttl = result_ttl
+        self.priority = priority
+
+        self._jobs = {}
+        self._heap = []
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._stop = False
+        self._thread = None
+        self._executor = None
+        # Smoothed seconds from the first 202 to the data being ready
+        self._ready_after = None
+        self.requests = 0
+        self.accepted = 0
+
+    # --- Public API ---
+
+    def submit(self, repo_paths):
+        """Queue every endpoint for ``repo_paths`` (fresh successful results are kept, failed jobs retried).
+
+        Returns immediately.
+        """
+        now = time.time()
+        with self._cond:
+            for repo in repo_paths:
+                for endpoint in self.endpoints:
+                    job = self._jobs.get((repo, endpoint))
+                    if job is not None and (job.status in ('queued', 'pending') or (
+                            job.status == 'done' and now - job.finished_at < self.result_ttl)):
+                        continue
+                    job = self._jobs[(repo, endpoint)] = _Job(repo, endpoint)
+                    self._schedule(job, 0.0)
+            self._cond.notify_all()
+        return self.start()
+
+    def results(self, repo_paths):
+        """``{repo: {column: value}}`` from the jobs finished so far."""
+        summaries = {}
+        with self._cond:
+            for repo in repo_paths:
+                for endpoint in self.endpoints:
+                    job = self._jobs.get((repo, endpoint))
+                    if job is not None and job.status == 'done':
+                        summaries.setdefault(repo, {}).update(job.data)
+        return summaries
+
+    def progress(self, repo_paths):
+        """Counts of jobs per status (``queued``/``pending``/``done``/``failed``) for ``repo_paths``."""
+        counts = {'queued': 0, 'pending': 0, 'done': 0, 'failed': 0}
+        with self._cond:
+            for repo in repo_paths:
+                for endpoint in self.endpoints:
+                    job = self._jobs.get((repo, endpoint))
+                    if job is not None:
+                        counts[job.status] += 1
+        return counts
+
+    def wait(self, repo_paths, timeout=None):
+        """Block until every job for ``repo_paths`` finished or failed; returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        keys = [(repo, endpoint) for repo in repo_paths for endpoint in self.endpoints]
+        with self._cond:
+            while any(key in self._jobs and self._jobs[key].status in ('queued', 'pending') for key in keys):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def start(self):
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop = False
+                self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="github-stats")
+                self._thread = threading.Thread(target=self._dispatch, name="github-stats-poller", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        with self._cond:
+            counts = {'queued': 0, 'pending': 0, 'done': 0, 'failed': 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return {**counts, 'in_flight': self._in_flight, 'requests': self.requests, 'accepted_202': self.accepted,
+                    'ready_after_s': self._ready_after}
+
+    # --- Scheduling ---
+
+    def _schedule(self, job, delay):
+        heapq.heappush(self._heap, (time.monotonic() + delay, next(self._sequence), job))
+
+    def _backoff(self, job, response):
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            try:
+                return min(self.max_delay, float(retry_after))
+            except ValueError:
+                pass
+        # Half the recent time-to-ready: it also contains queueing, so the full value overshoots
+        first = self.base_delay if self._ready_after is None else max(self.base_delay, self._ready_after / 2)
+        delay = min(self.max_delay, first * 2 ** max(0, job.attempts - 1))
+        # Jitter spreads the polls of jobs submitted together
+        return delay * random.uniform(0.75, 1.25)
+
+    def _dispatch(self):
+        with self._cond:
+            while not self._stop:
+                now = time.monotonic()
+                while self._heap and self._heap[0][0] <= now and self._in_flight < self.max_in_flight:
+                    _, _, job = heapq.heappop(self._heap)
+                    self._in_flight += 1
+                    self._executor.submit(self._poll, job)
+                if self._heap and self._in_flight < self.max_in_flight:
+                    timeout = max(0.0, self._heap[0][0] - now)
+                else:
+                    timeout = None      # woken by submit(), a finished request or stop()
+                self._cond.wait(timeout)
+
+    def _poll(self, job):
+        url = f"{get_api_url()}/repos/{job.repo}/stats/{job.endpoint}"
+        response = error = None
+        try:
+            response = send_request("GET", url, priority=self.priority, headers=get_headers(), timeout=30)
+        except requests.exceptions.RequestException as e:
+            error = e
+        with self._cond:
+            self._in_flight -= 1
+            self.requests += 1
+            job.attempts += 1
+            try:
+                self._handle(job, response, error)
+            finally:
+                self._cond.notify_all()
+
+    def _handle(self, job, response, error):
+        now = time.monotonic()
+        if response is not None and response.status_code == 202:
+            self.accepted += 1
+            count('github_stats.accepted')
+            if job.pending_since is None:
+                job.pending_since = now
+            if job.attempts < self.max_attempts:
+                job.status = 'pending'
+                self._schedule(job, self._backoff(job, response))
+                return
+            error = 'still computing after %d polls' % job.attempts
+        elif response is not None and response.status_code in (200, 204):
+            try:
+                data = response.json() if response.status_code == 200 and response.content else None
+                job.data = summarize(job.endpoint, data)
+            except (ValueError, TypeError, KeyError, IndexError) as e:
+                error = e
+            else:
+                job.status = 'done'
+                job.finished_at = time.time()
+                count('github_stats.done')
+                if job.pending_since is not None:
+                    ready = now - job.pending_since
+                    self._ready_after = ready if self._ready_after is None else 0.7 * self._ready_after + 0.3 * ready
+                return
+        elif error is not None and job.attempts < self.max_attempts:
+            # Network errors (the scheduler already retried them) get the same backoff as a 202
+            job.status = 'pending'
+            self._schedule(job, self._backoff(job, None))
+            return
+        elif response is not None:
+            error = f"HTTP {response.status_code}"
+        job.status = 'failed'
+        job.error = str(error)
+        job.finished_at = time.time()
+        count('github_stats.failed')
+        logger.warning("GitHub stats %s for %s failed: %s", job.endpoint, job.repo, job.error)
+
+
+_poller = None
+_poller_lock = threading.Lock()
+
+
+def get_stats_poller():
+    """Return the process-wide poller (its worker threads start with the first ``submit``)."""
+    global _poller
+    if _poller is None:
+        with _poller_lock:
+            if _poller is None:
+                _poller = StatsPoller()
+                register_source('github_stats', _poller.stats)
+    return _poller
+
+
+def collect_activity(records, timeout=None):
+    """Blocking helper for headless runs: poll every repo in ``records`` and merge the results."""
+    poller = get_stats_poller()
+    repos = [record['Repo'] for record in records]
+    poller.submit(repos)
+    if not poller.wait(repos, timeout):
+        logger.warning("GitHub stats: some jobs were still pending after %ss", timeout)
+    return merge_activity(records, poller.results(repos))
@@ -0,0 +1,131 @@
+"""Persistent conditional-request cache for GitHub REST responses.
+
+Response bodies are stored on disk (SQLite) together with their ``ETag`` and
+``Last-Modified`` validators. Refreshes send ``If-None-Match`` /
+``If-Modified-Since``; a ``304 Not Modified`` reuses the stored body and does
+not count against the GitHub rate limit. The store is bounded by total body
+size and evicts least recently used entries first.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+DEFAULT_CACHE_PATH = os.path.join('.cache', 'github_responses.sqlite')
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+
+CacheEntry = namedtuple('CacheEntry', ['etag', 'last_modified', 'body'])
+
+
+class ResponseCache:
+    """Size-bounded on-disk store of response bodies keyed by request."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(url, headers):
+        """Cache key: URL plus the media type, since one URL can serve several."""
+        return f"{url}|{headers.get('Accept', '')}"
+
+    def lookup(self, key):
+        """Return the stored entry for ``key`` or ``None``."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, body FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        return CacheEntry(*row) if row else None
+
+    @staticmethod
+    def conditional_headers(entry):
+        """Validator headers to send when revalidating ``entry``."""
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def record_hit(self, key):
+        """Count a ``304`` revalidation and refresh the entry's LRU position."""
+        with self._lock:
+            self.hits += 1
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+
+    def store(self, key, etag, last_modified, body):
+        """Store a full ``200`` response; bodies without validators are not kept."""
+        with self._lock:
+            self.misses += 1
+            if not (etag or last_modified) or len(body) > self.max_bytes:
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, etag, last_modified, body, size, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, etag, last_modified, body, len(body), time.time()),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall()
+        stale = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", stale)
+        self.evictions += len(stale)
+
+    def stats(self):
+        """Hit/miss counters and current footprint."""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': entries,
+                'bytes': size,
+                'max_bytes': self.max_bytes,
+            }
+
+    def clear(self):
+        """Drop every stored response and reset the counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self.hits = self.misses = self.evictions = 0
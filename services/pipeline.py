@@ -0,0 +1,140 @@
+"""Fingerprint-keyed memoization of the processing pipeline.
+
+Derived DataFrames and analysis results are cached per
+``(records fingerprint, schema, stage, options)`` in a process-wide LRU, so widget
+changes that do not touch the data (chart type, watchers checkbox, ...) reuse
+them across reruns and sessions instead of recomputing. Serialized exports
+use the same key in the byte-bounded export cache (``services.exporting``).
+Callers must treat the returned objects as read-only since they are shared.
+"""
+
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from services.cache_utils import LRUCache
+from services.diagnostics import register_source
+from services.exporting import cached_export, iter_html_report, iter_table
+from services.processing import (add_metrics, clean_and_cast, correlation_analysis, correlation_tables,
+                                 describe_stats, framework_comparison_analysis, group_by_license,
+                                 statistical_insights, top_k_frameworks, trend_analysis, uncertainty_analysis)
+
+DEFAULT_PIPELINE_CACHE_SIZE = 64
+# Từ số repo này trở lên, frame dùng schema gọn (xem clean_and_cast)
+DEFAULT_COMPACT_THRESHOLD = 10_000
+
+try:
+    _pipeline_cache = LRUCache(maxsize=int(os.getenv("PIPELINE_CACHE_SIZE", DEFAULT_PIPELINE_CACHE_SIZE)))
+except ValueError:
+    _pipeline_cache = LRUCache(maxsize=DEFAULT_PIPELINE_CACHE_SIZE)
+register_source('pipeline_cache', _pipeline_cache.stats)
+
+
+def records_fingerprint(records) -> str:
+    """Content hash of the fetched records (order-sensitive)."""
+    payload = json.dumps(records, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def get_pipeline_cache() -> LRUCache:
+    return _pipeline_cache
+
+
+def use_compact_frames(n_records: int) -> bool:
+    """COMPACT_FRAMES=1/0 forces the compact schema on/off; otherwise it kicks in for large catalogs."""
+    setting = os.getenv("COMPACT_FRAMES", "").strip().lower()
+    if setting in ("1", "true", "yes"):
+        return True
+    if setting in ("0", "false", "no"):
+        return False
+    return n_records >= DEFAULT_COMPACT_THRESHOLD
+
+
+class Pipeline:
+    """Lazily computed, cached stages over one set of fetched records.
+
+    ``acc`` is an optional ``CatalogStats`` kept in sync with the frame; it
+    only changes how a stage is computed, never its result, so it is not
+    part of the cache key.
+    """
+
+    def __init__(self, records, acc=None, compact=None):
+        self.records = records
+        self.fingerprint = records_fingerprint(records)
+        self.compact = use_compact_frames(len(records)) if compact is None else compact
+        self.acc = acc
+        self._acc_synced = False
+        # Tuổi repo và Stars/Day phụ thuộc ngày hiện tại
+        self._day = pd.Timestamp.utcnow().strftime('%Y-%m-%d')
+
+    def _cached(self, stage, options, compute):
+        # Compact frames change dtypes (float32, categories), so every stage is keyed on the schema
+        key = (self.fingerprint, self._day, self.compact, stage, options)
+        return _pipeline_cache.get_or_compute(key, compute)
+
+    def frame(self) -> pd.DataFrame:
+        def compute():
+            # The frame is freshly built here, so the processing steps may work in place
+            df = clean_and_cast(pd.DataFrame(self.records), compact=self.compact, copy=False)
+            return add_metrics(df, compact=self.compact, copy=False)
+        return self._cached('frame', (), compute)
+
+    def describe(self, include_watchers: bool, include_issues: bool) -> pd.DataFrame:
+        return self._cached(
+            'describe', (include_watchers, include_issues),
+            lambda: describe_stats(self.frame(), include_watchers, include_issues, acc=self._synced_acc())
+        )
+
+    def grouped(self, include_watchers: bool, include_issues: bool) -> pd.DataFrame:
+        return self._cached(
+            'grouped', (include_watchers, include_issues),
+            lambda: group_by_license(self.frame(), include_watchers, include_issues, acc=self._synced_acc())
+        )
+
+    def correlation(self) -> pd.DataFrame:
+        return self._cached('correlation', (), lambda: correlation_analysis(self.frame(), acc=self._synced_acc()))
+
+    def correlations(self, correction: str = None) -> dict:
+        return self._cached('correlations', (correction,), lambda: correlation_tables(self.frame(), correction))
+
+    def trend(self) -> dict:
+        return self._cached('trend', (), lambda: trend_analysis(self.frame(), self.correlations()))
+
+    def insights(self) -> dict:
+        return self._cached('insights', (), lambda: statistical_insights(self.frame(), acc=self._synced_acc()))
+
+    def uncertainty(self, n_resamples: int, seed: int = 0) -> dict:
+        return self._cached(
+            'uncertainty', (n_resamples, seed), lambda: uncertainty_analysis(self.frame(), n_resamples, seed)
+        )
+
+    def comparison(self) -> pd.DataFrame:
+        return self._cached('comparison', (), lambda: framework_comparison_analysis(self.frame()))
+
+    def top_k(self, k: int = 10) -> pd.DataFrame:
+        return self._cached('top_k', (k,), lambda: top_k_frameworks(self.frame(), k=k))
+
+    def table_bytes(self, fmt: str = 'csv') -> bytes:
+        """The overview frame serialized as ``csv``, ``parquet`` or ``arrow`` (kept in the export cache)."""
+        return cached_export(
+            (self.fingerprint, self._day, self.compact, 'table', fmt), fmt,
+            lambda: iter_table(self.frame(), fmt)
+        )
+
+    def html_report(self, include_watchers: bool, include_issues: bool) -> bytes:
+        return cached_export(
+            (self.fingerprint, self._day, self.compact, 'report', (include_watchers, include_issues)), 'html',
+            lambda: iter_html_report(
+                self.frame(), self.describe(include_watchers, include_issues),
+                self.grouped(include_watchers, include_issues)
+            )
+        )
+
+    def _synced_acc(self):
+        # Sync once per rerun, and only when a stage actually has to be computed
+        if self.acc is not None and not self._acc_synced:
+            self.acc.sync(self.frame())
+            self._acc_synced = True
+        return self.acc
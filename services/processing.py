@@ -1,152 +1,398 @@
+import importlib.util
+
 import pandas as pd
 import numpy as np
-from scipy import stats
-from scipy.stats import pearsonr, spearmanr
+
+from services.accumulators import CatalogStats
+from services.cache_utils import LRUCache, frame_fingerprint
+from services.columns import ACTIVITY_COLUMNS
+from services.correlation import correlation_matrices
+from services.diagnostics import instrument, register_source
+from services.resampling import DEFAULT_RESAMPLES, resample
+
+CORRELATION_METRICS = ['Stars', 'Forks', 'Watchers', 'Open Issues', 'Size (KB)',
+                       'Stars/Day (ước tính)', 'Stars/Fork', 'Tỉ lệ Issues/Stars', 'Tuổi repo (năm)']
+GROUP_METRICS = ['Stars', 'Forks', 'Watchers', 'Open Issues']
+RANK_METRICS = ['Stars', 'Forks', 'Watchers', 'Open Issues', 'Stars/Day (ước tính)']
+RESAMPLE_METRICS = ['Stars', 'Forks', 'Watchers', 'Open Issues', 'Tuổi repo (năm)']
+
+# Cột gốc -> tên cột trong bảng so sánh
+COMPARISON_VALUES = {
+    'Stars': 'Stars',
+    'Forks': 'Forks',
+    'Watchers': 'Watchers',
+    'Open Issues': 'Open_Issues',
+    'Stars/Day (ước tính)': 'Stars_Per_Day',
+}
+
+# Khóa kết quả trend -> cặp metrics được đọc từ ma trận tương quan
+TREND_PAIRS = {
+    'age_stars_correlation': ('Tuổi repo (năm)', 'Stars'),
+    'stars_forks_correlation': ('Stars', 'Forks'),
+    'stars_issues_correlation': ('Stars', 'Open Issues'),
+}
+
+_top_k_cache = LRUCache(maxsize=32)
+register_source('top_k_cache', _top_k_cache.stats)
 
 
-def clean_and_cast(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
+def _string_dtype() -> pd.StringDtype:
+    # Chuỗi Arrow nếu có pyarrow (không import pyarrow ở đây để giữ khởi động nhanh)
+    return pd.StringDtype('pyarrow' if importlib.util.find_spec('pyarrow') else 'python')
+
+
+@instrument('processing')
+def clean_and_cast(df: pd.DataFrame, compact: bool = False, copy: bool = True) -> pd.DataFrame:
+    """Làm sạch và ép kiểu dữ liệu GitHub.
+
+    ``compact=True`` dùng schema gọn cho catalog lớn: License/Framework dạng
+    category (khi giá trị lặp lại đủ nhiều), số nguyên với độ rộng nhỏ nhất,
+    Repo/Description dạng chuỗi Arrow.
+    ``copy=False`` sửa trực tiếp ``df`` khi người gọi đã sở hữu DataFrame.
+    """
+    if copy:
+        df = df.copy()
     df['Description'] = df['Description'].fillna('')
     numeric_cols = ['Stars', 'Forks', 'Watchers', 'Open Issues', 'Size (KB)']
     for c in numeric_cols:
-        df[c] = pd.to_numeric(df[c], errors='coerce').fillna(0).astype(int)
+        values = pd.to_numeric(df[c], errors='coerce').fillna(0)
+        df[c] = pd.to_numeric(values.astype(int), downcast='integer') if compact else values.astype(int)
     for col in ['Created At', 'Updated At', 'Pushed At']:
         df[col] = pd.to_datetime(df[col], errors='coerce')
+    # Chỉ số hoạt động (/stats/*) có thể chưa có cho một số repo nên giữ NaN
+    for col in ACTIVITY_COLUMNS:
+        if col in df.columns:
+            values = pd.to_numeric(df[col], errors='coerce')
+            df[col] = values.astype('float32') if compact else values.astype(float)
+    if compact:
+        string_dtype = _string_dtype()
+        for col in ['Framework', 'License']:
+            # Category chỉ có lợi khi số giá trị khác nhau ít hơn nhiều so với số dòng
+            repeated = df[col].nunique(dropna=False) <= len(df) // 2
+            df[col] = df[col].astype('category' if repeated else string_dtype)
+        for col in ['Repo', 'Description']:
+            df[col] = df[col].astype(string_dtype)
     return df
 
 
-def add_metrics(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
+@instrument('processing')
+def add_metrics(df: pd.DataFrame, compact: bool = False, copy: bool = True) -> pd.DataFrame:
+    """Thêm các chỉ số dẫn xuất; ``compact=True`` lưu chúng dạng float32."""
+    if copy:
+        df = df.copy()
     today = pd.Timestamp.utcnow()
     age_days = (today - df['Created At']).dt.days.clip(lower=1)
-    df['Tuổi repo (năm)'] = (age_days / 365.25).round(2)
-    df['Stars/Day (ước tính)'] = (df['Stars'] / age_days).round(2)
-    df['Tỉ lệ Issues/Stars'] = (df['Open Issues'] / df['Stars'].replace(0, pd.NA)).astype(float).round(3)
-    df['Stars/Fork'] = (df['Stars'] / df['Forks'].replace(0, pd.NA)).astype(float).round(2)
+    stars = df['Stars']
+    metrics = {
+        'Tuổi repo (năm)': (age_days / 365.25).round(2),
+        'Stars/Day (ước tính)': (stars / age_days).round(2),
+        'Tỉ lệ Issues/Stars': (df['Open Issues'] / stars.where(stars != 0)).round(3),
+        'Stars/Fork': (stars / df['Forks'].where(df['Forks'] != 0)).round(2),
+    }
+    for col, values in metrics.items():
+        df[col] = values.astype('float32') if compact else values.astype(float)
     return df
 
 
-def describe_stats(df: pd.DataFrame, include_watchers: bool, include_issues: bool) -> pd.DataFrame:
+@instrument('processing')
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """So sánh dtype và bộ nhớ (deep) từng cột giữa hai cách biểu diễn cùng dữ liệu."""
+    report = pd.DataFrame({
+        'dtype (trước)': before.dtypes.astype(str),
+        'dtype (sau)': after.dtypes.reindex(before.columns).astype(str),
+        'Bytes (trước)': before.memory_usage(deep=True, index=False),
+        'Bytes (sau)': after.memory_usage(deep=True, index=False).reindex(before.columns),
+    })
+    report.loc['Tổng'] = ['', '', report['Bytes (trước)'].sum(), report['Bytes (sau)'].sum()]
+    report['Tỉ lệ'] = (report['Bytes (sau)'] / report['Bytes (trước)']).astype(float).round(3)
+    return report
+
+
+def build_catalog_stats() -> CatalogStats:
+    """Tạo bộ tích lũy online (moment, co-moment, nhóm theo License) cho catalog."""
+    return CatalogStats(CORRELATION_METRICS, GROUP_METRICS)
+
+
+def _use_accumulator(acc: CatalogStats, cols) -> bool:
+    return acc is not None and acc.size > 0 and all(c in acc.metrics for c in cols)
+
+
+@instrument('processing')
+def describe_stats(df: pd.DataFrame, include_watchers: bool, include_issues: bool,
+                   acc: CatalogStats = None) -> pd.DataFrame:
     cols = ['Stars', 'Forks'] + (['Watchers'] if include_watchers else []) + (['Open Issues'] if include_issues else [])
-    return df[cols].describe().round(2)
+    if not _use_accumulator(acc, cols):
+        return df[cols].describe().round(2)
+    # count/mean/std lấy từ bộ tích lũy; min/tứ phân vị/max cần dữ liệu gốc (một lần quantile)
+    idx = [acc.index_of(c) for c in cols]
+    quantiles = df[cols].quantile([0, 0.25, 0.5, 0.75, 1])
+    quantiles.index = ['min', '25%', '50%', '75%', 'max']
+    moments = pd.DataFrame(
+        [acc.moments.n[idx], acc.moments.mean[idx], acc.moments.std()[idx]],
+        index=['count', 'mean', 'std'], columns=cols
+    )
+    return pd.concat([moments, quantiles]).round(2)
 
 
-def group_by_license(df: pd.DataFrame, include_watchers: bool, include_issues: bool) -> pd.DataFrame:
+@instrument('processing')
+def group_by_license(df: pd.DataFrame, include_watchers: bool, include_issues: bool,
+                     acc: CatalogStats = None) -> pd.DataFrame:
     cols = ['Stars', 'Forks'] + (['Watchers'] if include_watchers else []) + (['Open Issues'] if include_issues else [])
-    grouped = df.groupby('License', dropna=False)[cols].agg(['sum', 'mean', 'max']).round(2)
+    if not (_use_accumulator(acc, cols) and all(c in acc.group_metrics for c in cols)):
+        grouped = df.groupby('License', dropna=False, observed=True)[cols].agg(['sum', 'mean', 'max']).round(2)
+        return grouped
+    groups = acc.groups
+    idx = [acc.group_metrics.index(c) for c in cols]
+    rows = {}
+    for license_name in groups.groups():
+        sums = groups.sums[license_name][idx]
+        means = sums / groups.count[license_name]
+        maxes = groups.max(license_name)[idx]
+        rows[license_name] = [v for triple in zip(sums, means, maxes) for v in triple]
+    columns = pd.MultiIndex.from_product([cols, ['sum', 'mean', 'max']])
+    grouped = pd.DataFrame.from_dict(rows, orient='index', columns=columns)
+    grouped.index.name = 'License'
+    if isinstance(df['License'].dtype, pd.CategoricalDtype):
+        grouped.index = grouped.index.astype(df['License'].dtype)
+    grouped = grouped.sort_index(na_position='last').round(2)
+    # Giữ dtype như nhánh pandas: max theo cột gốc, sum số nguyên chỉ lên int64 khi tràn kiểu gốc
+    for col in cols:
+        dtype = df[col].dtype
+        sums = grouped[(col, 'sum')]
+        if np.issubdtype(dtype, np.integer):
+            info = np.iinfo(dtype)
+            fits = sums.between(info.min, info.max).all()
+            grouped[(col, 'sum')] = sums.astype(dtype if fits else np.int64)
+        else:
+            grouped[(col, 'sum')] = sums.astype(dtype)
+        grouped[(col, 'max')] = grouped[(col, 'max')].astype(dtype)
     return grouped
 
 
-def correlation_analysis(df: pd.DataFrame) -> pd.DataFrame:
+@instrument('processing')
+def correlation_analysis(df: pd.DataFrame, acc: CatalogStats = None) -> pd.DataFrame:
     """Tính toán ma trận tương quan giữa các metrics quan trọng."""
-    numeric_cols = ['Stars', 'Forks', 'Watchers', 'Open Issues', 'Size (KB)', 
-                   'Stars/Day (ước tính)', 'Stars/Fork', 'Tỉ lệ Issues/Stars', 'Tuổi repo (năm)']
-    available_cols = [col for col in numeric_cols if col in df.columns]
-    corr_matrix = df[available_cols].corr().round(3)
+    available_cols = [col for col in CORRELATION_METRICS if col in df.columns]
+    if _use_accumulator(acc, available_cols):
+        idx = [acc.index_of(c) for c in available_cols]
+        corr = acc.moments.correlation()[np.ix_(idx, idx)]
+        return pd.DataFrame(corr, index=available_cols, columns=available_cols).round(3)
+    corr_matrix = correlation_matrices(df, available_cols, methods=('pearson',))['pearson'].round(3)
     return corr_matrix
 
 
-def trend_analysis(df: pd.DataFrame) -> dict:
-    """Phân tích xu hướng dựa trên tuổi repo và các metrics."""
+@instrument('processing')
+def correlation_tables(df: pd.DataFrame, correction: str = None) -> dict:
+    """Ma trận Pearson/Spearman và p-value cho mọi cặp metrics (xem services.correlation)."""
+    available_cols = [col for col in CORRELATION_METRICS if col in df.columns]
+    return correlation_matrices(df, available_cols, correction=correction)
+
+
+@instrument('processing')
+def trend_analysis(df: pd.DataFrame, matrices: dict = None) -> dict:
+    """Phân tích xu hướng dựa trên tuổi repo và các metrics.
+
+    Hệ số và p-value được đọc từ ``matrices`` (kết quả ``correlation_tables``);
+    nếu không truyền vào thì tính ma trận cho các cột cần thiết.
+    """
+    pairs = {key: pair for key, pair in TREND_PAIRS.items() if all(col in df.columns for col in pair)}
+    if not pairs:
+        return {}
+    if matrices is None or not all(col in matrices['pearson'].columns for pair in pairs.values() for col in pair):
+        cols = list(dict.fromkeys(col for pair in pairs.values() for col in pair))
+        matrices = correlation_matrices(df, cols)
+
     results = {}
-    
-    # Phân tích xu hướng Stars theo thời gian
-    if 'Tuổi repo (năm)' in df.columns and 'Stars' in df.columns:
-        age_stars_corr, age_stars_p = pearsonr(df['Tuổi repo (năm)'], df['Stars'])
-        results['age_stars_correlation'] = {
-            'correlation': round(age_stars_corr, 3),
-            'p_value': round(age_stars_p, 3),
-            'significance': 'Có ý nghĩa' if age_stars_p < 0.05 else 'Không có ý nghĩa'
-        }
-    
-    # Phân tích xu hướng Forks theo Stars
-    if 'Stars' in df.columns and 'Forks' in df.columns:
-        stars_forks_corr, stars_forks_p = pearsonr(df['Stars'], df['Forks'])
-        results['stars_forks_correlation'] = {
-            'correlation': round(stars_forks_corr, 3),
-            'p_value': round(stars_forks_p, 3),
-            'significance': 'Có ý nghĩa' if stars_forks_p < 0.05 else 'Không có ý nghĩa'
+    for key, (a, b) in pairs.items():
+        p_value = matrices['pearson_p'].loc[a, b]
+        results[key] = {
+            'correlation': round(matrices['pearson'].loc[a, b], 3),
+            'p_value': round(p_value, 3),
+            'significance': 'Có ý nghĩa' if p_value < 0.05 else 'Không có ý nghĩa',
+            'spearman': round(matrices['spearman'].loc[a, b], 3),
+            'spearman_p_value': round(matrices['spearman_p'].loc[a, b], 3),
         }
-    
-    # Phân tích xu hướng Issues theo Stars
-    if 'Stars' in df.columns and 'Open Issues' in df.columns:
-        stars_issues_corr, stars_issues_p = pearsonr(df['Stars'], df['Open Issues'])
-        results['stars_issues_correlation'] = {
-            'correlation': round(stars_issues_corr, 3),
-            'p_value': round(stars_issues_p, 3),
-            'significance': 'Có ý nghĩa' if stars_issues_p < 0.05 else 'Không có ý nghĩa'
-        }
-    
     return results
 
 
-def statistical_insights(df: pd.DataFrame) -> dict:
+def _chunks(df: pd.DataFrame, cols, chunk_rows: int):
+    # Mỗi khối được chuyển sang float riêng, không tạo bản sao float của cả frame
+    arrays = [df[col].to_numpy() for col in cols]
+    for start in range(0, len(df), chunk_rows):
+        block = np.empty((min(chunk_rows, len(df) - start), len(arrays)))
+        for j, values in enumerate(arrays):
+            block[:, j] = values[start:start + chunk_rows]
+        yield start, block
+
+
+@instrument('processing')
+def moment_kernel(df: pd.DataFrame, cols, z_threshold: float = 2.0, chunk_rows: int = 65536,
+                  acc: CatalogStats = None) -> dict:
+    """Tính mean, variance, skewness, kurtosis, CV và outlier z-score cho nhiều cột cùng lúc.
+
+    Dữ liệu được đọc theo từng khối ``chunk_rows`` dòng qua hai lượt: lượt
+    đầu gộp count/mean/M2 của các khối (công thức Chan), lượt sau cộng
+    M3/M4 và tìm outlier bằng mean/M2 đã có, nên bộ nhớ tạm chỉ tỉ lệ với một
+    khối. ``outliers`` là vị trí dòng (0-based) của outlier cho từng cột.
+    Bỏ qua NaN; skewness/kurtosis là ước lượng chệch như ``scipy.stats``.
+    Khi có ``acc``, các moment được đọc từ bộ tích lũy và chỉ còn lượt tìm outlier.
+    """
+    cols = list(cols)
+    k = len(cols)
+    use_acc = _use_accumulator(acc, cols)
+    if use_acc:
+        idx = [acc.index_of(c) for c in cols]
+        count = acc.moments.n[idx]
+        mean = acc.moments.mean[idx]
+        m2 = acc.moments.m2[idx]
+    else:
+        count = np.zeros(k)
+        mean = np.zeros(k)
+        m2 = np.zeros(k)
+        for _, block in _chunks(df, cols, chunk_rows):
+            present = ~np.isnan(block)
+            n_b = present.sum(axis=0)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean_b = np.where(n_b > 0, np.nansum(block, axis=0) / n_b, 0.0)
+            d = np.where(present, block - mean_b, 0.0)
+            m2_b = (d * d).sum(axis=0)
+            total = count + n_b
+            safe = np.maximum(total, 1)
+            delta = mean_b - mean
+            m2 = m2 + m2_b + delta ** 2 * count * n_b / safe
+            mean = mean + delta * n_b / safe
+            count = total
+
+    m3 = np.zeros(k)
+    m4 = np.zeros(k)
+    outliers = [[] for _ in range(k)]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # z-score dùng độ lệch chuẩn tổng thể (ddof=0) như scipy.stats.zscore
+        limit = z_threshold * np.sqrt(m2 / count)
+        for start, block in _chunks(df, cols, chunk_rows):
+            d = block - mean
+            if not use_acc:
+                d2 = np.where(np.isnan(d), 0.0, d * d)
+                m3 += np.nansum(d2 * d, axis=0)
+                m4 += (d2 * d2).sum(axis=0)
+            rows, columns = np.nonzero(np.abs(d) > limit)
+            for j in range(k):
+                outliers[j].append(rows[columns == j] + start)
+
+        if use_acc:
+            variance = acc.moments.variance()[idx]
+            skewness = acc.moments.skewness()[idx]
+            kurtosis = acc.moments.kurtosis()[idx]
+        else:
+            variance = m2 / (count - 1)
+            skewness = np.sqrt(count) * m3 / m2 ** 1.5
+            kurtosis = count * m4 / m2 ** 2 - 3.0
+        std = np.sqrt(variance)
+        cv = std / mean * 100
+
+    return {
+        'columns': cols,
+        'count': count,
+        'mean': mean,
+        'variance': variance,
+        'std': std,
+        'skewness': skewness,
+        'kurtosis': kurtosis,
+        'cv': cv,
+        'outliers': [np.concatenate(parts) if parts else np.array([], dtype=np.intp) for parts in outliers],
+    }
+
+
+@instrument('processing')
+def statistical_insights(df: pd.DataFrame, acc: CatalogStats = None) -> dict:
     """Cung cấp các insights thống kê nâng cao."""
     insights = {}
-    
-    # Coefficient of Variation (CV) - độ biến thiên
+
     numeric_cols = ['Stars', 'Forks', 'Watchers', 'Open Issues']
     available_cols = [col for col in numeric_cols if col in df.columns]
-    
-    for col in available_cols:
-        if df[col].std() > 0:
-            cv = (df[col].std() / df[col].mean()) * 100
-            insights[f'{col}_cv'] = round(cv, 2)
-    
-    # Z-scores để phát hiện outliers
-    for col in available_cols:
-        if df[col].std() > 0:
-            z_scores = np.abs(stats.zscore(df[col]))
-            outliers = df[z_scores > 2][['Framework', col]]
-            if not outliers.empty:
-                insights[f'{col}_outliers'] = outliers.to_dict('records')
-    
-    # Phân tích phân phối
-    for col in available_cols:
-        if len(df[col].dropna()) > 3:
-            skewness = stats.skew(df[col].dropna())
-            kurtosis = stats.kurtosis(df[col].dropna())
+    kernel = moment_kernel(df, available_cols, acc=acc)
+
+    for i, col in enumerate(available_cols):
+        # Coefficient of Variation (CV) - độ biến thiên
+        if kernel['std'][i] > 0:
+            insights[f'{col}_cv'] = round(float(kernel['cv'][i]), 2)
+
+    for i, col in enumerate(available_cols):
+        # Z-scores để phát hiện outliers
+        if kernel['std'][i] > 0:
+            rows = kernel['outliers'][i]
+            if len(rows):
+                insights[f'{col}_outliers'] = df[['Framework', col]].iloc[rows].to_dict('records')
+
+    for i, col in enumerate(available_cols):
+        # Phân tích phân phối
+        if kernel['count'][i] > 3:
+            skewness = float(kernel['skewness'][i])
+            kurtosis = float(kernel['kurtosis'][i])
             insights[f'{col}_distribution'] = {
                 'skewness': round(skewness, 3),
                 'kurtosis': round(kurtosis, 3),
                 'skew_interpretation': 'Lệch phải' if skewness > 0.5 else 'Lệch trái' if skewness < -0.5 else 'Gần đối xứng',
                 'kurtosis_interpretation': 'Nhọn' if kurtosis > 0.5 else 'Phẳng' if kurtosis < -0.5 else 'Bình thường'
             }
-    
+
     return insights
 
 
-def framework_comparison_analysis(df: pd.DataFrame) -> pd.DataFrame:
+@instrument('processing')
+def uncertainty_analysis(df: pd.DataFrame, n_resamples: int = DEFAULT_RESAMPLES, seed: int = 0,
+                         top: int = 20) -> dict:
+    """Khoảng tin cậy bootstrap cho tương quan, CV và thứ hạng, kèm p-value hoán vị.
+
+    Hữu ích khi chỉ có vài repo: p-value tham số của ``trend_analysis`` và
+    outlier z-score rất nhạy với từng điểm dữ liệu.
+    """
+    cols = [col for col in RESAMPLE_METRICS if col in df.columns]
+    rank_cols = [col for col in RANK_METRICS if col in df.columns]
+    return resample(df, cols, rank_cols=rank_cols, labels='Framework', n_resamples=n_resamples, seed=seed, top=top)
+
+
+@instrument('processing')
+def rank_metrics(df: pd.DataFrame, metrics=None, ties: str = 'min', weights: dict = None) -> pd.DataFrame:
+    """Xếp hạng mọi metric trong một lượt vector hóa (1 = cao nhất) và tính điểm tổng có trọng số.
+
+    ``ties`` là phương pháp xử lý hạng bằng nhau của ``DataFrame.rank``
+    ('min', 'max', 'dense', 'first', 'average'); ``weights`` là dict metric -> trọng số (mặc định 1).
+    """
+    available_metrics = [m for m in (metrics or RANK_METRICS) if m in df.columns]
+    ranks = df[available_metrics].rank(method=ties, ascending=False, na_option='bottom')
+    if ties != 'average':
+        ranks = ranks.astype(int)
+
+    weight_vector = np.array([(weights or {}).get(m, 1) for m in available_metrics])
+    total = ranks.to_numpy() @ weight_vector if available_metrics else np.zeros(len(df), dtype=int)
+
+    ranks.columns = [f'{m}_rank' for m in available_metrics]
+    ranks.insert(0, 'Total_Rank_Score', total)
+    return ranks
+
+
+@instrument('processing')
+def framework_comparison_analysis(df: pd.DataFrame, ties: str = 'min', weights: dict = None) -> pd.DataFrame:
     """So sánh chi tiết giữa các framework."""
-    comparison_data = []
-    
-    for framework in df['Framework'].unique():
-        framework_data = df[df['Framework'] == framework].iloc[0]
-        
-        # Tính ranking trong từng metric
-        rankings = {}
-        metrics = ['Stars', 'Forks', 'Watchers', 'Open Issues', 'Stars/Day (ước tính)']
-        available_metrics = [m for m in metrics if m in df.columns]
-        
-        for metric in available_metrics:
-            sorted_df = df.sort_values(metric, ascending=False)
-            rank = sorted_df[sorted_df['Framework'] == framework].index[0] + 1
-            rankings[f'{metric}_rank'] = rank
-        
-        # Tổng điểm ranking (thấp hơn = tốt hơn)
-        total_rank = sum(rankings.values())
-        
-        comparison_data.append({
-            'Framework': framework,
-            'Total_Rank_Score': total_rank,
-            **rankings,
-            'Stars': framework_data.get('Stars', 0),
-            'Forks': framework_data.get('Forks', 0),
-            'Watchers': framework_data.get('Watchers', 0),
-            'Open_Issues': framework_data.get('Open Issues', 0),
-            'Stars_Per_Day': framework_data.get('Stars/Day (ước tính)', 0)
-        })
-    
-    return pd.DataFrame(comparison_data).sort_values('Total_Rank_Score')
+    frameworks = df.drop_duplicates('Framework')
+    values = frameworks.reindex(columns=list(COMPARISON_VALUES), fill_value=0).rename(columns=COMPARISON_VALUES)
+    comparison = pd.concat(
+        [frameworks[['Framework']], rank_metrics(frameworks, ties=ties, weights=weights), values], axis=1
+    )
+    # Tổng điểm ranking (thấp hơn = tốt hơn)
+    return comparison.sort_values('Total_Rank_Score', kind='stable').reset_index(drop=True)
+
+
+@instrument('processing')
+def top_k_frameworks(df: pd.DataFrame, k: int = 10, ties: str = 'min', weights: dict = None) -> pd.DataFrame:
+    """K framework có tổng điểm ranking tốt nhất, được cache theo nội dung dữ liệu."""
+    columns = ['Framework'] + [m for m in RANK_METRICS + list(COMPARISON_VALUES) if m in df.columns]
+    columns = list(dict.fromkeys(columns))
+    key = (frame_fingerprint(df[columns]), k, ties, tuple(sorted((weights or {}).items())))
 
+    def compute():
+        comparison = framework_comparison_analysis(df[columns], ties=ties, weights=weights)
+        return comparison.nsmallest(k, 'Total_Rank_Score', keep='first')
 
+    return _top_k_cache.get_or_compute(key, compute).copy()
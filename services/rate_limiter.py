@@ -0,0 +1,286 @@
+"""Rate-limit-aware scheduler that sits between the fetch functions and HTTP.
+
+* Paces requests with a token bucket (steady rate plus a small burst).
+* Tracks the remaining budget from ``X-RateLimit-Remaining`` /
+  ``X-RateLimit-Reset`` and holds requests until the window resets once it
+  is exhausted; background requests also leave the last 10% of the window
+  to interactive ones. GitHub keeps separate windows per
+  ``X-RateLimit-Resource`` (``core``, ``search``, ``graphql``), so each one
+  has its own budget and an exhausted search window never holds REST
+  fetches.
+* Retries ``403``/``429`` rate-limit responses, ``5xx`` and network errors
+  with jittered exponential backoff, honouring ``Retry-After``.
+* Grants slots to interactive requests before queued background refreshes.
+* Never parks an interactive request for longer than ``max_wait`` seconds:
+  when the budget, ``Retry-After`` or the window reset would hold it longer,
+  ``RateLimited`` is raised at once so the page can show cached data or an
+  error instead of hanging until the reset. Background requests still wait.
+"""
+
+import heapq
+import itertools
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+DEFAULT_MAX_WAIT = 10.0
+
+
+class RateLimited(requests.exceptions.RequestException):
+    """An interactive request would have to wait ``wait`` seconds (more than ``max_wait``) for the rate limit."""
+
+    def __init__(self, wait, response=None):
+        super().__init__(f"GitHub rate limit reached, next request allowed in {wait:.0f} s", response=response)
+        self.wait = wait
+
+
+def resource_for(url):
+    """GitHub rate-limit resource a request to ``url`` is counted against."""
+    path = urlparse(url).path.rstrip('/')
+    if '/search/' in path + '/':
+        return 'search'
+    if path.endswith('/graphql'):
+        return 'graphql'
+    return 'core'
+
+
+class _Budget:
+    """One rate-limit window as reported by GitHub for a resource."""
+
+    __slots__ = ('limit', 'remaining', 'reset_at', 'blocked_until')
+
+    def __init__(self):
+        self.limit = None
+        self.remaining = None
+        self.reset_at = None
+        self.blocked_until = 0.0
+
+
+class RequestScheduler:
+    """Thread-safe pacing, budget tracking and retrying of HTTP requests."""
+
+    def __init__(self, rate=10.0, burst=20, max_retries=4, backoff_base=1.0, backoff_cap=60.0,
+                 background_reserve=0.1, max_wait=DEFAULT_MAX_WAIT):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self.max_retries = max(0, int(max_retries))
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.background_reserve = background_reserve
+        # None: interactive requests wait as long as needed (batch runs)
+        self.max_wait = max_wait
+
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._budgets = {}
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+        self.rejected = 0
+
+    # --- Token bucket / priority queue ---
+
+    def _refill(self, now):
+        elapsed = now - self._refilled_at
+        self._refilled_at = now
+        self._tokens = min(float(self.burst), self._tokens + elapsed * self.rate)
+
+    def _budget(self, resource):
+        budget = self._budgets.get(resource)
+        if budget is None:
+            budget = self._budgets[resource] = _Budget()
+        return budget
+
+    def _budget_delay(self, priority, resource, now):
+        """Seconds the ``resource`` window holds a request of ``priority`` (pacing aside)."""
+        budget = self._budget(resource)
+        delay = max(0.0, budget.blocked_until - now)
+        if budget.remaining is not None and budget.reset_at is not None:
+            # Background work leaves the last fraction of the window to users
+            reserve = 0
+            if priority == BACKGROUND and budget.limit:
+                reserve = int(budget.limit * self.background_reserve)
+            if budget.remaining <= reserve:
+                delay = max(delay, budget.reset_at - time.time())
+        return delay
+
+    def _delay(self, priority, resource, now):
+        """Seconds until a request of ``priority`` may start (0 when it can go now)."""
+        delay = self._budget_delay(priority, resource, now)
+        if self._tokens < 1:
+            delay = max(delay, (1 - self._tokens) / self.rate if self.rate > 0 else 1.0)
+        return delay
+
+    def _too_long(self, priority, delay):
+        return priority == INTERACTIVE and self.max_wait is not None and delay > self.max_wait
+
+    def acquire(self, priority=INTERACTIVE, resource='core'):
+        """Block until a request slot is available for ``priority`` in ``resource``.
+
+        Waiters are served in priority order, but one held by its own
+        exhausted window does not hold requests for other resources.
+        Raises ``RateLimited`` instead when an interactive request would wait
+        longer than ``max_wait``.
+        """
+        ticket = (priority, next(self._sequence), resource)
+        with self._cond:
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    ahead = any(other < ticket and self._budget_delay(other[0], other[2], now) <= 0
+                                for other in self._waiters)
+                    if not ahead:
+                        delay = self._delay(priority, resource, now)
+                        if delay <= 0:
+                            self._tokens -= 1
+                            budget = self._budget(resource)
+                            if budget.remaining is not None:
+                                budget.remaining -= 1
+                            return
+                        if self._too_long(priority, delay):
+                            self.rejected += 1
+                            raise RateLimited(delay)
+                        self.throttled += 1
+                        self._cond.wait(delay)
+                    else:
+                        self._cond.wait()
+            finally:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+    # --- Budget tracking ---
+
+    def observe(self, response, resource='core'):
+        """Update the remaining budget from GitHub's rate-limit headers.
+
+        ``X-RateLimit-Resource`` names the window when GitHub sends it;
+        otherwise ``resource`` (derived from the request URL) is used.
+        """
+        headers = response.headers
+        with self._cond:
+            budget = self._budget(headers.get('X-RateLimit-Resource') or resource)
+            try:
+                if 'X-RateLimit-Limit' in headers:
+                    budget.limit = int(headers['X-RateLimit-Limit'])
+                if 'X-RateLimit-Remaining' in headers:
+                    budget.remaining = int(headers['X-RateLimit-Remaining'])
+                if 'X-RateLimit-Reset' in headers:
+                    budget.reset_at = float(headers['X-RateLimit-Reset'])
+            except ValueError:
+                pass
+            self._cond.notify_all()
+
+    def _is_rate_limited(self, response):
+        if response.status_code == 429:
+            return True
+        if response.status_code != 403:
+            return False
+        # 403 is also used for permission errors, which must not be retried
+        return (
+            'Retry-After' in response.headers
+            or response.headers.get('X-RateLimit-Remaining') == '0'
+            or 'rate limit' in response.text.lower()
+        )
+
+    def _backoff(self, attempt, response=None):
+        """Seconds to wait before retry ``attempt`` (1-based)."""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after:
+                try:
+                    return float(retry_after)
+                except ValueError:
+                    pass
+            if response.headers.get('X-RateLimit-Remaining') == '0' and 'X-RateLimit-Reset' in response.headers:
+                try:
+                    return max(0.0, float(response.headers['X-RateLimit-Reset']) - time.time()) + 1
+                except ValueError:
+                    pass
+        # Full jitter: uniform in [0, min(cap, base * 2^attempt)]
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def _pause(self, seconds, resource='core'):
+        """Hold every queued request for ``resource``, not just the failing one, for ``seconds``."""
+        with self._cond:
+            budget = self._budget(resource)
+            budget.blocked_until = max(budget.blocked_until, time.monotonic() + seconds)
+            self._cond.notify_all()
+
+    # --- Public API ---
+
+    def request(self, session, method, url, priority=INTERACTIVE, **kwargs):
+        """Send a request through the scheduler and return the final response.
+
+        Retryable failures are retried up to ``max_retries`` times; the last
+        response is returned (or the last network error raised) afterwards.
+        An interactive request whose rate-limit pause would exceed ``max_wait``
+        raises ``RateLimited`` without retrying.
+        """
+        resource = resource_for(url)
+        attempt = 0
+        while True:
+            self.acquire(priority, resource)
+            with self._cond:
+                self.requests += 1
+            try:
+                response = session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                self._count_retry()
+                time.sleep(self._backoff(attempt))
+                continue
+
+            self.observe(response, resource)
+            rate_limited = self._is_rate_limited(response)
+            if not (rate_limited or response.status_code in RETRY_STATUSES) or attempt >= self.max_retries:
+                return response
+            delay = self._backoff(attempt + 1, response)
+            if rate_limited:
+                # Other requests for this resource are held either way; only this caller gives up
+                self._pause(delay, response.headers.get('X-RateLimit-Resource') or resource)
+                if self._too_long(priority, delay):
+                    with self._cond:
+                        self.rejected += 1
+                    raise RateLimited(delay, response)
+            attempt += 1
+            self._count_retry()
+            if not rate_limited:
+                time.sleep(delay)
+
+    def _count_retry(self):
+        with self._cond:
+            self.retries += 1
+
+    def stats(self):
+        """Current ``core`` budget, counters and every window under ``resources``."""
+        with self._cond:
+            core = self._budget('core')
+            return {
+                'limit': core.limit,
+                'remaining': core.remaining,
+                'reset_at': core.reset_at,
+                'resources': {name: {'limit': budget.limit, 'remaining': budget.remaining,
+                                     'reset_at': budget.reset_at}
+                              for name, budget in sorted(self._budgets.items())},
+                'requests': self.requests,
+                'retries': self.retries,
+                'throttled': self.throttled,
+                'rejected': self.rejected,
+                'queued': len(self._waiters),
+            }
@@ -0,0 +1,235 @@
+"""Stale-while-revalidate store of repository records.
+
+``BackgroundRefresher.get`` answers from the last good records straight
+away; only repositories that were never fetched are loaded in the request.
+A daemon thread refreshes repositories whose data is older than
+``max_age`` at background priority. The most viewed repositories go first (view
+counts decay with a half-life of ``max_age``), and ties go to the oldest
+data. Repositories nobody has viewed for ``idle_cycles`` refresh periods
+are dropped, and a repository whose fetch failed is retried with
+exponential backoff, both in the background and on first load. Each refreshed batch is swapped in as a new
+mapping, so a reader sees either the old or the new record of a repository,
+never a half-updated catalog.
+
+Refreshes bypass the one-hour memo but still use the conditional-request
+cache, so unchanged repositories cost a ``304`` and no rate limit.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from services.diagnostics import count, register_source
+from services.github_api import get_frameworks_data
+from services.rate_limiter import BACKGROUND, INTERACTIVE
+
+logger = logging.getLogger('services')
+
+DEFAULT_MAX_AGE = 3600
+DEFAULT_POLL_INTERVAL = 30
+DEFAULT_BATCH_SIZE = 100
+# Unviewed repositories are dropped after this many refresh periods (max_age)
+DEFAULT_IDLE_CYCLES = 24
+# A repository whose fetch failed is retried after RETRY_DELAY, doubling per failure up to MAX_RETRY_DELAY
+RETRY_DELAY = 300
+MAX_RETRY_DELAY = 6 * 3600
+
+
+def background_refresh_enabled() -> bool:
+    """GITHUB_BACKGROUND_REFRESH=0 turns the refresher off (the app then fetches per request)."""
+    return os.getenv("GITHUB_BACKGROUND_REFRESH", "1").strip().lower() not in ("0", "false", "no")
+
+
+class BackgroundRefresher:
+    """Last good record per ``(name, repo_path)`` plus the worker that keeps them fresh."""
+
+    def __init__(self, max_age=DEFAULT_MAX_AGE, poll_interval=DEFAULT_POLL_INTERVAL,
+                 batch_size=DEFAULT_BATCH_SIZE, idle_cycles=DEFAULT_IDLE_CYCLES, fetch=None):
+        self.max_age = max_age
+        self.poll_interval = poll_interval
+        self.batch_size = max(1, int(batch_size))
+        self.idle_after = max_age * idle_cycles
+        self._fetch = fetch or (lambda targets, priority: get_frameworks_data(
+            dict(targets), [], priority=priority, fresh=True))
+        # (name, path) -> (record, fetched_at); replaced wholesale, never mutated
+        self._entries = {}
+        # (name, path) -> (decayed view count, time of last view)
+        self._views = {}
+        # (name, path) -> (time of last failure, consecutive failures)
+        self._failures = {}
+        self._forced = set()
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.refreshed = 0
+        self.failures = 0
+        self.evicted = 0
+        self.last_cycle_at = None
+
+    # --- Reading ---
+
+    def get(self, frameworks_dict, selected):
+        """Records for the selected repositories and the fetch time of the oldest one.
+
+        Only repositories without any data are fetched here; everything else
+        is served as is and refreshed in the background.
+        """
+        targets = [(name, path) for name, path in frameworks_dict.items() if not selected or name in selected]
+        now = time.time()
+        with self._lock:
+            for target in targets:
+                self._views[target] = (self._view_score(target, now) + 1, now)
+            # Repositories whose last fetch failed wait for their backoff instead of being fetched on every run
+            missing = [target for target in targets if target not in self._entries and self._retry_due(target, now)]
+        if missing:
+            # One loader at a time: concurrent sessions wait for it instead of fetching the same repos twice
+            with self._load_lock:
+                missing = [target for target in missing if target not in self._entries]
+                if missing:
+                    self._store(missing, self._fetch(missing, INTERACTIVE))
+        count('refresher.served', len(targets) - len(missing))
+
+        entries = self._entries
+        served = [entries[target] for target in targets if target in entries]
+        if not served:
+            return [], None
+        return [record for record, _ in served], min(fetched_at for _, fetched_at in served)
+
+    # --- Bookkeeping (callers hold self._lock) ---
+
+    def _view_score(self, target, now):
+        score, viewed_at = self._views.get(target, (0.0, now))
+        return score * 0.5 ** ((now - viewed_at) / self.max_age) if self.max_age > 0 else score
+
+    def _retry_due(self, target, now):
+        failure = self._failures.get(target)
+        if failure is None:
+            return True
+        failed_at, attempts = failure
+        return now - failed_at >= min(MAX_RETRY_DELAY, RETRY_DELAY * 2 ** (attempts - 1))
+
+    def _evict_idle(self, now):
+        idle = {target for target, (_, viewed_at) in self._views.items() if now - viewed_at >= self.idle_after}
+        if not idle:
+            return
+        self._entries = {target: entry for target, entry in self._entries.items() if target not in idle}
+        for target in idle:
+            self._views.pop(target, None)
+            self._failures.pop(target, None)
+            self._forced.discard(target)
+        self.evicted += len(idle)
+        count('refresher.evicted', len(idle))
+
+    # --- Refreshing ---
+
+    def _store(self, targets, records):
+        now = time.time()
+        by_target = {(record['Framework'], record['Repo']): record for record in records}
+        with self._lock:
+            entries = dict(self._entries)
+            for target in targets:
+                record = by_target.get(target)
+                if record is None:
+                    # Keep serving the previous record (if any) and try again after a backoff
+                    _, attempts = self._failures.get(target, (now, 0))
+                    self._failures[target] = (now, attempts + 1)
+                    self.failures += 1
+                    continue
+                entries[target] = (record, now)
+                self._failures.pop(target, None)
+                self._forced.discard(target)
+            self._entries = entries
+
+    def due(self, now=None):
+        """Repositories older than ``max_age`` (or forced), most viewed first, then oldest first.
+
+        Repositories nobody viewed for ``idle_after`` seconds are evicted first.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            self._evict_idle(now)
+            due = [
+                target for target, (_, fetched_at) in self._entries.items()
+                if (target in self._forced or now - fetched_at >= self.max_age) and self._retry_due(target, now)
+            ]
+            return sorted(due, key=lambda target: (-self._view_score(target, now), self._entries[target][1]))
+
+    def refresh_once(self):
+        """Refresh up to ``batch_size`` due repositories; returns how many were refreshed."""
+        due = self.due()[:self.batch_size]
+        self.last_cycle_at = time.time()
+        if not due:
+            return 0
+        records = self._fetch(due, BACKGROUND)
+        self._store(due, records)
+        self.refreshed += len(records)
+        count('refresher.refreshed', len(records))
+        return len(records)
+
+    def request_refresh(self):
+        """Mark every known repository as due and wake the worker (returns immediately)."""
+        with self._lock:
+            self._forced.update(self._entries)
+            self._failures.clear()
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                # Keep going while a backlog remains, otherwise sleep until the next poll
+                if self.refresh_once() >= self.batch_size:
+                    continue
+            except Exception:
+                logger.exception("Background refresh failed")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="github-refresher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self):
+        with self._lock:
+            entries = self._entries
+            now = time.time()
+            ages = [now - fetched_at for _, fetched_at in entries.values()]
+            return {
+                'repos': len(entries),
+                'due': sum(age >= self.max_age for age in ages),
+                'oldest_age_s': max(ages) if ages else None,
+                'refreshed': self.refreshed,
+                'failures': self.failures,
+                'backing_off': len(self._failures),
+                'evicted': self.evicted,
+                'running': self._thread is not None and self._thread.is_alive(),
+            }
+
+
+def build_refresher():
+    """Refresher configured from the GITHUB_REFRESH_* variables (MAX_AGE, INTERVAL, BATCH, IDLE_CYCLES)."""
+    def env(name, default, cast=float):
+        try:
+            return cast(os.getenv(name, default))
+        except ValueError:
+            return cast(default)
+
+    refresher = BackgroundRefresher(
+        max_age=env("GITHUB_REFRESH_MAX_AGE", DEFAULT_MAX_AGE),
+        poll_interval=env("GITHUB_REFRESH_INTERVAL", DEFAULT_POLL_INTERVAL),
+        batch_size=env("GITHUB_REFRESH_BATCH", DEFAULT_BATCH_SIZE, int),
+        idle_cycles=env("GITHUB_REFRESH_IDLE_CYCLES", DEFAULT_IDLE_CYCLES),
+    )
+    register_source('refresher', refresher.stats)
+    return refresher.start()
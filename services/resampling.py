@@ -0,0 +1,249 @@
+"""Batched bootstrap and permutation engine.
+
+Resamples are drawn as ``(B, n)`` index matrices and every statistic is
+evaluated for a whole block of resamples at once with NumPy (batched matrix
+products for correlations, one ``bincount`` per block for rank positions).
+Blocks are sized from a memory budget (``RESAMPLE_MEMORY_MB``) shared by
+every block in flight, so large catalogs get smaller blocks and fewer
+workers instead of gigabyte temporaries. Each block gets its own child seed
+from one ``SeedSequence``, so a given seed produces the same result whether
+the blocks run in-process or spread over a process pool.
+
+Statistics:
+
+- bootstrap percentile intervals for Pearson correlations and coefficients
+  of variation (rows with a missing value in ``cols`` are dropped);
+- permutation p-values for every correlation pair;
+- bootstrap intervals for rank positions: where each item would rank
+  against a resampled population of the other repositories.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from services.diagnostics import instrument
+
+DEFAULT_RESAMPLES = 10_000
+# Upper bound; the memory budget lowers it for large catalogs
+BLOCK_SIZE = 250
+DEFAULT_MEMORY_MB = 512
+# Below this many resampled values (B * n) a process pool costs more than it saves
+PARALLEL_MIN_VALUES = 5_000_000
+
+
+def get_max_workers():
+    """Process pool size for large resampling jobs (RESAMPLE_WORKERS, default: CPU count)."""
+    try:
+        return max(1, int(os.getenv("RESAMPLE_WORKERS", os.cpu_count() or 1)))
+    except ValueError:
+        return os.cpu_count() or 1
+
+
+def get_memory_budget():
+    """Bytes all blocks in flight may use together (RESAMPLE_MEMORY_MB, default 512)."""
+    try:
+        return max(1, int(float(os.getenv("RESAMPLE_MEMORY_MB", DEFAULT_MEMORY_MB)) * 1024 * 1024))
+    except ValueError:
+        return DEFAULT_MEMORY_MB * 1024 * 1024
+
+
+def plan_blocks(n, k, workers, memory_budget, block_size=BLOCK_SIZE):
+    """``(workers, block_size)`` such that the blocks in flight fit in ``memory_budget`` bytes.
+
+    One resample holds an ``(n, k)`` float64 sample (bootstrap, then
+    permutation) plus its int32 index row and int64 rank codes.
+    """
+    per_resample = n * (8 * k + 16)
+    workers = max(1, min(workers, memory_budget // per_resample))
+    block_size = max(1, min(block_size, memory_budget // workers // per_resample))
+    return workers, block_size
+
+
+def _standardize(X):
+    """Center and scale the columns of ``X`` to unit norm (so ``Z.T @ Z`` is the correlation matrix)."""
+    centered = X - X.mean(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return centered / np.sqrt((centered * centered).sum(axis=0))
+
+
+def batched_moments(sample):
+    """Column means and covariance matrices (ddof=1) of a ``(B, n, k)`` block.
+
+    One batched matrix product gives every cross-product; the caller should
+    pass globally centered data so the subtraction below stays well conditioned.
+    """
+    n = sample.shape[1]
+    sums = sample.sum(axis=1)
+    gram = np.swapaxes(sample, 1, 2) @ sample
+    cov = (gram - sums[:, :, None] * sums[:, None, :] / n) / (n - 1)
+    return sums / n, cov
+
+
+def batched_correlation(cov):
+    """Pearson matrices from ``(B, k, k)`` covariance matrices."""
+    # Rounding can leave a tiny negative variance for a constant resample
+    std = np.sqrt(np.maximum(np.diagonal(cov, axis1=1, axis2=2), 0.0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.clip(cov / (std[:, :, None] * std[:, None, :]), -1.0, 1.0)
+
+
+def batched_cv(mean, cov):
+    """Coefficient of variation (%, ddof=1) per column from batched means and covariances."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.sqrt(np.maximum(np.diagonal(cov, axis1=1, axis2=2), 0.0)) / mean * 100
+
+
+def _dense_codes(values):
+    """Dense integer codes of ``values`` (equal values share a code, larger value -> larger code)."""
+    uniques, codes = np.unique(values, return_inverse=True)
+    return codes.reshape(-1), len(uniques)
+
+
+def batched_rank_positions(codes, n_codes, idx, items):
+    """Rank (1 = highest) of each item's value within each resampled population.
+
+    ``codes`` are dense value codes, ``idx`` a ``(B, n)`` index matrix. Returns
+    ``(B, len(items))`` positions; ties take the best (``'min'``) position.
+    """
+    B = idx.shape[0]
+    offsets = (np.arange(B) * n_codes)[:, None]
+    counts = np.bincount((codes[idx] + offsets).ravel(), minlength=B * n_codes).reshape(B, n_codes)
+    # Number of resampled values strictly greater than each code
+    greater = counts[:, ::-1].cumsum(axis=1)[:, ::-1] - counts
+    return 1 + greater[:, codes[items]]
+
+
+def _run_block(task):
+    """Worker: evaluate one block of resamples; every result is mergeable across blocks."""
+    X, rank_codes, items, seed, size = task
+    rng = np.random.default_rng(seed)
+    n = X.shape[0]
+
+    boot = rng.integers(0, n, size=(size, n), dtype=np.int32)
+    center = X.mean(axis=0)
+    mean, cov = batched_moments((X - center)[boot])
+    result = {
+        'correlation': batched_correlation(cov).astype(np.float32),
+        'cv': batched_cv(mean + center, cov).astype(np.float32),
+    }
+
+    # Permutation test: shuffle whole rows and correlate them with the original columns
+    perm = rng.permuted(np.broadcast_to(np.arange(n, dtype=np.int32), (size, n)), axis=1)
+    Z = _standardize(X)
+    permuted = Z.T @ Z[perm]
+    observed = Z.T @ Z
+    result['exceed'] = (np.abs(permuted) >= np.abs(observed) - 1e-12).sum(axis=0)
+
+    # Rank positions: histogram of positions per item so blocks merge by addition
+    result['rank_hist'] = []
+    for codes, n_codes in rank_codes:
+        positions = batched_rank_positions(codes, n_codes, boot, items)
+        flat = (np.arange(len(items)) * (n + 2) + positions).ravel()
+        result['rank_hist'].append(np.bincount(flat, minlength=len(items) * (n + 2)).reshape(len(items), n + 2))
+    return result
+
+
+def _blocks(n_resamples, seed, block_size):
+    children = np.random.SeedSequence(seed).spawn(-(-n_resamples // block_size))
+    sizes = [block_size] * (n_resamples // block_size)
+    if n_resamples % block_size:
+        sizes.append(n_resamples % block_size)
+    return list(zip(children, sizes))
+
+
+def _hist_quantile(hist, q):
+    """Quantile ``q`` of integer positions from per-item histograms."""
+    cumulative = hist.cumsum(axis=1)
+    return (cumulative >= q * cumulative[:, -1:]).argmax(axis=1)
+
+
+@instrument('stats')
+def resample(df: pd.DataFrame, cols, rank_cols=(), labels=None, n_resamples=DEFAULT_RESAMPLES, seed=None,
+             alpha=0.05, top=20, workers=None, block_size=BLOCK_SIZE) -> dict:
+    """Bootstrap intervals and permutation tests for ``cols`` (see module docstring).
+
+    ``rank_cols`` are ranked (highest first) and intervals are reported for
+    the ``top`` items of each, labelled by ``labels`` (a column name, e.g.
+    ``'Framework'``). ``workers`` > 1 spreads the blocks over a process pool;
+    by default it is used only for large jobs. Returns a dict of DataFrames:
+    ``'correlation'``, ``'cv'`` and ``'rank'``.
+    """
+    cols, rank_cols = list(cols), list(rank_cols)
+    frame = df.dropna(subset=cols + rank_cols).reset_index(drop=True)
+    X = frame[cols].to_numpy(dtype=float)
+    n, k = X.shape
+    if n < 3:
+        return {'correlation': pd.DataFrame(), 'cv': pd.DataFrame(), 'rank': pd.DataFrame()}
+
+    rank_codes, rank_items = [], []
+    for col in rank_cols:
+        rank_codes.append(_dense_codes(frame[col].to_numpy(dtype=float)))
+    # Items of interest: the union of the top entries of every rank column
+    for col in rank_cols:
+        rank_items.extend(frame[col].nlargest(top).index)
+    items = np.array(sorted(set(rank_items)), dtype=np.int64)
+
+    if workers is None:
+        workers = get_max_workers() if n_resamples * n >= PARALLEL_MIN_VALUES else 1
+    workers, block_size = plan_blocks(n, k, workers, get_memory_budget(), block_size)
+    tasks = [(X, rank_codes, items, seed_seq, size) for seed_seq, size in _blocks(n_resamples, seed, block_size)]
+
+    # Blocks are merged as they arrive so only their small per-resample results are kept
+    correlations, cvs = [], []
+    exceed, rank_hists = 0, [0] * len(rank_cols)
+
+    def merge(block):
+        nonlocal exceed
+        correlations.append(block['correlation'])
+        cvs.append(block['cv'])
+        exceed = exceed + block['exceed']
+        for r, hist in enumerate(block['rank_hist']):
+            rank_hists[r] = rank_hists[r] + hist
+
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            for block in executor.map(_run_block, tasks):
+                merge(block)
+    else:
+        for task in tasks:
+            merge(_run_block(task))
+
+    low_q, high_q = alpha / 2, 1 - alpha / 2
+    correlations = np.concatenate(correlations)
+    cvs = np.concatenate(cvs)
+    Z = _standardize(X)
+    observed = np.clip(Z.T @ Z, -1.0, 1.0)
+
+    iu = np.triu_indices(k, k=1)
+    corr_low, corr_high = np.nanquantile(correlations, [low_q, high_q], axis=0)
+    correlation = pd.DataFrame({
+        'Metric A': np.array(cols)[iu[0]],
+        'Metric B': np.array(cols)[iu[1]],
+        'r': observed[iu],
+        'CI thấp': corr_low[iu],
+        'CI cao': corr_high[iu],
+        'p (hoán vị)': (exceed[iu] + 1) / (n_resamples + 1),
+    })
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        observed_cv = X.std(axis=0, ddof=1) / X.mean(axis=0) * 100
+    cv_low, cv_high = np.nanquantile(cvs, [low_q, high_q], axis=0)
+    cv = pd.DataFrame({'Metric': cols, 'CV (%)': observed_cv, 'CI thấp': cv_low, 'CI cao': cv_high})
+
+    rank_tables = []
+    names = frame[labels].to_numpy()[items] if labels else items
+    for r, col in enumerate(rank_cols):
+        hist = rank_hists[r]
+        observed_rank = frame[col].rank(method='min', ascending=False).to_numpy()[items].astype(int)
+        rank_tables.append(pd.DataFrame({
+            'Metric': col,
+            'Item': names,
+            'Hạng': observed_rank,
+            'CI thấp': _hist_quantile(hist, low_q),
+            'CI cao': _hist_quantile(hist, high_q),
+        }).sort_values('Hạng', kind='stable').head(top))
+    rank = pd.concat(rank_tables, ignore_index=True) if rank_tables else pd.DataFrame()
+    return {'correlation': correlation, 'cv': cv, 'rank': rank}
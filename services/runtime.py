@@ -0,0 +1,130 @@
+"""Optional Streamlit integration for the service layer.
+
+The services are shared by the Streamlit app and the headless CLI. When the
+app has already imported Streamlit, these helpers delegate to
+``st.cache_data`` / ``st.error`` and propagate the script context to worker
+threads; otherwise they fall back to an in-process TTL cache and logging, so
+importing ``services`` never pulls Streamlit in.
+"""
+
+import functools
+import inspect
+import logging
+import sys
+import threading
+import time
+
+logger = logging.getLogger('services')
+
+
+def streamlit_loaded() -> bool:
+    """True when running inside the Streamlit app (Streamlit already imported)."""
+    return 'streamlit' in sys.modules
+
+
+DEFAULT_MAX_ENTRIES = 1024
+
+
+def _ttl_cache(ttl, func, max_entries=DEFAULT_MAX_ENTRIES):
+    """Minimal ``st.cache_data`` stand-in: arguments starting with ``_`` are not hashed.
+
+    Entries are kept in write order. Every TTL is the same, so expired
+    entries are always at the front and are dropped on the next write,
+    together with the oldest ones beyond ``max_entries``.
+    """
+    signature = inspect.signature(func)
+    cache = {}
+    lock = threading.Lock()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = tuple((name, value) for name, value in bound.arguments.items() if not name.startswith('_'))
+        now = time.monotonic()
+        with lock:
+            hit = cache.get(key)
+        if hit is not None and now - hit[0] < ttl:
+            return hit[1]
+        value = func(*args, **kwargs)
+        with lock:
+            stored = time.monotonic()
+            cache.pop(key, None)
+            cache[key] = (stored, value)
+            while cache:
+                oldest = next(iter(cache))
+                if len(cache) <= max_entries and stored - cache[oldest][0] < ttl:
+                    break
+                del cache[oldest]
+        return value
+
+    wrapper.clear = cache.clear
+    wrapper.cache = cache
+    return wrapper
+
+
+class _Uncached(Exception):
+    """Carries a result that ``cache_data(cache_if=...)`` must return without storing it."""
+
+    def __init__(self, value):
+        super().__init__()
+        self.value = value
+
+
+def cache_data(ttl, cache_if=None):
+    """Decorator: ``st.cache_data(ttl=...)`` in the app, a TTL memo cache elsewhere.
+
+    With ``cache_if``, results for which it returns False (e.g. a failed
+    fetch) are returned but not memoized, so the next call tries again.
+    Neither cache stores a call that raised, which is how they are skipped.
+    """
+    def decorate(func):
+        target = func
+        if cache_if is not None:
+            @functools.wraps(func)
+            def target(*args, **kwargs):
+                value = func(*args, **kwargs)
+                if not cache_if(value):
+                    raise _Uncached(value)
+                return value
+
+        if streamlit_loaded():
+            import streamlit as st
+            cached = st.cache_data(ttl=ttl)(target)
+        else:
+            cached = _ttl_cache(ttl, target)
+        if cache_if is None:
+            return cached
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return cached(*args, **kwargs)
+            except _Uncached as skipped:
+                return skipped.value
+
+        wrapper.clear = cached.clear
+        return wrapper
+    return decorate
+
+
+def report_error(message: str):
+    """Show an error in the app, or log it when running headless."""
+    if streamlit_loaded():
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        if get_script_run_ctx() is not None:
+            import streamlit as st
+            st.error(message)
+            return
+    logger.error(message)
+
+
+def thread_initializer():
+    """Pool initializer giving worker threads the current Streamlit script context."""
+    if not streamlit_loaded():
+        return None
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return None
+    return lambda: add_script_run_ctx(threading.current_thread(), ctx)
@@ -0,0 +1,192 @@
+"""Host-wide cache of fetched data with in-flight request coalescing.
+
+``st.cache_data`` lives in one process, so Streamlit replicas behind a load
+balancer (and ``cli.py --workers``) would each fetch the same repositories.
+``SharedCache`` keeps JSON values in one SQLite file (WAL mode) that every
+process on the host opens. ``get_or_load`` makes sure one upstream call
+happens per missing key:
+
+- inside a process, concurrent callers for a key wait for the first one
+  (``SingleFlight``);
+- across processes, the loader first takes a lease row for the key. Other
+  processes poll for the value until it appears or the lease expires, then
+  take over.
+
+Failed loads (``None``) are not stored, so the next caller tries again.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+DEFAULT_SHARED_CACHE_PATH = os.path.join('.cache', 'shared.sqlite')
+DEFAULT_TTL = 600
+LEASE_TIMEOUT = 60
+POLL_INTERVAL = 0.05
+# Entries this many TTLs old are deleted now and then
+RETENTION_TTLS = 24
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs at most one ``load`` per key at a time; concurrent callers get its result."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key, load):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = load()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class SharedCache:
+    """SQLite key/value store shared by every process on the host, with single-flight loading."""
+
+    def __init__(self, path=DEFAULT_SHARED_CACHE_PATH, ttl=DEFAULT_TTL, lease_timeout=LEASE_TIMEOUT,
+                 poll_interval=POLL_INTERVAL):
+        self.path = path
+        self.ttl = ttl
+        self.lease_timeout = lease_timeout
+        self.poll_interval = poll_interval
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self._flight = SingleFlight()
+        self._puts = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Autocommit mode: lease acquisition manages its own IMMEDIATE transaction
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    # --- Entries ---
+
+    def get(self, key, newer_than):
+        """Stored value of ``key`` if it was stored after ``newer_than`` (epoch seconds), else ``None``."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM entries WHERE key = ? AND stored_at > ?", (key, newer_than)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key, value):
+        with self._lock:
+            now = time.time()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, stored_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False, default=str), now),
+            )
+            self._puts += 1
+            if self._puts % 100 == 0:
+                self._conn.execute("DELETE FROM entries WHERE stored_at < ?", (now - RETENTION_TTLS * self.ttl,))
+
+    # --- Leases ---
+
+    def _acquire(self, key, owner):
+        """Take the load lease for ``key`` unless another live process holds it."""
+        with self._lock:
+            now = time.time()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT expires_at FROM leases WHERE key = ?", (key,)).fetchone()
+                if row is not None and row[0] > now:
+                    return False
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO leases (key, owner, expires_at) VALUES (?, ?, ?)",
+                    (key, owner, now + self.lease_timeout),
+                )
+                return True
+            finally:
+                self._conn.execute("COMMIT")
+
+    def _release(self, key, owner):
+        with self._lock:
+            self._conn.execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, owner))
+
+    # --- Loading ---
+
+    def get_or_load(self, key, load, ttl=None):
+        """Value of ``key`` no older than ``ttl`` seconds, calling ``load()`` at most once host-wide."""
+        newer_than = time.time() - (self.ttl if ttl is None else ttl)
+        value = self.get(key, newer_than)
+        if value is not None:
+            self.hits += 1
+            return value
+        return self._flight.do(key, lambda: self._load(key, load, newer_than))
+
+    def _load(self, key, load, newer_than):
+        owner = f"{os.getpid()}-{uuid.uuid4().hex}"
+        deadline = time.monotonic() + self.lease_timeout
+        while True:
+            # Another process (or the previous flight here) may have stored it meanwhile
+            value = self.get(key, newer_than)
+            if value is not None:
+                self.hits += 1
+                return value
+            if self._acquire(key, owner):
+                break
+            if time.monotonic() >= deadline:
+                # The other loader is stuck; fetch ourselves rather than wait forever
+                break
+            # Wait for the lease holder; if it releases without a value (failed load), the next round takes over
+            self.waits += 1
+            time.sleep(self.poll_interval)
+        self.misses += 1
+        try:
+            value = load()
+            if value is not None:
+                self.put(key, value)
+            return value
+        finally:
+            self._release(key, owner)
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return {'hits': self.hits, 'misses': self.misses, 'waits': self.waits,
+                'coalesced': self._flight.coalesced, 'entries': entries, 'ttl': self.ttl}
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.execute("DELETE FROM leases")
+            self.hits = self.misses = self.waits = 0
@@ -0,0 +1,125 @@
+"""Local time-series store of repository snapshots.
+
+Every GitHub fetch appends one compact row per repository (counts only) to a
+SQLite table clustered on ``(repo, ts)``, so per-repo range scans read
+contiguous pages. This gives real growth rates over the last 7/30/90 days
+without calling the API again.
+"""
+
+import os
+import sqlite3
+import time
+
+DEFAULT_SNAPSHOT_PATH = os.path.join('.cache', 'snapshots.sqlite')
+GROWTH_WINDOWS = (7, 30, 90)
+
+# Record field -> column name in the store
+SNAPSHOT_FIELDS = {
+    'Stars': 'stars',
+    'Forks': 'forks',
+    'Watchers': 'watchers',
+    'Open Issues': 'open_issues',
+    'Size (KB)': 'size_kb',
+}
+
+
+def get_snapshot_path():
+    """Location of the snapshot store (GITHUB_SNAPSHOT_PATH; empty disables it)."""
+    return os.getenv("GITHUB_SNAPSHOT_PATH", DEFAULT_SNAPSHOT_PATH)
+
+
+def connect(path=None):
+    """Open the store, creating the table on first use."""
+    path = path or get_snapshot_path()
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    columns = ", ".join(f"{col} INTEGER NOT NULL" for col in SNAPSHOT_FIELDS.values())
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS snapshots (repo TEXT NOT NULL, ts INTEGER NOT NULL, {columns}, "
+        "PRIMARY KEY (repo, ts)) WITHOUT ROWID"
+    )
+    return conn
+
+
+def record_snapshots(records, ts=None, path=None):
+    """Append one snapshot row per fetched record (``get_framework_data`` shape)."""
+    if not records:
+        return 0
+    ts = int(ts if ts is not None else time.time())
+    rows = [
+        (record['Repo'], ts, *(int(record.get(field) or 0) for field in SNAPSHOT_FIELDS))
+        for record in records
+    ]
+    placeholders = ", ".join("?" * (2 + len(SNAPSHOT_FIELDS)))
+    conn = connect(path)
+    try:
+        with conn:
+            conn.executemany(f"INSERT OR REPLACE INTO snapshots VALUES ({placeholders})", rows)
+    finally:
+        conn.close()
+    return len(rows)
+
+
+def load_history(repos=None, since=None, until=None, path=None):
+    """Per-repo time series as a DataFrame (``Repo``, ``Time`` + metric columns).
+
+    ``since``/``until`` accept anything ``pd.Timestamp`` understands.
+    """
+    # Only the read side needs pandas; recording snapshots during a fetch does not
+    import pandas as pd
+
+    clauses, params = [], []
+    if repos:
+        repos = list(repos)
+        clauses.append(f"repo IN ({', '.join('?' * len(repos))})")
+        params.extend(repos)
+    if since is not None:
+        clauses.append("ts >= ?")
+        params.append(int(pd.Timestamp(since).timestamp()))
+    if until is not None:
+        clauses.append("ts <= ?")
+        params.append(int(pd.Timestamp(until).timestamp()))
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    conn = connect(path)
+    try:
+        history = pd.read_sql_query(f"SELECT * FROM snapshots {where} ORDER BY repo, ts", conn, params=params)
+    finally:
+        conn.close()
+
+    history = history.rename(columns={'repo': 'Repo', **{v: k for k, v in SNAPSHOT_FIELDS.items()}})
+    history.insert(1, 'Time', pd.to_datetime(history.pop('ts'), unit='s', utc=True))
+    return history
+
+
+def growth_summary(repos=None, windows=GROWTH_WINDOWS, now=None, path=None):
+    """Stars/Forks deltas and stars-per-day rates over each window, per repo.
+
+    The baseline for a window is the last snapshot at or before its start
+    (or the oldest one inside it when history is shorter than the window).
+    """
+    import pandas as pd
+
+    now = pd.Timestamp(now) if now is not None else pd.Timestamp.now(tz='UTC')
+    if now.tzinfo is None:
+        now = now.tz_localize('UTC')
+    history = load_history(repos, since=now - pd.Timedelta(days=max(windows) * 2), path=path)
+    if history.empty:
+        return pd.DataFrame()
+
+    latest = history.groupby('Repo').tail(1).set_index('Repo')
+    summary = latest[['Time', 'Stars', 'Forks']].rename(columns={'Time': 'Snapshot mới nhất'})
+    for days in windows:
+        start = now - pd.Timedelta(days=days)
+        before = history[history['Time'] <= start].groupby('Repo').tail(1).set_index('Repo')
+        inside = history[history['Time'] > start].groupby('Repo').head(1).set_index('Repo')
+        baseline = before.combine_first(inside).reindex(latest.index)
+        elapsed_days = (latest['Time'] - baseline['Time']).dt.total_seconds() / 86400
+        stars_delta = latest['Stars'] - baseline['Stars']
+        summary[f'Δ Stars {days}d'] = stars_delta
+        summary[f'Δ Forks {days}d'] = latest['Forks'] - baseline['Forks']
+        summary[f'Stars/Day {days}d'] = (stars_delta / elapsed_days.where(elapsed_days > 0)).round(2)
+    return summary.reset_index()
@@ -0,0 +1,265 @@
+"""Streaming, resumable ingestion of stargazer history.
+
+Pages through ``/repos/{owner}/{repo}/stargazers`` with the ``star+json``
+media type (which adds ``starred_at``) and writes fixed-size CSV batches as
+rows arrive. A cursor file records the page and in-page offset of the last
+row written, so an interrupted run resumes exactly where it stopped and later
+runs only fetch the pages after it. Memory stays bounded by one batch no
+matter how many stars the repository has.
+
+REST pages are ordered oldest first and GitHub serves at most 400 of them
+(40,000 stars); later pages answer ``422``. Once a repository hits that cap,
+newer stars are fetched from the other end instead: the GraphQL
+``stargazers`` connection ordered by ``STARRED_AT`` descending, paged until
+it reaches the newest star already stored. That sweep is resumable too (its
+GraphQL cursor is saved) and needs ``GITHUB_TOKEN``. Stars between the 40,000th
+and the newest one at the time of the first capped run are picked up by the
+first sweep.
+
+Usage::
+
+    python -m services.stargazers facebook/react
+"""
+
+import csv
+import json
+import logging
+import os
+import sys
+from collections import Counter
+
+from services.github_api import get_api_url, get_headers, send_request
+from services.rate_limiter import BACKGROUND
+
+DEFAULT_STARGAZER_DIR = os.path.join('.cache', 'stargazers')
+PER_PAGE = 100
+DEFAULT_BATCH_SIZE = 5000
+STAR_MEDIA_TYPE = "application/vnd.github.star+json"
+# GitHub answers 422 past this many pages of /stargazers
+MAX_REST_PAGES = 400
+
+STARGAZERS_QUERY = """
+query($owner: String!, $name: String!, $after: String) {
+  repository(owner: $owner, name: $name) {
+    stargazers(first: 100, after: $after, orderBy: {field: STARRED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      edges { starredAt node { login } }
+    }
+  }
+}
+"""
+
+logger = logging.getLogger('services')
+
+
+class PaginationCapped(Exception):
+    """The REST stargazer listing stopped serving pages (HTTP 422 past page 400)."""
+
+
+def get_repo_dir(repo_path, base_dir=None):
+    """Directory holding the batches and cursor of one repository."""
+    base_dir = base_dir or os.getenv("GITHUB_STARGAZER_DIR", DEFAULT_STARGAZER_DIR)
+    return os.path.join(base_dir, repo_path.replace('/', '__'))
+
+
+def read_cursor(repo_dir):
+    """Saved position: next ``page``, rows already stored from it, batch and row counts.
+
+    ``capped`` is set once the REST listing hit its page cap, ``newest`` is
+    the latest ``starred_at`` stored and ``sweep`` the state of an unfinished
+    newest-first GraphQL sweep.
+    """
+    cursor = {'page': 1, 'offset': 0, 'batches': 0, 'rows': 0, 'capped': False, 'newest': None, 'sweep': None}
+    try:
+        with open(os.path.join(repo_dir, 'cursor.json'), encoding='utf-8') as f:
+            cursor.update(json.load(f))
+    except FileNotFoundError:
+        pass
+    return cursor
+
+
+def write_cursor(repo_dir, cursor):
+    """Persist the cursor atomically so a crash never leaves it half-written."""
+    path = os.path.join(repo_dir, 'cursor.json')
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cursor, f)
+    os.replace(tmp_path, path)
+
+
+def iter_stargazer_pages(repo_path, start_page=1, per_page=PER_PAGE, priority=BACKGROUND):
+    """Yield ``(page, rows)`` from ``start_page`` until the last page.
+
+    Each row is ``(starred_at, login)``. Requests go through the shared
+    scheduler at background priority so dashboard loads are served first.
+    Raises ``PaginationCapped`` when GitHub refuses further pages (``422``).
+    """
+    url = f"{get_api_url()}/repos/{repo_path}/stargazers"
+    headers = {**get_headers(), "Accept": STAR_MEDIA_TYPE}
+    page = start_page
+    while True:
+        response = send_request(
+            "GET", url, priority=priority, headers=headers,
+            params={"per_page": per_page, "page": page}, timeout=30
+        )
+        if response.status_code == 422:
+            raise PaginationCapped(page)
+        response.raise_for_status()
+        rows = [
+            (item.get('starred_at'), (item.get('user') or {}).get('login'))
+            for item in response.json()
+        ]
+        yield page, rows
+        if len(rows) < per_page or 'next' not in response.links:
+            return
+        page += 1
+
+
+def iter_newest_stargazers(repo_path, after=None, priority=BACKGROUND):
+    """Yield ``(end_cursor, rows)`` pages of stargazers, newest first, via GraphQL."""
+    owner, _, name = repo_path.partition('/')
+    while True:
+        response = send_request(
+            "POST", f"{get_api_url()}/graphql", priority=priority, headers=get_headers(), timeout=30,
+            json={"query": STARGAZERS_QUERY, "variables": {"owner": owner, "name": name, "after": after}},
+        )
+        response.raise_for_status()
+        payload = response.json()
+        if payload.get('errors'):
+            raise RuntimeError(f"GraphQL error for {repo_path}: {payload['errors'][0].get('message')}")
+        connection = ((payload.get('data') or {}).get('repository') or {}).get('stargazers') or {}
+        rows = [(edge.get('starredAt'), (edge.get('node') or {}).get('login')) for edge in connection.get('edges', [])]
+        page_info = connection.get('pageInfo') or {}
+        after = page_info.get('endCursor')
+        yield after, rows
+        if not page_info.get('hasNextPage') or not rows:
+            return
+
+
+def _write_batch(repo_dir, index, rows):
+    path = os.path.join(repo_dir, f'batch-{index:06d}.csv')
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['starred_at', 'login'])
+        writer.writerows(rows)
+    os.replace(tmp_path, path)
+
+
+def ingest_stargazers(repo_path, base_dir=None, batch_size=DEFAULT_BATCH_SIZE, per_page=PER_PAGE):
+    """Fetch new stargazers of ``repo_path`` and append them as CSV batches.
+
+    Returns the number of rows written by this run.
+    """
+    repo_dir = get_repo_dir(repo_path, base_dir)
+    os.makedirs(repo_dir, exist_ok=True)
+    cursor = read_cursor(repo_dir)
+    buffer = []
+    written = 0
+
+    def track_newest(starred_at):
+        # REST pages are oldest first, so the last stored row is the newest
+        if starred_at:
+            cursor['newest'] = starred_at
+
+    def flush(page, offset):
+        nonlocal buffer, written
+        if buffer:
+            cursor['batches'] += 1
+            _write_batch(repo_dir, cursor['batches'], buffer)
+            cursor['rows'] += len(buffer)
+            written += len(buffer)
+            buffer = []
+        # A full page is done: the next run starts on the following one
+        if offset >= per_page:
+            page, offset = page + 1, 0
+        cursor['page'], cursor['offset'] = page, offset
+        write_cursor(repo_dir, cursor)
+
+    page, offset = cursor['page'], cursor['offset']
+    if not cursor['capped']:
+        try:
+            for page, rows in iter_stargazer_pages(repo_path, start_page=cursor['page'], per_page=per_page):
+                start = cursor['offset'] if page == cursor['page'] else 0
+                for offset in range(start, len(rows)):
+                    buffer.append(rows[offset])
+                    track_newest(rows[offset][0])
+                    if len(buffer) >= batch_size:
+                        flush(page, offset + 1)
+                offset = len(rows)
+        except PaginationCapped as capped:
+            logger.warning(
+                "%s: GitHub serves only the first %d pages of /stargazers (422 on page %s); "
+                "continuing with newer stars from the newest end via GraphQL", repo_path, MAX_REST_PAGES, capped
+            )
+            cursor['capped'] = True
+        flush(page, offset)
+    if cursor['capped']:
+        written += _sweep_newest(repo_path, repo_dir, cursor, batch_size)
+    return written
+
+
+def _sweep_newest(repo_path, repo_dir, cursor, batch_size):
+    """Store the stars newer than ``cursor['newest']``, paging newest first; returns rows written."""
+    if not os.getenv("GITHUB_TOKEN"):
+        logger.warning("%s: stars past the REST page cap need GITHUB_TOKEN (GraphQL); skipping", repo_path)
+        return 0
+    # ``until`` stays fixed for the whole sweep; ``top`` becomes the new ``newest`` once it completes
+    sweep = cursor['sweep'] or {'after': None, 'until': cursor['newest'], 'top': None}
+    buffer, written = [], 0
+
+    def flush(after):
+        nonlocal buffer, written
+        if buffer:
+            cursor['batches'] += 1
+            _write_batch(repo_dir, cursor['batches'], buffer)
+            cursor['rows'] += len(buffer)
+            written += len(buffer)
+            buffer = []
+        sweep['after'] = after
+        cursor['sweep'] = sweep
+        write_cursor(repo_dir, cursor)
+
+    after = sweep['after']
+    for end_cursor, rows in iter_newest_stargazers(repo_path, after=after):
+        # ISO-8601 UTC timestamps compare correctly as strings
+        fresh = [row for row in rows if sweep['until'] is None or (row[0] or '') > sweep['until']]
+        if fresh and sweep['top'] is None:
+            sweep['top'] = fresh[0][0]
+        buffer.extend(fresh)
+        if len(fresh) < len(rows):
+            break
+        after = end_cursor
+        if len(buffer) >= batch_size:
+            flush(after)
+    cursor['newest'] = sweep['top'] or sweep['until']
+    flush(None)
+    cursor['sweep'] = None
+    write_cursor(repo_dir, cursor)
+    return written
+
+
+def iter_stargazer_batches(repo_path, base_dir=None):
+    """Yield the stored rows of one repository, one batch file at a time."""
+    repo_dir = get_repo_dir(repo_path, base_dir)
+    if not os.path.isdir(repo_dir):
+        return
+    for name in sorted(os.listdir(repo_dir)):
+        if name.startswith('batch-') and name.endswith('.csv'):
+            with open(os.path.join(repo_dir, name), newline='', encoding='utf-8') as f:
+                reader = csv.reader(f)
+                next(reader, None)
+                yield [tuple(row) for row in reader]
+
+
+def daily_star_counts(repo_path, base_dir=None):
+    """New stars per UTC day as a ``{'YYYY-MM-DD': count}`` dict, streamed from disk."""
+    counts = Counter()
+    for rows in iter_stargazer_batches(repo_path, base_dir):
+        counts.update(starred_at[:10] for starred_at, _ in rows if starred_at)
+    return dict(sorted(counts.items()))
+
+
+if __name__ == '__main__':
+    for repo in sys.argv[1:]:
+        print(f"{repo}: {ingest_stargazers(repo)} new stargazers")
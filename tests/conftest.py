@@ -0,0 +1,24 @@
+import pytest
+
+from benchmarks.fake_github import start_server
+
+
+@pytest.fixture
+def fake_github(monkeypatch, tmp_path):
+    """Local GitHub stand-in with the fetch layer reset and its caches disabled."""
+    from services import github_api, github_graphql
+
+    server = start_server()
+    monkeypatch.setenv('GITHUB_API_URL', server.url)
+    monkeypatch.setenv('GITHUB_CACHE_PATH', '')
+    monkeypatch.setenv('GITHUB_SHARED_CACHE_PATH', '')
+    monkeypatch.setenv('GITHUB_SNAPSHOT_PATH', str(tmp_path / 'snapshots.sqlite'))
+    monkeypatch.delenv('GITHUB_TOKEN', raising=False)
+    github_api.get_framework_data.clear()
+    github_graphql.get_batch_data.clear()
+    monkeypatch.setattr(github_api, '_scheduler', None)
+    yield server
+    server.shutdown()
+    server.server_close()
+    github_api.get_framework_data.clear()
+    github_graphql.get_batch_data.clear()
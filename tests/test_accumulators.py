@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import generate_records
+from services import processing as P
+from services.pipeline import Pipeline
+
+
+def _frame(n=300, compact=False):
+    records = generate_records(n)
+    # Stars/Fork and Issues/Stars are NaN for these repos
+    records[0]['Forks'] = 0
+    records[1]['Stars'] = 0
+    return Pipeline(records, compact=compact).frame().copy()
+
+
+def _assert_matches_pandas(df, acc):
+    pd.testing.assert_frame_equal(P.describe_stats(df, True, True, acc=acc), P.describe_stats(df, True, True),
+                                  check_exact=False, atol=0.011)
+    pd.testing.assert_frame_equal(P.correlation_analysis(df, acc=acc), P.correlation_analysis(df),
+                                  check_exact=False, atol=1.1e-3)
+    with_acc = P.moment_kernel(df, P.CORRELATION_METRICS, acc=acc)
+    without = P.moment_kernel(df, P.CORRELATION_METRICS)
+    for key in ('count', 'mean', 'variance', 'skewness', 'kurtosis'):
+        np.testing.assert_allclose(with_acc[key], without[key], rtol=1e-6)
+    assert P.statistical_insights(df, acc=acc).keys() == P.statistical_insights(df).keys()
+    for include_watchers in (True, False):
+        pd.testing.assert_frame_equal(P.group_by_license(df, include_watchers, True, acc=acc),
+                                      P.group_by_license(df, include_watchers, True))
+
+
+def test_accumulator_used_with_zero_forks():
+    df = _frame()
+    assert df['Stars/Fork'].isna().any()
+    acc = P.build_catalog_stats()
+    acc.sync(df)
+    assert P._use_accumulator(acc, P.CORRELATION_METRICS)
+    _assert_matches_pandas(df, acc)
+
+    # Incremental update: one repo loses its forks, another one is dropped
+    df.loc[5, ['Forks', 'Stars/Fork']] = [0, np.nan]
+    df = df.drop(index=9).reset_index(drop=True)
+    assert acc.sync(df) == 2
+    _assert_matches_pandas(df, acc)
+
+
+def test_duplicate_repo_counted_like_the_frame():
+    df = _frame()
+    acc = P.build_catalog_stats()
+    acc.sync(df)
+    # The same repository selected under a second name, and listed twice under the same name
+    alias = df.iloc[[3]].assign(Framework='Alias')
+    df = pd.concat([df, alias, df.iloc[[4]]], ignore_index=True)
+    acc.sync(df)
+    assert acc.size == len(df)
+    _assert_matches_pandas(df, acc)
+    assert P.describe_stats(df, True, True, acc=acc).loc['count', 'Stars'] == len(df)
+
+
+def test_compact_frame_keeps_dtypes():
+    # Narrow integer columns: sums that overflow int16 become int64 exactly like pandas
+    df = _frame(compact=True)
+    acc = P.build_catalog_stats()
+    acc.sync(df)
+    _assert_matches_pandas(df, acc)
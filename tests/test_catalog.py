@@ -0,0 +1,30 @@
+import os
+
+import pytest
+import requests
+
+from services import catalog
+
+
+def test_build_catalog_streams_and_merges(fake_github, tmp_path):
+    path = str(tmp_path / 'catalog.jsonl')
+    assert catalog.build_catalog(orgs=['vuejs'], path=path) == catalog.build_catalog(orgs=['vuejs'], path=path)
+    assert len(catalog.load_catalog(path)) > 0
+    assert not os.path.exists(path + '.tmp')
+
+
+def test_failed_build_keeps_catalog_and_removes_tmp(fake_github, tmp_path, monkeypatch):
+    path = str(tmp_path / 'catalog.jsonl')
+    catalog.build_catalog(orgs=['vuejs'], path=path)
+    before = catalog.load_catalog(path)
+
+    def failing_sources(*args):
+        for repo in catalog.iter_org_repos('other'):
+            yield repo, 'org:other'
+        raise requests.exceptions.ConnectionError('boom')
+
+    monkeypatch.setattr(catalog, 'iter_sources', failing_sources)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        catalog.build_catalog(orgs=['other'], path=path)
+    assert catalog.load_catalog(path) == before
+    assert not os.path.exists(path + '.tmp')
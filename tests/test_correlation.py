@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from services.correlation import adjust_pvalues, correlation_matrices
+
+
+def _frame(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    a = rng.normal(size=n)
+    df = pd.DataFrame({'a': a, 'b': a + rng.normal(size=n), 'c': rng.normal(size=n),
+                       'd': np.round(rng.exponential(size=n), 1)})
+    # Missing values on different rows per column exercise pairwise deletion
+    df.loc[rng.choice(n, 20, replace=False), 'b'] = np.nan
+    df.loc[rng.choice(n, 15, replace=False), 'd'] = np.nan
+    return df
+
+
+def _square(values, k):
+    p = np.zeros((k, k))
+    iu = np.triu_indices(k, k=1)
+    p[iu] = values
+    p.T[iu] = values
+    return p
+
+
+def test_matches_pandas_and_scipy_with_missing_values():
+    df = _frame()
+    result = correlation_matrices(df, correction='holm')
+    pd.testing.assert_frame_equal(result['pearson'], df.corr(), atol=1e-10)
+    pd.testing.assert_frame_equal(result['spearman'], df.corr('spearman'), atol=1e-10)
+    for x, y in (('a', 'b'), ('b', 'd'), ('c', 'd')):
+        pair = df[[x, y]].dropna()
+        assert result['n'].loc[x, y] == len(pair)
+        assert np.isclose(result['pearson_p'].loc[x, y], stats.pearsonr(pair[x], pair[y]).pvalue)
+        assert np.isclose(result['spearman_p'].loc[x, y], stats.spearmanr(pair[x], pair[y]).pvalue)
+
+
+def test_holm_matches_step_down_definition():
+    raw = np.array([0.01, 0.04, 0.03, 0.2, 0.005, 0.5])
+    m = len(raw)
+    order = np.argsort(raw)
+    expected = np.empty(m)
+    running = 0.0
+    for rank, index in enumerate(order):
+        running = max(running, (m - rank) * raw[index])
+        expected[index] = min(running, 1.0)
+    adjusted = adjust_pvalues(_square(raw, 4), 'holm')
+    np.testing.assert_allclose(adjusted[np.triu_indices(4, k=1)], expected)
+    assert np.allclose(np.diagonal(adjusted), 0.0)
+
+
+def test_benjamini_hochberg_matches_scipy():
+    raw = np.array([0.01, 0.04, 0.03, 0.2, 0.005, 0.5])
+    adjusted = adjust_pvalues(_square(raw, 4), 'fdr_bh')
+    np.testing.assert_allclose(adjusted[np.triu_indices(4, k=1)], stats.false_discovery_control(raw))
+
+
+def test_missing_pvalues_are_not_counted():
+    raw = np.array([0.01, np.nan, 0.03])
+    adjusted = adjust_pvalues(_square(raw, 3), 'holm')[np.triu_indices(3, k=1)]
+    np.testing.assert_allclose(adjusted, [0.02, np.nan, 0.03])
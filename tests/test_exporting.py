@@ -0,0 +1,67 @@
+import io
+
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate_records
+from services import exporting
+from services.pipeline import Pipeline
+
+
+@pytest.fixture(scope='module')
+def frame():
+    return Pipeline(generate_records(120), compact=False).frame()
+
+
+def test_csv_chunks_match_to_csv(frame):
+    chunks = list(exporting.iter_csv(frame, chunk_rows=25))
+    assert len(chunks) == 1 + 5
+    assert b''.join(chunks).decode('utf-8') == frame.to_csv(index=False)
+
+
+@pytest.mark.skipif(not exporting.arrow_available(), reason='pyarrow not installed')
+@pytest.mark.parametrize('fmt', ['parquet', 'arrow'])
+def test_binary_formats_round_trip(frame, fmt):
+    import pyarrow.parquet as pq
+
+    data = b''.join(exporting.iter_table(frame, fmt, chunk_rows=25))
+    if fmt == 'parquet':
+        assert pq.ParquetFile(io.BytesIO(data)).num_row_groups == 5
+        restored = pd.read_parquet(io.BytesIO(data))
+    else:
+        restored = pd.read_feather(io.BytesIO(data))
+    pd.testing.assert_frame_equal(restored, frame.reset_index(drop=True), check_dtype=False)
+
+
+def test_html_report_is_the_same_for_any_chunk_size(frame):
+    stats, grouped = frame.describe(), frame.groupby('License')[['Stars']].sum()
+    small = b''.join(exporting.iter_html_report(frame, stats, grouped, chunk_rows=7)).decode('utf-8')
+    whole = b''.join(exporting.iter_html_report(frame, stats, grouped, chunk_rows=len(frame))).decode('utf-8')
+    # Only the generation timestamp may differ
+    body = small.split('<h3>Tổng quan</h3>', 1)[1]
+    assert body == whole.split('<h3>Tổng quan</h3>', 1)[1]
+    # Overview rows have no index cell; the stats and grouped tables start theirs with <th>
+    assert body.count('<tr>\n      <td>') == len(frame)
+
+
+def test_cached_export_encodes_once_and_is_byte_bounded(monkeypatch):
+    cache = exporting.LRUCache(maxsize=8, max_weight=10, weigh=len)
+    monkeypatch.setattr(exporting, '_export_cache', cache)
+    calls = []
+
+    def chunks():
+        calls.append(1)
+        return iter([b'abc', b'def'])
+
+    assert exporting.cached_export(('key', 'csv'), 'csv', chunks) == b'abcdef'
+    assert exporting.cached_export(('key', 'csv'), 'csv', chunks) == b'abcdef'
+    assert len(calls) == 1
+    exporting.cached_export(('other', 'csv'), 'csv', lambda: iter([b'x' * 8]))
+    # 6 + 8 bytes exceed the 10-byte bound: the older entry goes
+    assert exporting.cached_export(('key', 'csv'), 'csv', chunks) == b'abcdef'
+    assert len(calls) == 2
+
+
+def test_unknown_format_is_rejected(frame):
+    with pytest.raises(ValueError):
+        exporting.iter_table(frame, 'xlsx')
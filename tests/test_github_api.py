@@ -0,0 +1,53 @@
+import requests
+
+from services import github_api, github_graphql
+from services.snapshots import load_history
+
+
+def test_snapshots_written_in_one_batch(fake_github, monkeypatch):
+    calls = []
+    record_snapshots = github_api.record_snapshots
+    monkeypatch.setattr(github_api, 'record_snapshots', lambda records: calls.append(len(records))
+                        or record_snapshots(records))
+    frameworks = {f'Repo {i}': f'owner/repo-{i}' for i in range(20)}
+    records = github_api.get_frameworks_data(frameworks, [], max_workers=8, backend='rest')
+    assert len(records) == 20
+    assert calls == [20]
+    assert load_history()['Repo'].nunique() == 20
+
+
+def test_failed_snapshot_write_is_logged(fake_github, monkeypatch, caplog, tmp_path):
+    # A directory cannot be opened as a database
+    monkeypatch.setenv('GITHUB_SNAPSHOT_PATH', str(tmp_path))
+    records = github_api.get_frameworks_data({'React': 'facebook/react'}, [], backend='rest')
+    assert len(records) == 1
+    assert 'Could not record 1 snapshot' in caplog.text
+
+
+def test_failed_fetch_is_not_memoized(fake_github, monkeypatch):
+    fetch_json = github_api.fetch_json
+    failures = [requests.exceptions.ConnectionError('boom')]
+
+    def flaky(url, **kwargs):
+        if failures:
+            raise failures.pop()
+        return fetch_json(url, **kwargs)
+
+    monkeypatch.setattr(github_api, 'fetch_json', flaky)
+    assert github_api.get_framework_data('React', 'facebook/react') is None
+    assert github_api.get_framework_data('React', 'facebook/react')['Repo'] == 'facebook/react'
+
+
+def test_failed_graphql_batch_is_not_memoized(fake_github, monkeypatch):
+    send_request = github_graphql.send_request
+    failures = [requests.exceptions.ConnectionError('boom')]
+
+    def flaky(*args, **kwargs):
+        if failures:
+            raise failures.pop()
+        return send_request(*args, **kwargs)
+
+    monkeypatch.setattr(github_graphql, 'send_request', flaky)
+    targets = (('React', 'facebook/react'), ('Vue', 'vuejs/core'))
+    assert github_graphql.get_batch_data(targets) == []
+    assert [record['Repo'] for record in github_graphql.get_batch_data(targets)] == ['facebook/react', 'vuejs/core']
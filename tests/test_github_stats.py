@@ -0,0 +1,58 @@
+import random
+
+from services.github_stats import ACTIVITY_COLUMNS, StatsPoller, _Job
+
+
+class FakeResponse:
+    def __init__(self, headers=None):
+        self.headers = headers or {}
+
+
+def test_backoff_doubles_with_jitter_and_honours_retry_after():
+    random.seed(0)
+    poller = StatsPoller(base_delay=2.0, max_delay=30.0)
+    job = _Job('a/b', 'contributors')
+    for attempts, expected in ((1, 2.0), (2, 4.0), (3, 8.0), (10, 30.0)):
+        job.attempts = attempts
+        assert 0.75 * expected <= poller._backoff(job, FakeResponse()) <= 1.25 * expected
+    # The first delay follows half the recent time-to-ready
+    poller._ready_after = 12.0
+    job.attempts = 1
+    assert 4.5 <= poller._backoff(job, FakeResponse()) <= 7.5
+    assert poller._backoff(job, FakeResponse({'Retry-After': '3'})) == 3.0
+    assert poller._backoff(job, FakeResponse({'Retry-After': '600'})) == 30.0
+
+
+def test_polls_until_ready(fake_github):
+    poller = StatsPoller(base_delay=0.02, max_delay=0.1)
+    repos = ['a/one', 'a/two', 'a/three']
+    try:
+        poller.submit(repos)
+        assert poller.wait(repos, timeout=10)
+        results = poller.results(repos)
+    finally:
+        poller.stop(1)
+    assert set(results) == set(repos)
+    assert all(set(values) == set(ACTIVITY_COLUMNS) for values in results.values())
+    # Every job answered 202 twice before its data was ready
+    assert poller.stats()['accepted_202'] == 2 * len(repos) * len(poller.endpoints)
+    assert poller.stats()['done'] == len(repos) * len(poller.endpoints)
+
+
+def test_failed_jobs_are_resubmitted(fake_github):
+    fake_github.stats_pending = 5
+    poller = StatsPoller(endpoints=('contributors',), base_delay=0.01, max_delay=0.02, max_attempts=2)
+    try:
+        poller.submit(['a/b'])
+        assert poller.wait(['a/b'], timeout=10)
+        assert poller.progress(['a/b'])['failed'] == 1
+        fake_github.stats_pending = 0
+        poller.submit(['a/b'])
+        assert poller.wait(['a/b'], timeout=10)
+        assert poller.progress(['a/b'])['done'] == 1
+        # Fresh successful results are not polled again
+        requests = poller.requests
+        poller.submit(['a/b'])
+        assert poller.wait(['a/b'], timeout=1) and poller.requests == requests
+    finally:
+        poller.stop(1)
@@ -0,0 +1,37 @@
+from services import github_api
+from services.http_cache import ResponseCache
+
+
+def test_store_and_conditional_headers(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'responses.sqlite'))
+    cache.store('a', '"v1"', 'Mon, 01 Jan 2024 00:00:00 GMT', b'{"x": 1}')
+    entry = cache.lookup('a')
+    assert entry.body == b'{"x": 1}'
+    assert cache.conditional_headers(entry) == {'If-None-Match': '"v1"',
+                                                'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT'}
+    # Without validators there is nothing to revalidate with
+    cache.store('b', None, None, b'{}')
+    assert cache.lookup('b') is None
+    assert cache.conditional_headers(None) == {}
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'responses.sqlite'), max_bytes=25)
+    cache.store('a', '"a"', None, b'x' * 10)
+    cache.store('b', '"b"', None, b'x' * 10)
+    cache.record_hit('a')
+    cache.store('c', '"c"', None, b'x' * 10)
+    assert cache.lookup('a') is not None
+    assert cache.lookup('b') is None
+    assert cache.stats()['evictions'] == 1
+
+
+def test_fetch_json_revalidates_with_etag(fake_github, monkeypatch, tmp_path):
+    monkeypatch.setenv('GITHUB_CACHE_PATH', str(tmp_path / 'responses.sqlite'))
+    monkeypatch.setattr(github_api, '_response_cache', None)
+    url = f"{github_api.get_api_url()}/repos/facebook/react"
+    first = github_api.fetch_json(url)
+    assert github_api.fetch_json(url) == first
+    stats = github_api.get_response_cache().stats()
+    assert (stats['misses'], stats['hits']) == (1, 1)
+    assert fake_github.stats()['requests'] == 2
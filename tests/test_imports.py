@@ -0,0 +1,10 @@
+import pytest
+
+from benchmarks.importtime import default_entries, forbidden_imports
+
+ENTRIES = default_entries()
+
+
+@pytest.mark.parametrize('name', sorted(ENTRIES))
+def test_entry_leaves_heavy_modules_unimported(name):
+    assert forbidden_imports(ENTRIES[name]) == []
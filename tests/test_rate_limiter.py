@@ -0,0 +1,97 @@
+import threading
+import time
+
+import pytest
+
+from services.rate_limiter import BACKGROUND, INTERACTIVE, RateLimited, RequestScheduler, resource_for
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, headers=None, text=''):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = text
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = responses
+        self.urls = []
+
+    def request(self, method, url, **kwargs):
+        self.urls.append(url)
+        return self.responses(url)
+
+
+def exhausted(resource, reset_in, limit=30, remaining=0):
+    return FakeResponse(headers={
+        'X-RateLimit-Resource': resource,
+        'X-RateLimit-Limit': str(limit),
+        'X-RateLimit-Remaining': str(remaining),
+        'X-RateLimit-Reset': str(time.time() + reset_in),
+    })
+
+
+def test_resource_for():
+    assert resource_for('https://api.github.com/search/repositories?q=x') == 'search'
+    assert resource_for('https://api.github.com/graphql') == 'graphql'
+    assert resource_for('https://ghe.local/api/v3/repos/a/b/stargazers') == 'core'
+
+
+def test_exhausted_search_window_does_not_hold_core():
+    scheduler = RequestScheduler()
+    scheduler.observe(exhausted('search', 50))
+    start = time.monotonic()
+    scheduler.acquire(INTERACTIVE, 'core')
+    assert time.monotonic() - start < 0.1
+    with pytest.raises(RateLimited) as error:
+        scheduler.acquire(INTERACTIVE, 'search')
+    assert 45 < error.value.wait <= 50
+    assert scheduler.stats()['resources']['search']['remaining'] == 0
+    assert scheduler.stats()['remaining'] is None
+
+
+def test_rate_limited_response_pauses_only_its_resource():
+    def respond(url):
+        if resource_for(url) == 'search':
+            return FakeResponse(403, {'Retry-After': '30', 'X-RateLimit-Resource': 'search'}, 'rate limit')
+        return FakeResponse(200)
+
+    scheduler = RequestScheduler(max_retries=2)
+    session = FakeSession(respond)
+    with pytest.raises(RateLimited) as error:
+        scheduler.request(session, 'GET', 'https://api.github.com/search/repositories')
+    assert error.value.response.status_code == 403
+    assert scheduler.request(session, 'GET', 'https://api.github.com/repos/a/b').status_code == 200
+    with pytest.raises(RateLimited):
+        scheduler.acquire(INTERACTIVE, 'search')
+
+
+def test_interactive_max_wait():
+    scheduler = RequestScheduler(max_wait=1)
+    scheduler.observe(exhausted('core', 5))
+    with pytest.raises(RateLimited):
+        scheduler.acquire(INTERACTIVE)
+    assert scheduler.stats()['rejected'] == 1
+
+    # Without a limit the request waits for the reset
+    scheduler = RequestScheduler(max_wait=None)
+    scheduler.observe(exhausted('core', 0.3))
+    start = time.monotonic()
+    scheduler.acquire(INTERACTIVE)
+    assert time.monotonic() - start >= 0.2
+
+
+def test_background_leaves_reserve_to_interactive():
+    scheduler = RequestScheduler()
+    # 10 of 100 left: inside the 10% reserved for interactive requests
+    scheduler.observe(exhausted('core', 0.5, limit=100, remaining=10))
+    waiter = threading.Thread(target=scheduler.acquire, args=(BACKGROUND,), daemon=True)
+    waiter.start()
+    waiter.join(0.2)
+    assert waiter.is_alive()
+    start = time.monotonic()
+    scheduler.acquire(INTERACTIVE)
+    assert time.monotonic() - start < 0.1
+    waiter.join(2)
+    assert not waiter.is_alive()
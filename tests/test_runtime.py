@@ -0,0 +1,21 @@
+import time
+
+from services.runtime import _ttl_cache
+
+
+def test_ttl_cache_drops_expired_entries_on_write():
+    calls = []
+    cached = _ttl_cache(0.05, lambda x: calls.append(x) or x)
+    for x in range(10):
+        cached(x)
+    time.sleep(0.06)
+    cached('fresh')
+    assert len(cached.cache) == 1
+    assert cached(5) == 5 and calls.count(5) == 2
+
+
+def test_ttl_cache_is_bounded():
+    cached = _ttl_cache(60, lambda x, _ignored=None: x, max_entries=3)
+    for x in range(10):
+        cached(x, _ignored=object())
+    assert list(key[0][1] for key in cached.cache) == [7, 8, 9]
@@ -0,0 +1,94 @@
+import threading
+import time
+
+from services.shared_cache import SharedCache, SingleFlight
+
+
+def _run_concurrently(func, n=8):
+    results = [None] * n
+
+    def run(i):
+        results[i] = func()
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    return results
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    flight = SingleFlight()
+    calls = []
+
+    def load():
+        calls.append(1)
+        time.sleep(0.2)
+        return 'value'
+
+    assert _run_concurrently(lambda: flight.do('key', load)) == ['value'] * 8
+    assert len(calls) == 1
+    assert flight.coalesced == 7
+
+
+def test_single_flight_shares_errors_and_retries_afterwards():
+    flight = SingleFlight()
+
+    def failing():
+        time.sleep(0.1)
+        raise ValueError('boom')
+
+    def call():
+        try:
+            flight.do('key', failing)
+        except ValueError as e:
+            return e
+
+    assert all(isinstance(error, ValueError) for error in _run_concurrently(call, n=3))
+    assert flight.do('key', lambda: 'ok') == 'ok'
+
+
+def test_shared_cache_loads_once_across_instances(tmp_path):
+    path = str(tmp_path / 'shared.sqlite')
+    first, second = SharedCache(path), SharedCache(path)
+    calls = []
+
+    def load():
+        calls.append(1)
+        return {'stars': 1}
+
+    assert first.get_or_load('repo', load) == {'stars': 1}
+    assert second.get_or_load('repo', load) == {'stars': 1}
+    assert len(calls) == 1
+    assert second.stats()['hits'] == 1
+
+
+def test_failed_and_expired_loads_are_fetched_again(tmp_path):
+    cache = SharedCache(str(tmp_path / 'shared.sqlite'))
+    assert cache.get_or_load('repo', lambda: None) is None
+    assert cache.get_or_load('repo', lambda: 1) == 1
+    assert cache.get_or_load('repo', lambda: 2) == 1
+    assert cache.get_or_load('repo', lambda: 3, ttl=0) == 3
+
+
+def test_waits_for_the_lease_holder(tmp_path):
+    path = str(tmp_path / 'shared.sqlite')
+    holder, waiter = SharedCache(path), SharedCache(path, poll_interval=0.01)
+    assert holder._acquire('repo', 'other-process')
+
+    def finish():
+        time.sleep(0.2)
+        holder.put('repo', 'from holder')
+        holder._release('repo', 'other-process')
+
+    threading.Thread(target=finish).start()
+    assert waiter.get_or_load('repo', lambda: 'from waiter') == 'from holder'
+    assert waiter.stats()['waits'] > 0
+
+
+def test_takes_over_a_stuck_lease(tmp_path):
+    path = str(tmp_path / 'shared.sqlite')
+    SharedCache(path)._acquire('repo', 'stuck-process')
+    waiter = SharedCache(path, lease_timeout=0.2, poll_interval=0.01)
+    assert waiter.get_or_load('repo', lambda: 'loaded') == 'loaded'
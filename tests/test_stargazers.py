@@ -0,0 +1,62 @@
+import pytest
+import requests
+
+from services import stargazers
+
+
+def _logins(base_dir, repo='a/b'):
+    return [login for rows in stargazers.iter_stargazer_batches(repo, base_dir) for _, login in rows]
+
+
+def _interrupt_after(monkeypatch, name, pages):
+    original = getattr(stargazers, name)
+
+    def interrupted(*args, **kwargs):
+        for i, page in enumerate(original(*args, **kwargs)):
+            if i == pages:
+                raise requests.exceptions.ConnectionError('interrupted')
+            yield page
+
+    monkeypatch.setattr(stargazers, name, interrupted)
+
+
+def test_resumes_after_interruption_and_fetches_only_new_stars(fake_github, monkeypatch, tmp_path):
+    with monkeypatch.context() as patch:
+        _interrupt_after(patch, 'iter_stargazer_pages', 3)
+        with pytest.raises(requests.exceptions.ConnectionError):
+            stargazers.ingest_stargazers('a/b', base_dir=tmp_path, batch_size=40, per_page=30)
+    assert 0 < len(_logins(tmp_path)) <= 90
+
+    stargazers.ingest_stargazers('a/b', base_dir=tmp_path, batch_size=40, per_page=30)
+    logins = _logins(tmp_path)
+    assert len(logins) == len(set(logins)) == 1000
+
+    fake_github.stargazers = 1010
+    assert stargazers.ingest_stargazers('a/b', base_dir=tmp_path, batch_size=40, per_page=30) == 10
+    assert len(set(_logins(tmp_path))) == 1010
+
+
+def test_page_cap_switches_to_newest_first_sweep(fake_github, monkeypatch, tmp_path, caplog):
+    monkeypatch.setenv('GITHUB_TOKEN', 'token')
+    fake_github.stargazers, fake_github.stargazer_pages = 2500, 10
+    assert stargazers.ingest_stargazers('a/b', base_dir=tmp_path, batch_size=300, per_page=100) == 2500
+    assert '422 on page 11' in caplog.text
+    cursor = stargazers.read_cursor(stargazers.get_repo_dir('a/b', tmp_path))
+    assert cursor['capped'] and cursor['sweep'] is None
+
+    # An interrupted sweep resumes from its saved GraphQL cursor
+    fake_github.stargazers = 2750
+    with monkeypatch.context() as patch:
+        _interrupt_after(patch, 'iter_newest_stargazers', 2)
+        with pytest.raises(requests.exceptions.ConnectionError):
+            stargazers.ingest_stargazers('a/b', base_dir=tmp_path, batch_size=100, per_page=100)
+    stargazers.ingest_stargazers('a/b', base_dir=tmp_path, batch_size=100, per_page=100)
+    logins = _logins(tmp_path)
+    assert len(logins) == len(set(logins)) == 2750
+    assert stargazers.ingest_stargazers('a/b', base_dir=tmp_path, per_page=100) == 0
+
+
+def test_sweep_needs_a_token(fake_github, tmp_path, caplog):
+    fake_github.stargazers, fake_github.stargazer_pages = 500, 2
+    assert stargazers.ingest_stargazers('a/b', base_dir=tmp_path, per_page=100) == 200
+    assert 'need GITHUB_TOKEN' in caplog.text